@@ -0,0 +1,147 @@
+"""Benchmark of completion stats over many completed tasks.
+
+Inserts completed tasks, a third of them tagged, for one owner and times
+``get_completion_stats`` over the whole range. For comparison, the same
+lead time percentiles are also computed the way a caller would without
+it: loading the completed tasks with ``list_tasks`` and looping over them.
+
+Usage:
+    python -m benchmarks.analytics --tasks 1000000 --loop-tasks 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert
+from sqlmodel import col, delete, select
+
+from src.db.engine import get_session
+from src.db.functions.get_completion_stats import get_completion_stats
+from src.db.functions.list_tasks import list_tasks
+from src.db.tenancy import owner_scope
+from src.models import Priority, Tag, Task, TaskTagLink
+
+# Owner ID used by the benchmark, far from real ones
+OWNER_ID = 4_000_000
+
+DAYS = 365
+BATCH_SIZE = 50_000
+
+
+def _insert_tasks(count: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    # Tasks are created in ID order, spread evenly over the year
+    first = datetime.combine(date.today(), datetime.min.time()) - timedelta(days=DAYS)
+    spacing = DAYS * 86_400 / count
+    priorities = list(Priority)
+    with get_session() as session:
+        tags = [Tag(name=f"analytics-{i}", owner_id=OWNER_ID) for i in range(10)]
+        session.add_all(tags)
+        session.flush()
+        tag_ids = [tag.id for tag in tags]
+
+        for offset in range(0, count, BATCH_SIZE):
+            rows = []
+            for i in range(offset, min(count, offset + BATCH_SIZE)):
+                created_at = first + timedelta(seconds=i * spacing)
+                lead = timedelta(hours=rng.expovariate(1 / 48))
+                completed_at = created_at + lead
+                estimate = rng.choice([None, 15, 30, 60, 120])
+                rows.append(
+                    {
+                        "owner_id": OWNER_ID,
+                        "title": "analytics",
+                        "priority": rng.choice(priorities),
+                        "completed": True,
+                        "created_at": created_at,
+                        "updated_at": completed_at,
+                        "start_date": completed_at - lead / 4 if estimate else None,
+                        "completed_at": completed_at,
+                        "time_estimate_minutes": estimate,
+                    }
+                )
+            session.execute(insert(Task), rows)
+
+        task_ids = session.exec(select(Task.id).where(Task.owner_id == OWNER_ID)).all()
+        links = [
+            {"task_id": task_id, "tag_id": rng.choice(tag_ids), "owner_id": OWNER_ID}
+            for task_id in task_ids[::3]
+        ]
+        session.execute(insert(TaskTagLink), links)
+
+
+def _loop_lead_times() -> tuple[float, float]:
+    """Lead time percentiles computed in Python over whole task objects."""
+    lead_hours = [
+        (task.completed_at - task.created_at).total_seconds() / 3600
+        for task in list_tasks(completed=True)
+        if task.completed_at is not None
+    ]
+    deciles = statistics.quantiles(lead_hours, n=10)
+    return statistics.median(lead_hours), deciles[-1]
+
+
+def _delete_tasks() -> None:
+    with get_session() as session:
+        for model in (TaskTagLink, Task, Tag):
+            session.execute(delete(model).where(col(model.owner_id) == OWNER_ID))
+
+
+def _time_stats(queries: int) -> tuple[float, float]:
+    """Median latency of the stats and their lead time median."""
+    start = date.today() - timedelta(days=DAYS)
+    latencies = []
+    for _ in range(queries):
+        began = time.perf_counter()
+        stats = get_completion_stats(start=start)
+        latencies.append(time.perf_counter() - began)
+    assert stats.overall.lead_time_p50_hours is not None
+    return statistics.median(latencies), stats.overall.lead_time_p50_hours
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Completion stats benchmark")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument(
+        "--loop-tasks",
+        type=int,
+        default=100_000,
+        help="tasks to compare with the Python loop over (0 = skip it)",
+    )
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        with owner_scope(OWNER_ID):
+            _insert_tasks(args.tasks)
+            latency, median = _time_stats(args.queries)
+            print(
+                f"numpy  tasks={args.tasks:>9} p50={latency * 1000:8.1f}ms "
+                f"lead time p50={median:.1f}h"
+            )
+
+            if args.loop_tasks:
+                _delete_tasks()
+                _insert_tasks(args.loop_tasks)
+                latency, median = _time_stats(args.queries)
+                print(
+                    f"numpy  tasks={args.loop_tasks:>9} p50={latency * 1000:8.1f}ms "
+                    f"lead time p50={median:.1f}h"
+                )
+                began = time.perf_counter()
+                median, _p90 = _loop_lead_times()
+                latency = time.perf_counter() - began
+                print(
+                    f"loop   tasks={args.loop_tasks:>9} time={latency * 1000:7.1f}ms "
+                    f"lead time p50={median:.1f}h"
+                )
+    finally:
+        _delete_tasks()
+
+
+if __name__ == "__main__":
+    main()
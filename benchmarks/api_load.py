@@ -0,0 +1,97 @@
+"""Load test for the HTTP API.
+
+Worker threads poll the task list like internal tools do. By default each
+worker remembers the last ETag and sends it as ``If-None-Match``, so
+unchanged polls are answered with 304. Run with ``--no-etag`` to measure
+full reads. A writer thread can create tasks at a fixed rate to invalidate
+the ETags.
+
+Start the API first (``uvicorn src.api:app``), then:
+
+    python -m benchmarks.api_load --url http://localhost:8000 --threads 8
+"""
+
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+
+import httpx
+
+
+def main() -> None:
+    """Run the load test and print a summary."""
+    parser = argparse.ArgumentParser(description="HTTP API load test")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument("--limit", type=int, default=50, help="page size")
+    parser.add_argument("--no-etag", action="store_true", help="skip If-None-Match")
+    parser.add_argument(
+        "--writes-per-second", type=float, default=0.0, help="task creations"
+    )
+    args = parser.parse_args()
+
+    deadline = time.monotonic() + args.duration
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    received = 0
+    lock = threading.Lock()
+    created: list[int] = []
+
+    def poller() -> None:
+        nonlocal received
+        etag = None
+        local_latencies = []
+        local_statuses: Counter[int] = Counter()
+        local_received = 0
+        with httpx.Client(
+            base_url=args.url, headers={"Accept-Encoding": "gzip"}
+        ) as http:
+            while time.monotonic() < deadline:
+                headers: dict[str, str] = {}
+                if etag is not None and not args.no_etag:
+                    headers["If-None-Match"] = etag
+                start = time.perf_counter()
+                response = http.get(f"/tasks?limit={args.limit}", headers=headers)
+                local_latencies.append(time.perf_counter() - start)
+                local_statuses[response.status_code] += 1
+                local_received += len(response.content)
+                etag = response.headers.get("etag", etag)
+        with lock:
+            latencies.extend(local_latencies)
+            statuses.update(local_statuses)
+            received += local_received
+
+    def writer() -> None:
+        interval = 1 / args.writes_per_second
+        with httpx.Client(base_url=args.url) as http:
+            while time.monotonic() < deadline:
+                response = http.post("/tasks", json={"title": "api-load"})
+                created.append(response.json()["id"])
+                time.sleep(interval)
+
+    threads = [threading.Thread(target=poller) for _ in range(args.threads)]
+    if args.writes_per_second > 0:
+        threads.append(threading.Thread(target=writer))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with httpx.Client(base_url=args.url) as http:
+        for task_id in created:
+            http.delete(f"/tasks/{task_id}")
+
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+    print(f"threads={args.threads} etag={not args.no_etag} elapsed={elapsed:.1f}s")
+    print(f"requests={len(latencies)} throughput={len(latencies) / elapsed:.0f} req/s")
+    print(f"p50={statistics.median(latencies) * 1000:.1f}ms p99={p99:.1f}ms")
+    print(f"statuses={dict(statuses)} body_bytes={received}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Contention benchmark for optimistic concurrency control on tasks.
+
+Many threads repeatedly read a task and toggle it with ``expected_version``
+set, retrying on conflicts. At the end every task's version must equal one
+plus the number of successful edits on it, i.e. no update was lost.
+
+Usage:
+    python -m benchmarks.edit_contention --tasks 10 --threads 16 --edits 200
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+
+from sqlmodel import col, delete, select
+
+from src.db.engine import get_session
+from src.db.exceptions import StaleTaskError
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.models import Task
+
+
+def _read_task(task_id: int) -> tuple[bool, int]:
+    with get_session() as session:
+        completed, version = session.exec(
+            select(Task.completed, Task.version).where(Task.id == task_id)
+        ).one()
+    return completed, version
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Optimistic concurrency benchmark")
+    parser.add_argument("--tasks", type=int, default=10, help="overlapping tasks")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--edits", type=int, default=200, help="edits per thread")
+    args = parser.parse_args()
+
+    task_ids = [create_task(title=f"contention-{i}").id for i in range(args.tasks)]
+    successes: Counter[int] = Counter()
+    conflicts = 0
+    lock = threading.Lock()
+
+    def worker(seed: int) -> None:
+        nonlocal conflicts
+        rng = random.Random(seed)
+        for _ in range(args.edits):
+            task_id = rng.choice(task_ids)
+            assert task_id is not None
+            while True:
+                completed, version = _read_task(task_id)
+                try:
+                    edit_task(
+                        task_id, completed=not completed, expected_version=version
+                    )
+                except StaleTaskError:
+                    with lock:
+                        conflicts += 1
+                    continue
+                with lock:
+                    successes[task_id] += 1
+                break
+
+    threads = [
+        threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    lost_updates = 0
+    for task_id in task_ids:
+        assert task_id is not None
+        _, version = _read_task(task_id)
+        lost_updates += 1 + successes[task_id] - version
+
+    total = sum(successes.values())
+    print(f"threads={args.threads} tasks={args.tasks} edits={total}")
+    print(f"elapsed={elapsed:.2f}s throughput={total / elapsed:.0f} edits/s")
+    print(f"conflicts={conflicts} ({conflicts / (total + conflicts):.1%} of attempts)")
+    print(f"lost_updates={lost_updates}")
+
+    with get_session() as session:
+        session.exec(delete(Task).where(col(Task.id).in_(task_ids)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark of the cost metrics add to every database function call.
+
+Calls a function that does nothing, bare and wrapped with
+:func:`src.metrics.timed`, and reports the difference per call; then does
+the same for a real ``get_task`` call, to put the overhead next to a query.
+Each measurement is the best of several runs, which filters out scheduler
+noise. Exits with an error when the overhead is over the budget, so a CI
+job can hold the line.
+
+Usage:
+    python -m benchmarks.metrics_overhead --calls 200000 --max-us 2
+"""
+
+import argparse
+import inspect
+import sys
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.get_task import get_task
+from src.metrics import OVERHEAD_BUDGET_US, Histogram, timed
+from src.settings import get_settings
+
+# Owner ID used by the benchmark, far from real ones
+OWNER_ID = 6_000_000
+
+
+def _per_call_us(func: Callable[[], Any], calls: int, repeat: int) -> float:
+    """Best time of one call over several runs, in microseconds."""
+    return min(timeit.repeat(func, number=calls, repeat=repeat)) / calls * 1e6
+
+
+def _noop() -> None:
+    pass
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Metrics overhead benchmark")
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--max-us", type=float, default=OVERHEAD_BUDGET_US)
+    args = parser.parse_args()
+
+    bare = _per_call_us(_noop, args.calls, args.repeat)
+    wrapped = _per_call_us(timed(_noop), args.calls, args.repeat)
+    overhead = wrapped - bare
+    observe = Histogram("benchmark_seconds", "Benchmark.").labels().observe
+    histogram = _per_call_us(lambda: observe(0.003), args.calls, args.repeat)
+    print(f"bare call      {bare:8.3f}us")
+    print(f"timed call     {wrapped:8.3f}us")
+    print(f"observe        {histogram:8.3f}us")
+    print(f"overhead       {overhead:8.3f}us (budget {args.max_us}us)")
+
+    get_settings().default_owner_id = OWNER_ID
+    task_id = create_task(title="Metrics overhead").id
+    assert task_id is not None
+    try:
+        bare_get_task = inspect.unwrap(get_task)
+        query = _per_call_us(lambda: bare_get_task(task_id), args.queries, args.repeat)
+        timed_query = _per_call_us(lambda: get_task(task_id), args.queries, args.repeat)
+    finally:
+        delete_task(task_id)
+    print(f"get_task       {query:8.1f}us bare, {timed_query:.1f}us timed")
+    print(f"share of query {overhead / query:8.2%}")
+
+    if overhead > args.max_us:
+        sys.exit(f"Metrics add {overhead:.3f}us per call, over {args.max_us}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Benchmark for the workload planner.
+
+Plans synthetic open tasks in memory, the way ``plan_tasks`` does on every
+change in the app.
+
+Usage:
+    python -m benchmarks.planner --tasks 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from src.models import Priority
+from src.planner import PlanItem, Planner
+
+
+def _random_item(rng: random.Random, task_id: int, now: datetime) -> PlanItem:
+    due = start = None
+    if rng.random() < 0.7:
+        due = now + timedelta(days=rng.randint(-5, 365), hours=rng.randint(0, 23))
+    if rng.random() < 0.2:
+        start = now + timedelta(days=rng.randint(0, 90))
+    return PlanItem(
+        id=task_id,
+        title=f"Task {task_id}",
+        priority=rng.choice(list(Priority)),
+        due_date=due,
+        start_date=start,
+        time_estimate_minutes=rng.choice([None, 5, 15, 30, 60, 120, 240]),
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Workload planner benchmark")
+    parser.add_argument("--tasks", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    now = datetime.now()
+    items = [_random_item(rng, task_id, now) for task_id in range(args.tasks)]
+
+    timings = []
+    for _ in range(args.repeat):
+        planner = Planner(now=now)
+        start = time.perf_counter()
+        schedule = planner.plan(items)
+        timings.append(time.perf_counter() - start)
+
+    late = sum(slot.late for slot in schedule)
+    print(f"tasks={args.tasks} late={late}")
+    print(
+        f"full plan: best={min(timings):.3f}s median={statistics.median(timings):.3f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
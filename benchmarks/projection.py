@@ -0,0 +1,95 @@
+"""Benchmark of listing task summaries against listing whole tasks.
+
+Inserts tasks with long descriptions for one owner and lists them the way
+the app used to (every column) and the way it does now (summaries, then
+one query for description previews). Reports the latency, the peak memory
+allocated while listing and the description text loaded by each.
+
+Usage:
+    python -m benchmarks.projection --tasks 500 --description-length 20000
+"""
+
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable
+
+from sqlalchemy import insert
+from sqlmodel import col, delete
+
+from src.db.engine import get_session
+from src.db.functions.get_task_descriptions import get_task_descriptions
+from src.db.functions.list_tasks import TaskFields, list_tasks
+from src.db.tenancy import owner_scope
+from src.models import Priority, Task
+
+# Owner ID used by the benchmark, far from real ones
+OWNER_ID = 3_000_000
+
+PREVIEW_LENGTH = 200
+
+
+def _full() -> int:
+    return sum(len(task.description or "") for task in list_tasks())
+
+
+def _summary() -> int:
+    tasks = list_tasks(fields=TaskFields.SUMMARY)
+    previews = get_task_descriptions(
+        (task.id for task in tasks if task.id is not None), max_length=PREVIEW_LENGTH
+    )
+    return sum(len(preview) for preview in previews.values())
+
+
+def _measure(run: Callable[[], int], queries: int) -> tuple[float, int, int]:
+    """Median latency, peak traced memory and characters loaded."""
+    latencies = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    loaded = run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(latencies), peak, loaded
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Task summary listing benchmark")
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--description-length", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=10)
+    args = parser.parse_args()
+
+    rows = [
+        {
+            "owner_id": OWNER_ID,
+            "title": f"projection-{i}",
+            "description": f"{i} " + "lorem ipsum " * (args.description_length // 12),
+            "priority": Priority.MEDIUM,
+        }
+        for i in range(args.tasks)
+    ]
+    with get_session() as session:
+        session.execute(insert(Task), rows)
+
+    try:
+        with owner_scope(OWNER_ID):
+            for name, run in (("full", _full), ("summary", _summary)):
+                latency, peak, loaded = _measure(run, args.queries)
+                print(
+                    f"{name:<8} p50={latency * 1000:8.1f}ms "
+                    f"peak memory={peak / 1_000_000:7.1f}MB "
+                    f"description chars={loaded}"
+                )
+    finally:
+        with get_session() as session:
+            session.execute(delete(Task).where(col(Task.owner_id) == OWNER_ID))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark of a quick add against creating the same tasks one by one.
+
+Pastes the same tagged lines both ways: one create_task and one
+add_tag_to_task per task and tag, as the single-task form would, and one
+create_tasks call. Reports the time each takes and the transactions each
+commits.
+
+Usage:
+    python -m benchmarks.quick_add --tasks 50
+"""
+
+import argparse
+import time
+
+from sqlalchemy import event
+from sqlmodel import col, delete
+
+from src.db.engine import get_engine, get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_task import create_task
+from src.db.functions.create_tasks import NewTask, create_tasks
+from src.db.functions.get_or_create_tags import get_or_create_tags
+from src.db.tag_cache import tag_cache
+from src.models import Priority, Tag, Task, TaskChange, TaskSignature, TaskTagLink
+from src.quick_add import parse_quick_add
+from src.settings import get_settings
+
+# Owner ID used by the benchmark, far from real ones
+OWNER_ID = 7_000_000
+
+
+def _lines(count: int) -> str:
+    tags = ("home", "work", "errands", "q3")
+    return "\n".join(
+        f"- Task number {i} !high due:fri #{tags[i % 4]} #{tags[(i + 1) % 4]}"
+        for i in range(count)
+    )
+
+
+def _cleanup() -> None:
+    with get_session() as session:
+        for model in (TaskChange, TaskTagLink, TaskSignature, Task, Tag):
+            session.exec(delete(model).where(col(model.owner_id) == OWNER_ID))
+    tag_cache.clear()
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Quick add benchmark")
+    parser.add_argument("--tasks", type=int, default=50)
+    args = parser.parse_args()
+
+    get_settings().default_owner_id = OWNER_ID
+    parsed = parse_quick_add(_lines(args.tasks))
+    priority = Priority.HIGH
+    transactions = [0]
+
+    def count_begin(connection: object) -> None:
+        transactions[0] += 1
+
+    event.listen(get_engine(), "begin", count_begin)
+    try:
+        _cleanup()
+        transactions[0] = 0
+        start = time.perf_counter()
+        for task in parsed:
+            task_id = create_task(title=task.title, priority=priority).id
+            assert task_id is not None
+            for tag_id in get_or_create_tags(task.tags).values():
+                add_tag_to_task(task_id, tag_id)
+        one_by_one = time.perf_counter() - start
+        one_by_one_transactions = transactions[0]
+
+        _cleanup()
+        transactions[0] = 0
+        start = time.perf_counter()
+        create_tasks(
+            [
+                NewTask(title=task.title, priority=priority, tags=task.tags)
+                for task in parsed
+            ]
+        )
+        batched = time.perf_counter() - start
+        batched_transactions = transactions[0]
+    finally:
+        event.remove(get_engine(), "begin", count_begin)
+        _cleanup()
+
+    print(
+        f"one by one {one_by_one * 1000:8.1f}ms transactions={one_by_one_transactions}"
+    )
+    print(f"batched    {batched * 1000:8.1f}ms transactions={batched_transactions}")
+    print(f"speedup    {one_by_one / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
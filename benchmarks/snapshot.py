@@ -0,0 +1,145 @@
+"""Benchmark of snapshot dumps and restores.
+
+Fills a scratch database with tasks, each with two tags, dumps it to a
+snapshot and restores the snapshot over it, reporting rows per second and
+the size of the file. For comparison, it also times creating a sample of
+the tasks one by one with ``create_task`` and extrapolates to all of them.
+
+Runs against a temporary SQLite file unless ``--database-url`` is given.
+That database is emptied: never point it at one holding real data.
+
+Usage:
+    python -m benchmarks.snapshot --tasks 1000000
+    python -m benchmarks.snapshot --tasks 100000 --trace-memory
+"""
+
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from sqlalchemy import insert
+from sqlmodel import col, delete, select
+
+from src.db.engine import get_session
+from src.db.functions.create_task import create_task
+from src.db.init_db import init_db
+from src.db.snapshot import dump_snapshot, restore_snapshot
+from src.db.tenancy import all_owners_scope
+from src.models import Priority, Tag, Task, TaskTagLink
+from src.settings import get_settings
+
+OWNERS = 100
+TAGS_PER_OWNER = 10
+BATCH_SIZE = 50_000
+
+
+def _fill(count: int, seed: int = 0) -> None:
+    """Insert ``count`` tasks spread over the owners, with two tags each."""
+    rng = random.Random(seed)
+    priorities = list(Priority)
+    with all_owners_scope(), get_session() as session:
+        tags = [
+            Tag(name=f"tag-{i}", owner_id=owner)
+            for owner in range(1, OWNERS + 1)
+            for i in range(TAGS_PER_OWNER)
+        ]
+        session.add_all(tags)
+        session.flush()
+        owner_tags: dict[int, list[int]] = {}
+        for tag in tags:
+            assert tag.id is not None
+            owner_tags.setdefault(tag.owner_id, []).append(tag.id)
+
+        owners = [rng.randint(1, OWNERS) for _ in range(count)]
+        task_tags = [sorted(rng.sample(owner_tags[owner], 2)) for owner in owners]
+        for offset in range(0, count, BATCH_SIZE):
+            rows = [
+                {
+                    "owner_id": owners[i],
+                    "title": f"Snapshot task number {i}",
+                    "description": "Some notes about the task " * rng.randint(0, 4),
+                    "priority": rng.choice(priorities),
+                    "tag_ids": task_tags[i],
+                }
+                for i in range(offset, min(count, offset + BATCH_SIZE))
+            ]
+            session.execute(insert(Task), rows)
+
+        task_ids = session.exec(select(Task.id).order_by(col(Task.id))).all()
+        links = [
+            {"task_id": task_id, "tag_id": tag_id, "owner_id": owner}
+            for task_id, owner, ids in zip(task_ids, owners, task_tags)
+            for tag_id in ids
+        ]
+        for offset in range(0, len(links), BATCH_SIZE):
+            session.execute(insert(TaskTagLink), links[offset : offset + BATCH_SIZE])
+
+
+def _create_one_by_one(sample: int) -> float:
+    """Seconds per task of creating tasks with create_task."""
+    start = time.perf_counter()
+    for i in range(sample):
+        create_task(title=f"One by one {i}", priority=Priority.LOW)
+    return (time.perf_counter() - start) / sample
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Snapshot benchmark")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--database-url", help="scratch database, emptied first")
+    parser.add_argument("--create-task-sample", type=int, default=500)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="report peak Python memory of the restore (slows it down)",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings = get_settings()
+        settings.database_shard_urls = []
+        settings.database_url = (
+            args.database_url or f"sqlite:///{Path(directory) / 'snapshot.db'}"
+        )
+        init_db()
+        with all_owners_scope(), get_session() as session:
+            for model in (TaskTagLink, Task, Tag):
+                session.execute(delete(model))
+
+        _fill(args.tasks)
+        path = Path(directory) / "backup.snapshot.gz"
+
+        stats = dump_snapshot(path)
+        print(
+            f"dump     {sum(stats.rows.values()):>9} rows "
+            f"{stats.elapsed_seconds:7.1f}s {stats.rows_per_second:>9.0f} rows/s "
+            f"file={stats.bytes / 1e6:.1f}MB"
+        )
+
+        if args.trace_memory:
+            tracemalloc.start()
+        stats = restore_snapshot(path, replace=True)
+        if args.trace_memory:
+            _current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"restore peak Python memory {peak / 1e6:.1f}MB")
+        print(
+            f"restore  {sum(stats.rows.values()):>9} rows "
+            f"{stats.elapsed_seconds:7.1f}s {stats.rows_per_second:>9.0f} rows/s "
+            f"tasks/s={stats.rows['task'] / stats.elapsed_seconds:.0f}"
+        )
+
+        if args.create_task_sample:
+            per_task = _create_one_by_one(args.create_task_sample)
+            print(
+                f"create_task one by one {1 / per_task:9.0f} tasks/s, "
+                f"{per_task * args.tasks / 60:.1f} min for {args.tasks} tasks"
+            )
+
+
+if __name__ == "__main__":
+    main()
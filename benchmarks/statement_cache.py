@@ -0,0 +1,224 @@
+"""Benchmark of pre-built statements against statements built per call.
+
+Runs the ten most frequent statements of the database functions both ways
+against a small in-memory SQLite database: built from scratch on every
+call, as the functions used to, and pre-built with bound parameters (see
+``src.db.statements``). The database work is the same for both, so the
+difference is the Python-side overhead saved per call. Writes target rows
+that don't match, so every round runs the same statements.
+
+Usage:
+    python -m benchmarks.statement_cache --calls 2000
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert, nulls_last
+from sqlmodel import Session, SQLModel, col, create_engine, func, select, update
+
+from src.db.statements import (
+    DELETED_TASK_BY_ID,
+    LAST_CHANGE_ID,
+    SOFT_DELETE,
+    TAG_BY_ID,
+    TAGS,
+    TASK_BY_ID,
+    TASK_VERSION,
+    edit_statement,
+    list_tasks_statement,
+)
+from src.models import Priority, Tag, Task, TaskChange
+
+OWNER_ID = 1
+
+
+def _operations(session: Session) -> dict[str, tuple[Callable[[], Any], ...]]:
+    """Pairs of (built per call, pre-built) runs of each statement."""
+    now = datetime.now()
+    owner = {"owner": OWNER_ID}
+    task = {"task_id": 5, "owner": OWNER_ID}
+    edit = {
+        "task_id": 5,
+        "read_version": -1,
+        "new_completed": True,
+        "new_completed_at": now,
+        "new_updated_at": now,
+        "new_version": 0,
+    }
+    order = (
+        col(Task.completed),
+        nulls_last(col(Task.due_date)),
+        col(Task.priority).desc(),
+        col(Task.id),
+    )
+    return {
+        "get_task": (
+            lambda: session.exec(
+                select(Task).where(
+                    Task.id == 5,
+                    Task.owner_id == OWNER_ID,
+                    col(Task.deleted_at).is_(None),
+                )
+            ).first(),
+            lambda: session.exec(TASK_BY_ID, params=task).first(),
+        ),
+        "get_task_version": (
+            lambda: session.exec(
+                select(Task.version).where(
+                    Task.id == 5,
+                    Task.owner_id == OWNER_ID,
+                    col(Task.deleted_at).is_(None),
+                )
+            ).first(),
+            lambda: session.exec(TASK_VERSION, params=task).first(),
+        ),
+        "get_last_change_id": (
+            lambda: session.exec(
+                select(func.max(col(TaskChange.id))).where(
+                    TaskChange.owner_id == OWNER_ID
+                )
+            ).one(),
+            lambda: session.exec(LAST_CHANGE_ID, params=owner).one(),
+        ),
+        "list_tasks": (
+            lambda: session.exec(
+                select(Task)
+                .where(Task.owner_id == OWNER_ID, col(Task.deleted_at).is_(None))
+                .order_by(*order)
+            ).all(),
+            lambda: session.exec(
+                list_tasks_statement(False, False, False, False, False), params=owner
+            ).all(),
+        ),
+        "list_tasks(page)": (
+            lambda: session.exec(
+                select(Task)
+                .where(
+                    Task.owner_id == OWNER_ID,
+                    col(Task.deleted_at).is_(None),
+                    Task.completed == False,  # noqa: E712
+                )
+                .order_by(*order)
+                .offset(10)
+                .limit(10)
+            ).all(),
+            lambda: session.exec(
+                list_tasks_statement(True, False, True, True, False),
+                params={**owner, "completed": False, "limit": 10, "offset": 10},
+            ).all(),
+        ),
+        "list_tags": (
+            lambda: session.exec(
+                select(Tag).where(Tag.owner_id == OWNER_ID).order_by(Tag.name)
+            ).all(),
+            lambda: session.exec(TAGS, params=owner).all(),
+        ),
+        "get_tag": (
+            lambda: session.exec(
+                select(Tag).where(Tag.id == 3, Tag.owner_id == OWNER_ID)
+            ).first(),
+            lambda: session.exec(
+                TAG_BY_ID, params={"tag_id": 3, "owner": OWNER_ID}
+            ).first(),
+        ),
+        "get_deleted_task": (
+            lambda: session.exec(
+                select(Task).where(
+                    Task.id == 5,
+                    Task.owner_id == OWNER_ID,
+                    col(Task.deleted_at).is_not(None),
+                )
+            ).first(),
+            lambda: session.exec(DELETED_TASK_BY_ID, params=task).first(),
+        ),
+        "edit_task": (
+            lambda: session.exec(
+                update(Task)
+                .where(col(Task.id) == 5, col(Task.version) == -1)
+                .values(completed=True, completed_at=now, updated_at=now, version=0)
+                .execution_options(synchronize_session=False)
+            ),
+            lambda: session.exec(
+                edit_statement(("completed", "completed_at")), params=edit
+            ),
+        ),
+        "delete_task": (
+            lambda: session.exec(
+                update(Task)
+                .where(
+                    col(Task.id) == -1,
+                    col(Task.owner_id) == OWNER_ID,
+                    col(Task.deleted_at).is_(None),
+                )
+                .values(deleted_at=now, updated_at=now, version=col(Task.version) + 1)
+                .execution_options(synchronize_session=False)
+            ),
+            lambda: session.exec(
+                SOFT_DELETE, params={"task_id": -1, "owner": OWNER_ID, "now": now}
+            ),
+        ),
+    }
+
+
+def _time(run: Callable[[], Any], calls: int) -> float:
+    """Microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        run()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Pre-built statements benchmark")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(
+            insert(Task),
+            [
+                {
+                    "owner_id": OWNER_ID,
+                    "title": f"task {i}",
+                    "priority": Priority.MEDIUM,
+                    "completed": i % 2 == 0,
+                }
+                for i in range(args.tasks)
+            ],
+        )
+        session.execute(
+            insert(Tag),
+            [{"owner_id": OWNER_ID, "name": f"tag {i}"} for i in range(5)],
+        )
+        session.commit()
+
+        print(f"{'operation':<24} {'built':>9} {'pre-built':>10} {'saved':>7}")
+        total_built = total_prebuilt = 0.0
+        for name, (built, prebuilt) in _operations(session).items():
+            # Warm up the compiled-SQL cache for both
+            built(), prebuilt()
+            built_us = _time(built, args.calls)
+            prebuilt_us = _time(prebuilt, args.calls)
+            total_built += built_us
+            total_prebuilt += prebuilt_us
+            print(
+                f"{name:<24} {built_us:>7.1f}us {prebuilt_us:>8.1f}us "
+                f"{1 - prebuilt_us / built_us:>7.0%}"
+            )
+            session.rollback()
+        print(
+            f"{'total':<24} {total_built:>7.1f}us {total_prebuilt:>8.1f}us "
+            f"{1 - total_prebuilt / total_built:>7.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Concurrent-access stress harness for the db layer.
+
+Runs a mixed create/list/edit/tag/delete workload against the configured
+database from several threads in each of several processes, the way
+Streamlit drives the db functions from one thread per browser session.
+
+Reports throughput, p50/p99 latency per operation and errors, and fails
+(non-zero exit code) on any of:
+
+- errors, with pool exhaustion (``sqlalchemy.exc.TimeoutError``) and
+  deadlocks counted separately
+- an operation stalling longer than ``--stall-timeout`` seconds
+- more than one engine being created within a process
+
+Usage:
+    python -m benchmarks.stress_db --processes 2 --threads 8 --duration 10
+    python -m benchmarks.stress_db --mix create=1,list=4,edit=2,tag=1,delete=1
+"""
+
+import argparse
+import multiprocessing
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlmodel import col, delete
+
+from src.db import engine as engine_module
+from src.db.engine import get_engine, get_session
+from src.db.exceptions import StaleTaskError
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.list_tasks import list_tasks
+from src.db.functions.remove_tag_from_task import remove_tag_from_task
+from src.models import Tag
+
+OPERATIONS = ("create", "list", "edit", "tag", "delete")
+
+
+@dataclass
+class WorkerStats:
+    """Measurements collected by one process, merged by the parent."""
+
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    errors: Counter[str] = field(default_factory=Counter)
+    pool_timeouts: int = 0
+    deadlocks: int = 0
+    conflicts: int = 0
+    stalls: int = 0
+    engines_created: int = 0
+
+    def merge(self, other: "WorkerStats") -> None:
+        """Add another worker's measurements to this one."""
+        for name, values in other.latencies.items():
+            self.latencies.setdefault(name, []).extend(values)
+        self.errors.update(other.errors)
+        self.pool_timeouts += other.pool_timeouts
+        self.deadlocks += other.deadlocks
+        self.conflicts += other.conflicts
+        self.stalls += other.stalls
+        self.engines_created = max(self.engines_created, other.engines_created)
+
+
+def _parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def _is_deadlock(exc: DBAPIError) -> bool:
+    code = getattr(exc.orig, "pgcode", None)
+    return code == "40P01" or "deadlock" in str(exc.orig).lower()
+
+
+def _run_thread(
+    seed: int,
+    tag_id: int,
+    mix: dict[str, int],
+    deadline: float,
+    barrier: threading.Barrier,
+    engines: set[int],
+    in_flight: dict[int, float],
+    stats: WorkerStats,
+    lock: threading.Lock,
+) -> None:
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = list(mix.values())
+    own_tasks: list[int] = []
+    tagged: set[int] = set()
+    ident = threading.get_ident()
+
+    # Release all threads at once so they race on creating the engine
+    barrier.wait()
+    engine_id = id(get_engine())
+    with lock:
+        engines.add(engine_id)
+
+    while time.monotonic() < deadline:
+        name = rng.choices(names, weights)[0]
+        if name in ("edit", "tag", "delete") and not own_tasks:
+            name = "create"
+
+        in_flight[ident] = time.monotonic()
+        start = time.perf_counter()
+        try:
+            if name == "create":
+                task = create_task(title=f"stress-{seed}-{len(own_tasks)}")
+                assert task.id is not None
+                own_tasks.append(task.id)
+            elif name == "list":
+                list_tasks(completed=False)
+            elif name == "edit":
+                edit_task(rng.choice(own_tasks), completed=rng.random() < 0.5)
+            elif name == "tag":
+                task_id = rng.choice(own_tasks)
+                if task_id in tagged:
+                    remove_tag_from_task(task_id, tag_id)
+                    tagged.discard(task_id)
+                else:
+                    add_tag_to_task(task_id, tag_id)
+                    tagged.add(task_id)
+            else:
+                task_id = own_tasks.pop(rng.randrange(len(own_tasks)))
+                tagged.discard(task_id)
+                delete_task(task_id)
+        except StaleTaskError:
+            with lock:
+                stats.conflicts += 1
+        except PoolTimeoutError:
+            with lock:
+                stats.pool_timeouts += 1
+                stats.errors[f"{name}: pool timeout"] += 1
+        except DBAPIError as exc:
+            with lock:
+                if _is_deadlock(exc):
+                    stats.deadlocks += 1
+                stats.errors[f"{name}: {type(exc.orig).__name__}"] += 1
+        except Exception as exc:
+            with lock:
+                stats.errors[f"{name}: {type(exc).__name__}"] += 1
+        else:
+            elapsed = time.perf_counter() - start
+            with lock:
+                stats.latencies.setdefault(name, []).append(elapsed)
+        finally:
+            in_flight.pop(ident, None)
+
+    for task_id in own_tasks:
+        delete_task(task_id)
+
+
+def run_process(
+    process_index: int,
+    threads: int,
+    tag_id: int,
+    mix: dict[str, int],
+    duration: float,
+    stall_timeout: float,
+) -> WorkerStats:
+    """Run the workload on several threads in the current process."""
+    # Start from a fresh engine so the threads below race on creating it
+    if engine_module._engine is not None:
+        engine_module._engine.dispose()
+    engine_module._engine = None
+
+    stats = WorkerStats()
+    lock = threading.Lock()
+    engines: set[int] = set()
+    in_flight: dict[int, float] = {}
+    barrier = threading.Barrier(threads)
+    deadline = time.monotonic() + duration
+
+    workers = [
+        threading.Thread(
+            target=_run_thread,
+            args=(
+                process_index * threads + i,
+                tag_id,
+                mix,
+                deadline,
+                barrier,
+                engines,
+                in_flight,
+                stats,
+                lock,
+            ),
+            daemon=True,
+        )
+        for i in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+
+    # Watchdog: an operation that takes this long is most likely deadlocked
+    stalled: set[tuple[int, float]] = set()
+    while any(worker.is_alive() for worker in workers):
+        now = time.monotonic()
+        for ident, started in list(in_flight.items()):
+            if now - started > stall_timeout:
+                stalled.add((ident, started))
+        if now > deadline + stall_timeout:
+            break
+        time.sleep(0.1)
+
+    stats.stalls = len(stalled)
+    stats.engines_created = len(engines)
+    return stats
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[percent - 1]
+
+
+def main() -> None:
+    """Run the stress harness and print a report."""
+    parser = argparse.ArgumentParser(description="db layer stress harness")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--threads", type=int, default=8, help="threads per process")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument(
+        "--mix",
+        type=_parse_mix,
+        default="create=2,list=4,edit=3,tag=2,delete=1",
+        help="operation weights, e.g. create=2,list=4",
+    )
+    parser.add_argument("--stall-timeout", type=float, default=30.0)
+    args = parser.parse_args()
+
+    tag = create_tag(name=f"stress-{time.time_ns()}")
+    assert tag.id is not None
+    run_args = (args.threads, tag.id, args.mix, args.duration, args.stall_timeout)
+
+    start = time.perf_counter()
+    if args.processes == 1:
+        results = [run_process(0, *run_args)]
+    else:
+        # spawn so children don't inherit the parent's pooled connections
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.processes) as pool:
+            results = pool.starmap(
+                run_process, [(i, *run_args) for i in range(args.processes)]
+            )
+    elapsed = time.perf_counter() - start
+
+    stats = WorkerStats()
+    for result in results:
+        stats.merge(result)
+
+    with get_session() as session:
+        session.exec(delete(Tag).where(col(Tag.id) == tag.id))
+
+    total = sum(len(values) for values in stats.latencies.values())
+    print(
+        f"processes={args.processes} threads={args.threads} "
+        f"duration={elapsed:.1f}s ops={total} throughput={total / elapsed:.0f} ops/s"
+    )
+    for name in OPERATIONS:
+        values = stats.latencies.get(name, [])
+        if values:
+            print(
+                f"  {name:<7} n={len(values):<7} "
+                f"p50={_percentile(values, 50) * 1000:.1f}ms "
+                f"p99={_percentile(values, 99) * 1000:.1f}ms"
+            )
+    print(f"conflicts={stats.conflicts} (retried edits that lost a race)")
+    print(f"errors={sum(stats.errors.values())}")
+    for error, count in stats.errors.most_common():
+        print(f"  {error}: {count}")
+    print(f"pool_timeouts={stats.pool_timeouts} deadlocks={stats.deadlocks}")
+    print(f"stalled_operations={stats.stalls}")
+    print(f"engines_per_process={stats.engines_created}")
+
+    failed = (
+        stats.errors
+        or stats.stalls
+        or stats.engines_created != 1
+        or stats.pool_timeouts
+        or stats.deadlocks
+    )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
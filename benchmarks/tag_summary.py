@@ -0,0 +1,184 @@
+"""Benchmark of reading tags from ``task.tag_ids`` against joining the links.
+
+Inserts tasks with four tags each for one owner, both as task_tag_link rows
+and in ``tag_ids``, then times two reads each way:
+
+- page: the first page of the task list with the tags of its tasks, from
+  a second query on task_tag_link, or from ``tag_ids`` alone
+- filter: the first page of tasks with one tag, joining task_tag_link, or
+  with ``list_tasks(tag_id=...)``, which reads ``tag_ids``
+
+Postgres serves the tag filter on ``tag_ids`` with a GIN index; SQLite
+has none for JSON and scans the owner's tasks instead.
+
+Usage:
+    python -m benchmarks.tag_summary --links 1000000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+
+from sqlalchemy import bindparam, insert, nulls_last
+from sqlmodel import col, delete, select
+
+from src.db.engine import get_session
+from src.db.functions.list_tasks import TaskFields, list_tasks
+from src.db.statements import WITHOUT_DESCRIPTION
+from src.db.tenancy import owner_scope
+from src.models import Tag, Task, TaskTagLink
+
+# Owner ID used by the benchmark, far from real ones
+OWNER_ID = 8_000_000
+
+TAGS = 40
+TAGS_PER_TASK = 4
+PAGE_SIZE = 50
+BATCH_SIZE = 50_000
+
+# First page of an owner's live tasks with a tag, joining the links: owner,
+# tag_id; in the order of list_tasks
+TAGGED_PAGE = (
+    select(Task)
+    .join(TaskTagLink, col(TaskTagLink.task_id) == col(Task.id))
+    .where(
+        col(TaskTagLink.owner_id) == bindparam("owner"),
+        col(TaskTagLink.tag_id) == bindparam("tag_id"),
+        col(Task.owner_id) == bindparam("owner"),
+        col(Task.deleted_at).is_(None),
+    )
+    .order_by(
+        col(Task.completed),
+        nulls_last(col(Task.due_date)),
+        col(Task.priority).desc(),
+        col(Task.id),
+    )
+    .limit(PAGE_SIZE)
+    .options(WITHOUT_DESCRIPTION)
+)
+
+
+def _insert(links: int, seed: int = 0) -> list[int]:
+    """Insert tasks with ``links`` tag links in all; return the tag IDs."""
+    rng = random.Random(seed)
+    with get_session() as session:
+        tags = [Tag(name=f"summary-{i}", owner_id=OWNER_ID) for i in range(TAGS)]
+        session.add_all(tags)
+        session.flush()
+        tag_ids = [tag.id for tag in tags if tag.id is not None]
+
+        task_tags = [
+            sorted(rng.sample(tag_ids, TAGS_PER_TASK))
+            for _ in range(links // TAGS_PER_TASK)
+        ]
+        for offset in range(0, len(task_tags), BATCH_SIZE):
+            rows = [
+                {
+                    "owner_id": OWNER_ID,
+                    "title": f"Tagged task {offset + i}",
+                    "completed": rng.random() < 0.3,
+                    "tag_ids": ids,
+                }
+                for i, ids in enumerate(task_tags[offset : offset + BATCH_SIZE])
+            ]
+            session.execute(insert(Task), rows)
+
+        task_ids = session.exec(
+            select(Task.id).where(Task.owner_id == OWNER_ID).order_by(col(Task.id))
+        ).all()
+        link_rows = [
+            {"task_id": task_id, "tag_id": tag_id, "owner_id": OWNER_ID}
+            for task_id, ids in zip(task_ids, task_tags)
+            for tag_id in ids
+        ]
+        for offset in range(0, len(link_rows), BATCH_SIZE):
+            session.execute(
+                insert(TaskTagLink), link_rows[offset : offset + BATCH_SIZE]
+            )
+    return tag_ids
+
+
+def _delete() -> None:
+    with get_session() as session:
+        for model in (TaskTagLink, Task, Tag):
+            session.execute(delete(model).where(col(model.owner_id) == OWNER_ID))
+
+
+def _page_joined() -> dict[int, list[int]]:
+    tasks = list_tasks(limit=PAGE_SIZE, fields=TaskFields.SUMMARY)
+    tags: dict[int, list[int]] = {task.id: [] for task in tasks if task.id}
+    with get_session(read_only=True) as session:
+        links = session.exec(
+            select(TaskTagLink.task_id, TaskTagLink.tag_id).where(
+                col(TaskTagLink.task_id).in_(tags)
+            )
+        )
+        for task_id, tag_id in links:
+            tags[task_id].append(tag_id)
+    return tags
+
+
+def _page_summary() -> dict[int, list[int]]:
+    tasks = list_tasks(limit=PAGE_SIZE, fields=TaskFields.SUMMARY)
+    return {task.id: task.tag_ids or [] for task in tasks if task.id}
+
+
+def _filter_joined(tag_id: int) -> list[int]:
+    with get_session(read_only=True) as session:
+        params = {"owner": OWNER_ID, "tag_id": tag_id}
+        tasks = session.exec(TAGGED_PAGE, params=params)
+        return [task.id for task in tasks if task.id]
+
+
+def _filter_summary(tag_id: int) -> list[int]:
+    tasks = list_tasks(limit=PAGE_SIZE, fields=TaskFields.SUMMARY, tag_id=tag_id)
+    return [task.id for task in tasks if task.id]
+
+
+def _median_ms(read: Callable[[], object], queries: int) -> float:
+    latencies = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        read()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies) * 1000
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Tag summary benchmark")
+    parser.add_argument("--links", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    try:
+        with owner_scope(OWNER_ID):
+            start = time.perf_counter()
+            tag_ids = _insert(args.links)
+            print(f"inserted {args.links} links in {time.perf_counter() - start:.1f}s")
+
+            tag_id = tag_ids[0]
+            assert _page_joined() == _page_summary()
+            assert sorted(_filter_joined(tag_id)) == sorted(_filter_summary(tag_id))
+            for name, joined, summary in (
+                ("page", _page_joined, _page_summary),
+                (
+                    "filter",
+                    lambda: _filter_joined(tag_id),
+                    lambda: _filter_summary(tag_id),
+                ),
+            ):
+                joined_ms = _median_ms(joined, args.queries)
+                summary_ms = _median_ms(summary, args.queries)
+                print(
+                    f"{name:<6} join={joined_ms:8.2f}ms tag_ids={summary_ms:8.2f}ms "
+                    f"speedup={joined_ms / summary_ms:5.1f}x"
+                )
+    finally:
+        _delete()
+
+
+if __name__ == "__main__":
+    main()
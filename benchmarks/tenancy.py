@@ -0,0 +1,79 @@
+"""Benchmark of per-owner listing as the number of owners grows.
+
+Inserts tasks for a growing number of owners and measures how long one
+owner takes to list their open tasks. With the owner-leading indexes the
+latency should stay flat while the table grows; a global index would make
+it grow with the total row count.
+
+Usage:
+    python -m benchmarks.tenancy --tasks-per-owner 200 --steps 1,10,50
+"""
+
+import argparse
+import statistics
+import time
+
+from sqlalchemy import insert
+from sqlmodel import col, delete
+
+from src.db.engine import get_session
+from src.db.functions.list_tasks import list_tasks
+from src.db.tenancy import owner_scope
+from src.models import Priority, Task
+
+# Owner IDs used by the benchmark, far from real ones
+FIRST_OWNER_ID = 1_000_000
+
+
+def _insert_owners(first: int, count: int, tasks_per_owner: int) -> None:
+    rows = [
+        {
+            "owner_id": owner_id,
+            "title": f"tenancy-{owner_id}-{i}",
+            "priority": Priority.MEDIUM,
+            "completed": i % 3 == 0,
+        }
+        for owner_id in range(first, first + count)
+        for i in range(tasks_per_owner)
+    ]
+    with get_session() as session:
+        session.execute(insert(Task), rows)
+
+
+def _measure(owner_id: int, queries: int) -> list[float]:
+    latencies = []
+    with owner_scope(owner_id):
+        for _ in range(queries):
+            start = time.perf_counter()
+            list_tasks()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Per-owner listing benchmark")
+    parser.add_argument("--tasks-per-owner", type=int, default=200)
+    parser.add_argument("--steps", default="1,10,50")
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    steps = sorted(int(step) for step in args.steps.split(","))
+
+    owners = 0
+    try:
+        for step in steps:
+            _insert_owners(FIRST_OWNER_ID + owners, step - owners, args.tasks_per_owner)
+            owners = step
+            latencies = _measure(FIRST_OWNER_ID, args.queries)
+            print(
+                f"owners={owners:>6} rows={owners * args.tasks_per_owner:>8}: "
+                f"p50={statistics.median(latencies) * 1000:.3f}ms "
+                f"max={max(latencies) * 1000:.3f}ms"
+            )
+    finally:
+        with get_session() as session:
+            session.execute(delete(Task).where(col(Task.owner_id) >= FIRST_OWNER_ID))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark of Streamlit reruns of the app, broken down by section.
+
+Inserts tasks for one owner and runs ``src/app.py`` headless with
+Streamlit's ``AppTest``, with ``profile_ui`` on. Reports the median time
+and query count of each section over the reruns (see ``src.profiling``).
+With ``--max-ms``, exits with an error when the median rerun is slower, so
+a UI regression can fail a CI job.
+
+Usage:
+    python -m benchmarks.ui_rerun --tasks 200 --reruns 20 --max-ms 500
+"""
+
+import argparse
+import statistics
+import sys
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlmodel import col, delete
+from streamlit.testing.v1 import AppTest
+
+from src.db.engine import get_session
+from src.models import Priority, Task
+from src.profiling import RerunProfile
+from src.settings import get_settings
+
+# Owner ID used by the benchmark, far from real ones
+OWNER_ID = 5_000_000
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Streamlit rerun benchmark")
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, help="fail above this median")
+    parser.add_argument("--dump-dir", help="write each rerun's cProfile stats here")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    settings.profile_ui = True
+    settings.profile_ui_dump_dir = args.dump_dir
+    # Requests without an X-Owner-Id header belong to the default owner
+    settings.default_owner_id = OWNER_ID
+
+    rows = [
+        {
+            "owner_id": OWNER_ID,
+            "title": f"rerun-{i}",
+            "description": "lorem ipsum " * 20,
+            "priority": list(Priority)[i % 3],
+        }
+        for i in range(args.tasks)
+    ]
+    with get_session() as session:
+        session.execute(insert(Task), rows)
+
+    try:
+        app = AppTest.from_file("src/app.py", default_timeout=60)
+        profiles: list[RerunProfile] = []
+        for _ in range(args.reruns):
+            app.run()
+            profiles.append(app.session_state["ui_profile"])
+    finally:
+        with get_session() as session:
+            session.execute(delete(Task).where(col(Task.owner_id) == OWNER_ID))
+
+    # Skip the first rerun, which imports and connects
+    profiles = profiles[1:] or profiles
+    seconds: dict[str, list[float]] = defaultdict(list)
+    queries: dict[str, list[int]] = defaultdict(list)
+    for profile in profiles:
+        for timing in profile.breakdown():
+            seconds[timing.name].append(timing.seconds)
+            queries[timing.name].append(timing.queries)
+
+    for name in sorted(seconds, key=lambda name: -statistics.median(seconds[name])):
+        print(
+            f"{name:<12} p50={statistics.median(seconds[name]) * 1000:8.1f}ms "
+            f"queries={statistics.median(queries[name]):5.0f}"
+        )
+    total = statistics.median(p.seconds or 0.0 for p in profiles) * 1000
+    print(
+        f"{'rerun':<12} p50={total:8.1f}ms "
+        f"queries={statistics.median(p.queries for p in profiles):5.0f}"
+    )
+    if args.max_ms is not None and total > args.max_ms:
+        sys.exit(f"Median rerun took {total:.1f}ms, over {args.max_ms}ms")
+
+
+if __name__ == "__main__":
+    main()
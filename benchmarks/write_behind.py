@@ -0,0 +1,119 @@
+"""Benchmark of the write-behind queue against synchronous edits.
+
+Simulates users toggling checkboxes: every toggle flips a random task's
+completion status. The synchronous path calls edit_task for each toggle;
+the write-behind path queues them and flushes in batches. Reports how long
+callers were blocked per toggle and how many edits reached the database.
+
+Usage:
+    python -m benchmarks.write_behind --tasks 50 --toggles 2000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+from sqlmodel import col, delete, select
+
+from src.db.engine import get_session
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.edit_tasks import TaskEdit
+from src.db.write_behind import WriteBehindQueue
+from src.models import Task
+
+
+def _run(
+    task_ids: list[int], toggles: int, toggle: Callable[[int, bool], Any]
+) -> list[float]:
+    """Toggle random tasks and return the caller latency of each toggle."""
+    rng = random.Random(0)
+    completed = dict.fromkeys(task_ids, False)
+    latencies = []
+    for _ in range(toggles):
+        task_id = rng.choice(task_ids)
+        completed[task_id] = not completed[task_id]
+        start = time.perf_counter()
+        toggle(task_id, completed[task_id])
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _versions(task_ids: list[int]) -> int:
+    with get_session() as session:
+        versions = session.exec(
+            select(Task.version).where(col(Task.id).in_(task_ids))
+        ).all()
+    return sum(versions)
+
+
+def _report(name: str, latencies: list[float], elapsed: float, writes: int) -> None:
+    p99 = statistics.quantiles(latencies, n=100)[98] * 1000
+    print(
+        f"{name:>13}: p50={statistics.median(latencies) * 1000:.3f}ms "
+        f"p99={p99:.3f}ms total={elapsed:.2f}s db_edits={writes}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description="Write-behind queue benchmark")
+    parser.add_argument("--tasks", type=int, default=50)
+    parser.add_argument("--toggles", type=int, default=2000)
+    args = parser.parse_args()
+
+    task_ids = []
+    for i in range(args.tasks):
+        task_id = create_task(title=f"write-behind-{i}").id
+        assert task_id is not None
+        task_ids.append(task_id)
+    originals = {task_id: Task(id=task_id, title="") for task_id in task_ids}
+
+    try:
+        before = _versions(task_ids)
+        start = time.perf_counter()
+        latencies = _run(
+            task_ids,
+            args.toggles,
+            lambda task_id, done: edit_task(task_id, completed=done),
+        )
+        elapsed = time.perf_counter() - start
+        after = _versions(task_ids)
+        _report("synchronous", latencies, elapsed, after - before)
+
+        # Reset so both runs start from all tasks open
+        with get_session() as session:
+            for task in session.exec(
+                select(Task).where(col(Task.id).in_(task_ids))
+            ).all():
+                task.completed = False
+                session.add(task)
+        before = _versions(task_ids)
+
+        queue = WriteBehindQueue()
+        start = time.perf_counter()
+        latencies = _run(
+            task_ids,
+            args.toggles,
+            lambda task_id, done: (
+                queue.submit(TaskEdit(task_id, completed=done), originals[task_id]).done
+            ),
+        )
+        queue.close()
+        elapsed = time.perf_counter() - start
+        after = _versions(task_ids)
+        _report("write-behind", latencies, elapsed, after - before)
+        print(
+            f"batches={queue.stats.batches} coalesced={queue.stats.coalesced} "
+            f"cancelled={queue.stats.cancelled} failed={queue.stats.failed}"
+        )
+    finally:
+        with get_session() as session:
+            session.exec(delete(Task).where(col(Task.id).in_(task_ids)))
+
+
+if __name__ == "__main__":
+    main()
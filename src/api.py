@@ -0,0 +1,463 @@
+"""HTTP JSON API exposing the task and tag functions.
+
+A small Starlette app for internal tools that need the data without going
+through the Streamlit UI. Install the ``api`` extra and run it with::
+
+    uvicorn src.api:app --host 0.0.0.0 --port 8000
+
+Reads carry weak ETags. Task lists are tagged by the owner's latest change
+log ID, which unlike a timestamp can't go backwards between app processes
+with skewed clocks, and a single task by its row version, so a poll with a
+matching ``If-None-Match`` is answered with 304 after one index lookup,
+without reading any rows. ``If-Match`` on updates maps to optimistic
+concurrency control (412 when the task changed in the meantime). Requests
+are scoped to the owner in the ``X-Owner-Id`` header. With ``metrics_port``
+set, metrics are served on that port too (see ``src.metrics``).
+"""
+
+import hashlib
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, Field, ValidationError
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.db.exceptions import DuplicateTaskError, StaleTaskError
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.changes_since import changes_since
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.get_last_change_id import get_last_change_id
+from src.db.functions.get_task import get_task
+from src.db.functions.get_task_version import get_task_version
+from src.db.functions.list_tags import list_tags
+from src.db.functions.list_tasks import TaskFields, list_tasks
+from src.db.functions.remove_tag_from_task import remove_tag_from_task
+from src.db.functions.restore_task import restore_task
+from src.db.tenancy import current_owner_id, owner_scope
+from src.metrics import start_metrics_server
+from src.models import Priority, RepeatInterval, Tag, Task
+from src.settings import get_settings
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Change log entries per sync response
+MAX_SYNC_PAGE_SIZE = 1000
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response serialized with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        """Serialize the content, including datetimes and enums."""
+        return orjson.dumps(content)
+
+
+class TaskCreate(BaseModel):
+    """Request body for creating a task."""
+
+    title: str = Field(min_length=1, max_length=200)
+    description: str | None = None
+    priority: Priority = Priority.MEDIUM
+    due_date: datetime | None = None
+    start_date: datetime | None = None
+    time_estimate_minutes: int | None = Field(default=None, ge=0)
+    repeat_interval: RepeatInterval | None = None
+    # Answer 409 instead if the owner already has a similar task
+    reject_duplicates: bool = False
+
+
+class TaskUpdate(BaseModel):
+    """Request body for editing a task; omitted fields are left unchanged."""
+
+    title: str | None = Field(default=None, min_length=1, max_length=200)
+    description: str | None = None
+    completed: bool | None = None
+    priority: Priority | None = None
+    due_date: datetime | None = None
+    start_date: datetime | None = None
+    time_estimate_minutes: int | None = Field(default=None, ge=0)
+    repeat_interval: RepeatInterval | None = None
+
+
+class TagCreate(BaseModel):
+    """Request body for creating a tag."""
+
+    name: str = Field(min_length=1, max_length=50)
+    color: str = Field(default="#808080", pattern=r"^#[0-9A-Fa-f]{6}$")
+
+
+def _task_json(task: Task) -> dict[str, Any]:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "description": task.description,
+        "completed": task.completed,
+        "priority": task.priority,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "due_date": task.due_date,
+        "start_date": task.start_date,
+        "completed_at": task.completed_at,
+        "time_estimate_minutes": task.time_estimate_minutes,
+        "repeat_interval": task.repeat_interval,
+        "version": task.version,
+        "owner_id": task.owner_id,
+    }
+
+
+def _tag_json(tag: Tag) -> dict[str, Any]:
+    return {"id": tag.id, "name": tag.name, "color": tag.color}
+
+
+def _task_etag(task_id: int, version: int) -> str:
+    return f'W/"task-{task_id}-{version}"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """Check whether the client's cached copy matches ``etag``."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return False
+    # Weak comparison: W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def _expected_version(request: Request, task_id: int) -> int | None:
+    """Read the version an update is based on from ``If-Match``."""
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return None
+    prefix = f'"task-{task_id}-'
+    tag = if_match.strip().removeprefix("W/")
+    if not tag.startswith(prefix) or not tag.endswith('"'):
+        raise HTTPException(412, "If-Match doesn't match this task")
+    try:
+        return int(tag[len(prefix) : -1])
+    except ValueError:
+        raise HTTPException(412, "If-Match doesn't match this task") from None
+
+
+def _query_bool(request: Request, name: str) -> bool | None:
+    value = request.query_params.get(name)
+    if value is None:
+        return None
+    if value.lower() in ("true", "1"):
+        return True
+    if value.lower() in ("false", "0"):
+        return False
+    raise HTTPException(400, f"{name} must be true or false")
+
+
+def _query_int(request: Request, name: str, default: int, maximum: int) -> int:
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise HTTPException(400, f"{name} must be an integer") from None
+    if not 0 <= number <= maximum:
+        raise HTTPException(400, f"{name} must be between 0 and {maximum}")
+    return number
+
+
+async def _body(request: Request, model: type[BaseModel]) -> Any:
+    # Invalid bodies raise ValidationError, answered by _validation_error
+    return model.model_validate_json(await request.body())
+
+
+def _task_id(request: Request) -> int:
+    task_id: int = request.path_params["task_id"]
+    return task_id
+
+
+def list_tasks_endpoint(request: Request) -> Response:
+    """List tasks, paginated with ``limit`` and ``offset``.
+
+    ``fields=summary`` leaves out descriptions.
+    """
+    completed = _query_bool(request, "completed")
+    priority_value = request.query_params.get("priority")
+    try:
+        priority = Priority(priority_value) if priority_value else None
+    except ValueError:
+        raise HTTPException(400, "priority must be low, medium or high") from None
+    limit = _query_int(request, "limit", DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+    offset = _query_int(request, "offset", 0, 2**31)
+    try:
+        fields = TaskFields(request.query_params.get("fields", TaskFields.FULL))
+    except ValueError:
+        raise HTTPException(400, "fields must be full or summary") from None
+
+    # Read the version before the rows: a write in between makes the ETag
+    # older than the content, which only costs the client one extra 200
+    last_change_id = get_last_change_id()
+    query = (
+        f"{current_owner_id()}|{completed}|{priority}|{limit}|{offset}|{fields.value}"
+    )
+    fingerprint = hashlib.blake2b(
+        f"{last_change_id}|{query}".encode(),
+        digest_size=12,
+    ).hexdigest()
+    etag = f'W/"tasks-{fingerprint}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    tasks = list_tasks(
+        completed=completed,
+        priority=priority,
+        limit=limit + 1,
+        offset=offset,
+        fields=fields,
+    )
+    has_more = len(tasks) > limit
+    items = [_task_json(task) for task in tasks[:limit]]
+    if fields == TaskFields.SUMMARY:
+        for item in items:
+            del item["description"]
+    content = {
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if has_more else None,
+    }
+    return ORJSONResponse(content, headers=headers)
+
+
+async def create_task_endpoint(request: Request) -> Response:
+    """Create a task."""
+    body: TaskCreate = await _body(request, TaskCreate)
+    try:
+        task = await run_in_threadpool(create_task, **body.model_dump())
+    except DuplicateTaskError as exc:
+        duplicates = [
+            {
+                "id": match.task_id,
+                "title": match.title,
+                "similarity": match.similarity,
+                "exact": match.exact,
+            }
+            for match in exc.matches
+        ]
+        return ORJSONResponse(
+            {"detail": str(exc), "duplicates": duplicates}, status_code=409
+        )
+    assert task.id is not None
+    return ORJSONResponse(
+        _task_json(task),
+        status_code=201,
+        headers={"ETag": _task_etag(task.id, task.version)},
+    )
+
+
+def get_task_endpoint(request: Request) -> Response:
+    """Get a single task."""
+    task_id = _task_id(request)
+    try:
+        etag = _task_etag(task_id, get_task_version(task_id))
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _not_modified(request, etag):
+            return Response(status_code=304, headers=headers)
+        task = get_task(task_id)
+    except ValueError as exc:
+        raise HTTPException(404, str(exc)) from None
+    headers["ETag"] = _task_etag(task_id, task.version)
+    return ORJSONResponse(_task_json(task), headers=headers)
+
+
+async def update_task_endpoint(request: Request) -> Response:
+    """Edit a task, optionally conditional on ``If-Match``."""
+    task_id = _task_id(request)
+    expected_version = _expected_version(request, task_id)
+    body: TaskUpdate = await _body(request, TaskUpdate)
+    try:
+        task = await run_in_threadpool(
+            edit_task, task_id, expected_version=expected_version, **body.model_dump()
+        )
+    except StaleTaskError as exc:
+        raise HTTPException(412, str(exc)) from None
+    except ValueError as exc:
+        raise HTTPException(404, str(exc)) from None
+    return ORJSONResponse(
+        _task_json(task), headers={"ETag": _task_etag(task_id, task.version)}
+    )
+
+
+def delete_task_endpoint(request: Request) -> Response:
+    """Delete a task; it can be restored until it's purged."""
+    if not delete_task(_task_id(request)):
+        raise HTTPException(404, "Task not found")
+    return Response(status_code=204)
+
+
+def restore_task_endpoint(request: Request) -> Response:
+    """Restore a deleted task."""
+    try:
+        task = restore_task(_task_id(request))
+    except ValueError as exc:
+        raise HTTPException(404, str(exc)) from None
+    return ORJSONResponse(_task_json(task))
+
+
+def add_tag_endpoint(request: Request) -> Response:
+    """Add a tag to a task."""
+    try:
+        add_tag_to_task(_task_id(request), request.path_params["tag_id"])
+    except ValueError as exc:
+        raise HTTPException(404, str(exc)) from None
+    return Response(status_code=204)
+
+
+def remove_tag_endpoint(request: Request) -> Response:
+    """Remove a tag from a task."""
+    try:
+        remove_tag_from_task(_task_id(request), request.path_params["tag_id"])
+    except ValueError as exc:
+        raise HTTPException(404, str(exc)) from None
+    return Response(status_code=204)
+
+
+def list_tags_endpoint(request: Request) -> Response:
+    """List all tags."""
+    return ORJSONResponse([_tag_json(tag) for tag in list_tags()])
+
+
+async def create_tag_endpoint(request: Request) -> Response:
+    """Create a tag."""
+    body: TagCreate = await _body(request, TagCreate)
+    tag = await run_in_threadpool(create_tag, body.name, body.color)
+    return ORJSONResponse(_tag_json(tag), status_code=201)
+
+
+def sync_endpoint(request: Request) -> Response:
+    """Get task changes since ``cursor``, for clients keeping a local copy.
+
+    Without a cursor, or when the response has ``snapshot`` set, ``tasks``
+    holds every task and replaces the client's copy. Pass the returned
+    ``cursor`` to the next call; while ``has_more`` is set, call again.
+    """
+    cursor = None
+    if "cursor" in request.query_params:
+        cursor = _query_int(request, "cursor", 0, 2**63 - 1)
+    limit = _query_int(request, "limit", MAX_SYNC_PAGE_SIZE, MAX_SYNC_PAGE_SIZE)
+
+    changes = changes_since(cursor, limit=max(1, limit))
+    tags: dict[int | None, dict[str, Any]] = {}
+    tasks = []
+    for task in changes.tasks:
+        tasks.append({**_task_json(task), "tag_ids": [tag.id for tag in task.tags]})
+        tags.update({tag.id: _tag_json(tag) for tag in task.tags})
+    return ORJSONResponse(
+        {
+            "cursor": changes.cursor,
+            "snapshot": changes.snapshot,
+            "has_more": changes.has_more,
+            "tasks": tasks,
+            "deleted": changes.deleted_task_ids,
+            "tags": list(tags.values()),
+        },
+        headers={"Cache-Control": "no-store"},
+    )
+
+
+class OwnerScopeMiddleware:
+    """Scope each request to the owner named in the ``X-Owner-Id`` header.
+
+    The header is trusted: deploy the API behind the proxy that
+    authenticates users and sets it. Requests without it use the
+    ``default_owner_id`` setting.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap the given ASGI app."""
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Run the request in the owner's scope."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header = Headers(scope=scope).get("x-owner-id")
+        if header is None:
+            await self.app(scope, receive, send)
+            return
+        if not header.isdigit():
+            response = ORJSONResponse(
+                {"detail": "X-Owner-Id must be an integer"}, status_code=400
+            )
+            await response(scope, receive, send)
+            return
+        with owner_scope(int(header)):
+            await self.app(scope, receive, send)
+
+
+async def _http_error(request: Request, exc: Exception) -> Response:
+    assert isinstance(exc, HTTPException)
+    return ORJSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers
+    )
+
+
+async def _validation_error(request: Request, exc: Exception) -> Response:
+    assert isinstance(exc, ValidationError)
+    errors = exc.errors(include_url=False, include_context=False)
+    return ORJSONResponse({"detail": errors}, status_code=422)
+
+
+routes = [
+    Route("/tasks", list_tasks_endpoint, methods=["GET"]),
+    Route("/sync", sync_endpoint, methods=["GET"]),
+    Route("/tasks", create_task_endpoint, methods=["POST"]),
+    Route("/tasks/{task_id:int}", get_task_endpoint, methods=["GET"]),
+    Route("/tasks/{task_id:int}", update_task_endpoint, methods=["PATCH"]),
+    Route("/tasks/{task_id:int}", delete_task_endpoint, methods=["DELETE"]),
+    Route("/tasks/{task_id:int}/restore", restore_task_endpoint, methods=["POST"]),
+    Route("/tasks/{task_id:int}/tags/{tag_id:int}", add_tag_endpoint, methods=["PUT"]),
+    Route(
+        "/tasks/{task_id:int}/tags/{tag_id:int}",
+        remove_tag_endpoint,
+        methods=["DELETE"],
+    ),
+    Route("/tags", list_tags_endpoint, methods=["GET"]),
+    Route("/tags", create_tag_endpoint, methods=["POST"]),
+]
+
+
+@asynccontextmanager
+async def _lifespan(app: Starlette) -> AsyncIterator[None]:
+    settings = get_settings()
+    if settings.metrics_port is not None:
+        start_metrics_server(settings.metrics_port, settings.metrics_host)
+    yield
+
+
+app = Starlette(
+    routes=routes,
+    lifespan=_lifespan,
+    exception_handlers={
+        HTTPException: _http_error,
+        ValidationError: _validation_error,
+    },
+    middleware=[
+        Middleware(GZipMiddleware, minimum_size=500),
+        Middleware(OwnerScopeMiddleware),
+    ],
+)
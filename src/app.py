@@ -1,16 +1,58 @@
 """Streamlit TODO application."""
 
-from datetime import datetime
+from collections import deque
+from datetime import datetime, time, timedelta
+from itertools import groupby
 
 import streamlit as st
 
-from src.db.functions import (
-    create_task,
-    delete_task,
-    edit_task,
-    list_tasks,
+from src.db.engine import RoutingState, bind_routing_state
+from src.db.exceptions import DuplicateTaskError, StaleTaskError
+from src.db.functions.create_task import create_task
+from src.db.functions.create_tasks import NewTask, create_tasks
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_tasks import TaskEdit
+from src.db.functions.get_task_descriptions import get_task_descriptions
+from src.db.functions.list_tasks import TaskFields, list_tasks
+from src.db.functions.list_tasks_in_range import (
+    DateRangePreset,
+    list_tasks_for_preset,
+    list_tasks_in_range,
 )
+from src.db.functions.plan_tasks import plan_tasks
+from src.db.functions.restore_task import restore_task
+from src.db.functions.undo_changes import undo_changes
+from src.db.tenancy import bind_owner
+from src.db.write_behind import get_write_behind_queue, queue_edit
+from src.metrics import start_metrics_server
 from src.models import Priority, RepeatInterval
+from src.planner import WorkingHours
+from src.profiling import RerunProfile, profile_section, start_profile, stop_profile
+from src.quick_add import parse_quick_add
+from src.settings import get_settings
+
+# Characters of a description shown under its task in the list
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+# Reruns listed in the profiling panel
+PROFILED_RERUNS = 10
+
+# Opt-in timing of this rerun's sections; a run cut short by st.rerun() is
+# closed when the next one starts
+if get_settings().profile_ui:
+    previous_profile = st.session_state.get("ui_profile")
+    if previous_profile is not None:
+        previous_profile.finish(interrupted=True)
+    st.session_state["ui_profile"] = start_profile(get_settings().profile_ui_dump_dir)
+    profiles: deque[RerunProfile] = st.session_state.setdefault(
+        "ui_profiles", deque(maxlen=PROFILED_RERUNS)
+    )
+    profiles.append(st.session_state["ui_profile"])
+
+# Opt-in metrics endpoint, started once per process
+metrics_port = get_settings().metrics_port
+if metrics_port is not None:
+    start_metrics_server(metrics_port, get_settings().metrics_host)
 
 # Page config
 st.set_page_config(
@@ -21,93 +63,216 @@ st.set_page_config(
 
 st.title("✓ TODO App")
 
+# Keep this browser session's reads on the primary right after it writes
+bind_routing_state(st.session_state.setdefault("db_routing", RoutingState()))
+
+# Behind an authenticating proxy, show the signed-in user's tasks
+owner_header = st.context.headers.get("X-Owner-Id")
+if owner_header is not None and owner_header.isdigit():
+    bind_owner(int(owner_header))
+
 # Sidebar for filters
-st.sidebar.header("Filters")
-show_completed = st.sidebar.checkbox("Show completed tasks", value=False)
-priority_filter = st.sidebar.selectbox(
-    "Filter by priority",
-    options=[None, Priority.HIGH, Priority.MEDIUM, Priority.LOW],
-    format_func=lambda x: "All priorities" if x is None else x.value.title(),
-)
+with profile_section("sidebar"):
+    st.sidebar.header("Filters")
+    show_completed = st.sidebar.checkbox("Show completed tasks", value=False)
+    priority_filter = st.sidebar.selectbox(
+        "Filter by priority",
+        options=[None, Priority.HIGH, Priority.MEDIUM, Priority.LOW],
+        format_func=lambda x: "All priorities" if x is None else x.value.title(),
+    )
+    due_filter = st.sidebar.selectbox(
+        "Due",
+        options=[
+            None,
+            DateRangePreset.OVERDUE,
+            DateRangePreset.TODAY,
+            DateRangePreset.THIS_WEEK,
+        ],
+        format_func=lambda x: (
+            "Any time" if x is None else x.value.replace("_", " ").title()
+        ),
+    )
+    show_plan = st.sidebar.checkbox("Show weekly plan", value=False)
+    show_calendar = st.sidebar.checkbox("Show calendar", value=False)
 
 # Main section - Create new task
-st.header("Create New Task")
+with profile_section("create form"):
+    st.header("Create New Task")
 
-with st.form("new_task_form", clear_on_submit=True):
-    col1, col2 = st.columns([3, 1])
+    with st.form("new_task_form", clear_on_submit=True):
+        col1, col2 = st.columns([3, 1])
 
-    with col1:
-        new_title = st.text_input("Title", placeholder="Enter task title...")
+        with col1:
+            new_title = st.text_input("Title", placeholder="Enter task title...")
 
-    with col2:
-        new_priority = st.selectbox(
-            "Priority",
-            options=[Priority.HIGH, Priority.MEDIUM, Priority.LOW],
-            format_func=lambda x: x.value.title(),
+        with col2:
+            new_priority = st.selectbox(
+                "Priority",
+                options=[Priority.HIGH, Priority.MEDIUM, Priority.LOW],
+                format_func=lambda x: x.value.title(),
+            )
+
+        new_description = st.text_area(
+            "Description", placeholder="Task description (optional)"
         )
 
-    new_description = st.text_area(
-        "Description", placeholder="Task description (optional)"
-    )
+        col3, col4, col5 = st.columns(3)
 
-    col3, col4, col5 = st.columns(3)
+        with col3:
+            new_due_date = st.date_input("Due date", value=None)
 
-    with col3:
-        new_due_date = st.date_input("Due date", value=None)
+        with col4:
+            new_time_estimate = st.selectbox(
+                "Time estimate",
+                options=[None, 5, 15, 30, 60, 120, 240],
+                format_func=lambda x: "No estimate" if x is None else f"{x} minutes",
+            )
 
-    with col4:
-        new_time_estimate = st.selectbox(
-            "Time estimate",
-            options=[None, 5, 15, 30, 60, 120, 240],
-            format_func=lambda x: "No estimate" if x is None else f"{x} minutes",
-        )
+        with col5:
+            new_repeat = st.selectbox(
+                "Repeat",
+                options=[
+                    None,
+                    RepeatInterval.HOURLY,
+                    RepeatInterval.DAILY,
+                    RepeatInterval.WEEKLY,
+                    RepeatInterval.MONTHLY,
+                ],
+                format_func=lambda x: "No repeat" if x is None else x.value.title(),
+            )
 
-    with col5:
-        new_repeat = st.selectbox(
-            "Repeat",
-            options=[
-                None,
-                RepeatInterval.HOURLY,
-                RepeatInterval.DAILY,
-                RepeatInterval.WEEKLY,
-                RepeatInterval.MONTHLY,
-            ],
-            format_func=lambda x: "No repeat" if x is None else x.value.title(),
-        )
+        allow_duplicate = st.checkbox("Add even if a similar task exists", value=False)
+        submit_button = st.form_submit_button("Add Task", use_container_width=True)
+
+        if submit_button and new_title:
+            try:
+                create_task(
+                    title=new_title,
+                    description=new_description if new_description else None,
+                    priority=new_priority,
+                    due_date=datetime.combine(new_due_date, datetime.min.time())
+                    if new_due_date
+                    else None,
+                    time_estimate_minutes=new_time_estimate,
+                    repeat_interval=new_repeat,
+                    reject_duplicates=not allow_duplicate,
+                )
+                st.success(f"Task '{new_title}' created successfully!")
+                st.rerun()
+            except DuplicateTaskError as e:
+                similar = ", ".join(f"'{match.title}'" for match in e.matches)
+                st.warning(
+                    f"You already have {similar}. Tick the box to add it anyway."
+                )
+            except Exception as e:
+                st.error(f"Error creating task: {e}")
 
-    submit_button = st.form_submit_button("Add Task", use_container_width=True)
-
-    if submit_button and new_title:
-        try:
-            create_task(
-                title=new_title,
-                description=new_description if new_description else None,
-                priority=new_priority,
-                due_date=datetime.combine(new_due_date, datetime.min.time())
-                if new_due_date
-                else None,
-                time_estimate_minutes=new_time_estimate,
-                repeat_interval=new_repeat,
+    # Paste several tasks at once; they are added in one transaction, with a
+    # single rerun. The box keeps its text until the tasks were added.
+    quick_round = st.session_state.setdefault("quick_add_round", 0)
+    with st.expander("Quick add: one task per line"):
+        with st.form("quick_add_form"):
+            quick_text = st.text_area(
+                "Tasks",
+                key=f"quick_add_text_{quick_round}",
+                placeholder="Call the plumber !high due:tomorrow #home\n"
+                "Draft the Q3 report #work due:fri",
+                height=200,
             )
-            st.success(f"Task '{new_title}' created successfully!")
-            st.rerun()
-        except Exception as e:
-            st.error(f"Error creating task: {e}")
+            quick_priority = st.selectbox(
+                "Default priority",
+                options=[Priority.HIGH, Priority.MEDIUM, Priority.LOW],
+                index=1,
+                format_func=lambda x: x.value.title(),
+            )
+            st.caption(
+                "`#tag` adds a tag, `!high`, `!medium` or `!low` sets the priority "
+                "and `due:` takes today, tomorrow, a weekday or a YYYY-MM-DD date."
+            )
+            quick_submit = st.form_submit_button("Add Tasks", use_container_width=True)
+
+        if quick_submit and quick_text.strip():
+            try:
+                created = create_tasks(
+                    [
+                        NewTask(
+                            title=task.title,
+                            priority=task.priority or quick_priority,
+                            due_date=datetime.combine(
+                                task.due_date, datetime.min.time()
+                            )
+                            if task.due_date
+                            else None,
+                            tags=task.tags,
+                        )
+                        for task in parse_quick_add(quick_text)
+                    ]
+                )
+            except ValueError as e:
+                st.error(str(e))
+            except Exception as e:
+                st.error(f"Error creating tasks: {e}")
+            else:
+                st.session_state["quick_added"] = len(created)
+                st.session_state["quick_add_round"] = quick_round + 1
+                st.rerun()
+
+    quick_added = st.session_state.pop("quick_added", None)
+    if quick_added is not None:
+        st.success(f"Added {quick_added} task(s).")
 
 # Task list section
 st.header("Tasks")
 
+# Offer to undo the last delete until the purge job removes the task
+if "last_deleted" in st.session_state:
+    deleted_id, deleted_title = st.session_state["last_deleted"]
+    col1, col2 = st.columns([4, 1])
+    with col1:
+        st.info(f"Deleted '{deleted_title}'.")
+    with col2:
+        if st.button("Undo", key="undo_delete"):
+            try:
+                restore_task(deleted_id)
+            except ValueError:
+                st.toast(f"'{deleted_title}' can no longer be restored.")
+            del st.session_state["last_deleted"]
+            st.rerun()
+
 # Fetch tasks with filters
-tasks = list_tasks(
-    completed=show_completed if show_completed else False,
-    priority=priority_filter,
-)
+with profile_section("fetch"):
+    if due_filter is not None:
+        tasks = list_tasks_for_preset(
+            due_filter,
+            completed=show_completed if show_completed else False,
+            priority=priority_filter,
+            fields=TaskFields.SUMMARY,
+        )
+    else:
+        tasks = list_tasks(
+            completed=show_completed if show_completed else False,
+            priority=priority_filter,
+            fields=TaskFields.SUMMARY,
+        )
+
+# Show edits still waiting in the write-behind queue
+if get_settings().write_behind_mode != "off":
+    write_behind = get_write_behind_queue()
+    tasks = write_behind.overlay(tasks)
+    for conflict in write_behind.take_conflicts():
+        st.toast(f"Task {conflict.task_id} was changed elsewhere, edit dropped.")
 
 if not tasks:
     st.info("No tasks found. Create one above!")
 else:
+    # One query for the previews, one more character to tell if they're cut
+    with profile_section("fetch"):
+        descriptions = get_task_descriptions(
+            (task.id for task in tasks if task.id is not None),
+            max_length=DESCRIPTION_PREVIEW_LENGTH + 1,
+        )
     for task in tasks:
-        with st.container():
+        with profile_section("render rows"), st.container():
             col1, col2, col3, col4 = st.columns([0.5, 4, 2, 1])
 
             with col1:
@@ -119,14 +284,27 @@ else:
                     label_visibility="collapsed",
                 )
                 if is_completed != task.completed and task.id is not None:
-                    edit_task(task.id, completed=is_completed)
+                    try:
+                        queue_edit(
+                            TaskEdit(
+                                task.id,
+                                expected_version=task.version,
+                                completed=is_completed,
+                            ),
+                            original=task,
+                        )
+                    except StaleTaskError:
+                        st.toast(f"'{task.title}' was changed elsewhere, reloaded.")
                     st.rerun()
 
             with col2:
                 # Task title and description
                 st.markdown(f"**{task.title}**")
-                if task.description:
-                    st.caption(task.description)
+                description = descriptions.get(task.id) if task.id else None
+                if description:
+                    if len(description) > DESCRIPTION_PREVIEW_LENGTH:
+                        description = description[:DESCRIPTION_PREVIEW_LENGTH] + "…"
+                    st.caption(description)
 
             with col3:
                 # Priority badge
@@ -147,11 +325,112 @@ else:
                 # Delete button
                 if st.button("Delete", key=f"delete_{task.id}") and task.id is not None:
                     delete_task(task.id)
-                    st.success("Task deleted!")
+                    st.session_state["last_deleted"] = (task.id, task.title)
                     st.rerun()
 
             st.divider()
 
+# Weekly plan section
+if show_plan:
+    with profile_section("plan"):
+        st.header("Plan")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            day_start = st.time_input("Workday starts", value=time(9))
+        with col2:
+            day_end = st.time_input("Workday ends", value=time(17))
+
+        if day_end <= day_start:
+            st.warning("The workday must end after it starts.")
+        else:
+            plan = plan_tasks(hours=WorkingHours(start=day_start, end=day_end))
+
+            late = [slot for slot in plan if slot.late]
+            if late:
+                st.warning(
+                    f"{len(late)} task(s) can't be finished by their due date: "
+                    + ", ".join(slot.title for slot in late[:5])
+                    + ("…" if len(late) > 5 else "")
+                )
+
+            week_end = datetime.now() + timedelta(days=7)
+            this_week = [slot for slot in plan if slot.start < week_end]
+            if not this_week:
+                st.info("Nothing to plan this week.")
+
+            for day, slots in groupby(this_week, key=lambda slot: slot.start.date()):
+                st.subheader(day.strftime("%A, %Y-%m-%d"))
+                for slot in slots:
+                    warning = "⚠️ " if slot.late else ""
+                    st.markdown(
+                        f"{warning}`{slot.start:%H:%M}–{slot.end:%H:%M}` {slot.title}"
+                    )
+
+# Calendar section
+if show_calendar:
+    with profile_section("calendar"):
+        st.header("Calendar")
+
+        picked = st.date_input("Week of", value=datetime.now().date())
+        week_start = datetime.combine(picked, time.min) - timedelta(
+            days=picked.weekday()
+        )
+
+        # Only fetch the tasks due in the visible week
+        week_tasks = list_tasks_in_range(
+            week_start,
+            week_start + timedelta(days=7),
+            completed=None if show_completed else False,
+            priority=priority_filter,
+            fields=TaskFields.SUMMARY,
+        )
+
+        columns = st.columns(7)
+        for offset, column in enumerate(columns):
+            day = week_start + timedelta(days=offset)
+            with column:
+                st.markdown(f"**{day:%a %d}**")
+                for task in week_tasks:
+                    if task.due_date is not None and task.due_date.date() == day.date():
+                        done = "~~" if task.completed else ""
+                        st.caption(f"{done}{task.title}{done}")
+
 # Footer
-st.sidebar.divider()
-st.sidebar.caption(f"Total tasks: {len(tasks)}")
+with profile_section("sidebar"):
+    st.sidebar.divider()
+    if st.sidebar.button("Undo last change"):
+        # Queued edits have to reach the change log before they can be undone
+        if get_settings().write_behind_mode != "off":
+            get_write_behind_queue().flush()
+        if not undo_changes():
+            st.toast("Nothing to undo.")
+        st.rerun()
+    st.sidebar.caption(f"Total tasks: {len(tasks)}")
+
+# Profiling panel
+profile = stop_profile()
+if profile is not None and profile.seconds is not None:
+    with st.sidebar.expander("Profile", expanded=True):
+        st.caption(f"{profile.seconds * 1000:.0f} ms, {profile.queries} queries")
+        st.dataframe(
+            [
+                {
+                    "Section": timing.name,
+                    "ms": round(timing.seconds * 1000, 1),
+                    "Queries": timing.queries,
+                }
+                for timing in profile.breakdown()
+            ],
+            hide_index=True,
+        )
+        if profile.dump_path is not None:
+            st.caption(f"cProfile stats: {profile.dump_path}")
+        st.markdown("**Recent reruns**")
+        for run in reversed(st.session_state["ui_profiles"]):
+            if run.seconds is not None:
+                cut = " (st.rerun)" if run.interrupted else ""
+                st.caption(
+                    f"{run.started_at:%H:%M:%S} {run.seconds * 1000:.0f} ms, "
+                    f"{run.queries} queries{cut}"
+                )
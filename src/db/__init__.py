@@ -1,5 +1,19 @@
-"""Database package."""
+"""Database package.
 
-from src.db.engine import get_engine, get_session
+Exports are imported on first access, so importing a submodule such as
+``src.db.init_db`` doesn't load the engine before it's needed.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.db.engine import get_engine, get_session
 
 __all__ = ["get_engine", "get_session"]
+
+
+def __getattr__(name: str) -> Any:
+    if name in __all__:
+        return getattr(import_module("src.db.engine"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
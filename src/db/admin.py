@@ -0,0 +1,113 @@
+"""Admin reads covering every owner.
+
+Counts and exports span the whole deployment, so with sharding they run on
+every shard in parallel (see :func:`src.db.sharding.scatter_gather`) and
+their results are merged::
+
+    python -m src.db.admin count
+    python -m src.db.admin export > tasks.jsonl
+"""
+
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import case
+from sqlmodel import col, func, select
+
+from src.db.engine import get_session
+from src.db.sharding import scatter_gather
+from src.db.tenancy import all_owners_scope
+from src.models import Task
+
+
+@dataclass
+class TaskCounts:
+    """Number of tasks and owners in one shard."""
+
+    owners: int
+    live: int
+    # Live tasks that are done
+    completed: int
+    deleted: int
+
+
+def _count_shard() -> TaskCounts:
+    with all_owners_scope(), get_session(read_only=True) as session:
+        owners, total, completed, deleted = session.exec(
+            select(
+                func.count(func.distinct(col(Task.owner_id))),
+                func.count(),
+                func.count(
+                    case((col(Task.deleted_at).is_(None), col(Task.completed_at)))
+                ),
+                func.count(col(Task.deleted_at)),
+            )
+        ).one()
+    return TaskCounts(
+        owners=owners, live=total - deleted, completed=completed, deleted=deleted
+    )
+
+
+def count_tasks() -> list[TaskCounts]:
+    """Count tasks and owners in every shard.
+
+    Returns:
+        Counts of each shard, in shard order (one entry without sharding)
+    """
+    return scatter_gather(_count_shard)
+
+
+def _export_shard() -> list[dict[str, Any]]:
+    with all_owners_scope(), get_session(read_only=True) as session:
+        tasks = session.exec(
+            select(Task)
+            .where(col(Task.deleted_at).is_(None))
+            .order_by(col(Task.owner_id), col(Task.id))
+        )
+        return [task.model_dump(mode="json", exclude={"deleted_at"}) for task in tasks]
+
+
+def export_tasks() -> list[dict[str, Any]]:
+    """Export every live task of every owner.
+
+    Task IDs are only unique within a shard, so exports are ordered by owner
+    and then ID; each owner lives in a single shard.
+
+    Returns:
+        Task fields as JSON-compatible dicts
+    """
+    exported = [task for shard in scatter_gather(_export_shard) for task in shard]
+    exported.sort(key=lambda task: (task["owner_id"], task["id"]))
+    return exported
+
+
+def main() -> None:
+    """Run an admin read from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["count", "export"])
+    args = parser.parse_args()
+
+    if args.command == "count":
+        counts = count_tasks()
+        for shard, shard_counts in enumerate(counts):
+            print(  # noqa: T201
+                f"Shard {shard}: {shard_counts.owners} owner(s), "
+                f"{shard_counts.live} live ({shard_counts.completed} completed) and "
+                f"{shard_counts.deleted} deleted task(s)"
+            )
+        print(  # noqa: T201
+            f"Total: {sum(c.owners for c in counts)} owner(s), "
+            f"{sum(c.live for c in counts)} live "
+            f"({sum(c.completed for c in counts)} completed) and "
+            f"{sum(c.deleted for c in counts)} deleted task(s)"
+        )
+    else:
+        for task in export_tasks():
+            sys.stdout.write(json.dumps(task) + "\n")
+
+
+if __name__ == "__main__":
+    main()
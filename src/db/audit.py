@@ -0,0 +1,182 @@
+"""Change log of task writes, for history and undo.
+
+Every write function records what it changed in the ``task_change`` table,
+in the same transaction as the write. Entries only hold the fields that
+changed, as ``{"field": [old, new]}``, so a checkbox toggle logs two small
+values rather than a copy of the task. Task history is reconstructed by
+replaying these diffs backwards from the current row (see
+:func:`get_task_at`), and :func:`undo_changes` reverts an owner's latest
+entries.
+
+On Postgres, updates and their log entry are sent as one statement (a
+data-modifying CTE), so logging doesn't cost an extra round trip. Other
+databases run the log insert in the same transaction.
+
+The log is pruned by age along with purged tasks (see ``src.db.purge``).
+"""
+
+from collections.abc import Mapping
+from datetime import datetime
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import Insert, Update, bindparam, insert, select
+from sqlalchemy.sql.dml import ReturningUpdate
+from sqlmodel import Session, col
+
+from src.db.tenancy import current_owner_id
+from src.models import ChangeOperation, Priority, RepeatInterval, Task, TaskChange
+
+# Task columns whose changes are logged
+TRACKED_FIELDS = (
+    "title",
+    "description",
+    "completed",
+    "completed_at",
+    "priority",
+    "due_date",
+    "start_date",
+    "time_estimate_minutes",
+    "repeat_interval",
+    "deleted_at",
+)
+
+_DATETIME_FIELDS = {"completed_at", "due_date", "start_date", "deleted_at"}
+_ENUM_FIELDS: dict[str, type[Priority] | type[RepeatInterval]] = {
+    "priority": Priority,
+    "repeat_interval": RepeatInterval,
+}
+
+
+def encode_value(value: Any) -> Any:
+    """Convert a column value to its JSON representation in the log."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def decode_value(name: str, value: Any) -> Any:
+    """Convert a logged value of the named field back to a column value."""
+    if value is None:
+        return None
+    if name in _DATETIME_FIELDS:
+        return datetime.fromisoformat(value)
+    if name in _ENUM_FIELDS:
+        return _ENUM_FIELDS[name](value)
+    return value
+
+
+def diff_fields(
+    before: Mapping[str, Any], after: Mapping[str, Any]
+) -> dict[str, list[Any]]:
+    """Build the log diff of the tracked fields that differ between two states.
+
+    Fields missing from ``after`` are unchanged.
+    """
+    return {
+        name: [encode_value(before.get(name)), encode_value(after[name])]
+        for name in TRACKED_FIELDS
+        if name in after and before.get(name) != after[name]
+    }
+
+
+def log_change(
+    session: Session,
+    task_id: int,
+    operation: ChangeOperation,
+    changes: dict[str, Any],
+    version: int | None = None,
+    undo_of: int | None = None,
+) -> None:
+    """Add a log entry to the session, to be written with its transaction."""
+    session.add(
+        TaskChange(
+            owner_id=current_owner_id(),
+            task_id=task_id,
+            operation=operation,
+            changes=changes,
+            version=version,
+            undo_of=undo_of,
+        )
+    )
+
+
+@lru_cache(maxsize=256)
+def _returning(statement: Update) -> ReturningUpdate[tuple[int, int]]:
+    return statement.returning(col(Task.id), col(Task.version))
+
+
+@lru_cache(maxsize=256)
+def _logged(statement: Update) -> Insert:
+    """Wrap an UPDATE in a CTE that also inserts its log entry."""
+    columns = TaskChange.metadata.tables[TaskChange.__tablename__].c
+    updated = _returning(statement).cte("updated")
+    return (
+        insert(TaskChange)
+        .from_select(
+            [
+                "owner_id",
+                "task_id",
+                "operation",
+                "changes",
+                "version",
+                "undo_of",
+                "changed_at",
+            ],
+            select(
+                bindparam("log_owner_id", type_=columns.owner_id.type),
+                updated.c.id,
+                bindparam("log_operation", type_=columns.operation.type),
+                bindparam("log_changes", type_=columns.changes.type),
+                updated.c.version,
+                bindparam("log_undo_of", type_=columns.undo_of.type),
+                bindparam("log_changed_at", type_=columns.changed_at.type),
+            ),
+        )
+        .returning(col(TaskChange.version))
+    )
+
+
+def update_logged(
+    session: Session,
+    statement: Update,
+    operation: ChangeOperation,
+    changes: dict[str, Any],
+    undo_of: int | None = None,
+    params: Mapping[str, Any] | None = None,
+) -> int | None:
+    """Run an UPDATE of a single task and log it.
+
+    The statement is wrapped for logging once and reused, so pre-built
+    statements (see ``src.db.statements``) stay cheap to run.
+
+    Args:
+        session: Open database session
+        statement: UPDATE of the ``task`` table matching at most one row
+        operation: Operation to log
+        changes: Log diff of the update
+        undo_of: ID of the change the update reverts
+        params: Values of the statement's bound parameters
+
+    Returns:
+        Version of the task after the update, or None if no row matched
+        (nothing is logged then)
+    """
+    params = dict(params or {})
+    if session.get_bind().dialect.name != "postgresql":
+        row = session.exec(_returning(statement), params=params).first()
+        if row is None:
+            return None
+        task_id: int = row.id
+        version: int = row.version
+        log_change(session, task_id, operation, changes, version, undo_of)
+        return version
+
+    params.update(
+        log_owner_id=current_owner_id(),
+        log_operation=operation,
+        log_changes=changes,
+        log_undo_of=undo_of,
+        log_changed_at=datetime.now(),
+    )
+    return session.exec(_logged(statement), params=params).scalar()
@@ -0,0 +1,267 @@
+"""Batch job that finds and removes duplicate tasks.
+
+Exact duplicates are tasks of the same owner with the same title hash,
+found with one ``GROUP BY``. Near duplicates are pairs of tasks sharing an
+LSH band bucket (see ``src.similarity``), found by joining the
+``task_signature`` table with itself, and confirmed by comparing the
+titles. Neither step compares every pair of tasks, so the job scales
+roughly with the number of tasks rather than its square.
+
+Duplicates are merged into groups; removing them soft-deletes every task
+of a group but the oldest, so the removal shows up in the change log and
+can be undone.
+
+With sharding, each shard is deduplicated in turn. Run it periodically or
+after imports::
+
+    python -m src.db.dedupe --backfill --apply
+"""
+
+import argparse
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, delete, select, update
+
+from src.db.engine import get_session
+from src.db.functions.delete_task import delete_task
+from src.db.retry import retry_transient
+from src.db.sharding import shard_count, shard_scope
+from src.db.tenancy import all_owners_scope, owner_scope
+from src.models import Task, TaskSignature
+from src.settings import get_settings
+from src.similarity import jaccard, shingles, title_buckets, title_hash
+
+# Task IDs per query when loading titles of candidate pairs
+_TITLE_BATCH_SIZE = 1000
+
+
+def store_signature(
+    session: Session, task_id: int, owner_id: int, title: str, replace: bool = False
+) -> None:
+    """Store the band buckets of a task's title.
+
+    Args:
+        session: Session to write in
+        task_id: ID of the task
+        owner_id: Owner of the task
+        title: Title to hash
+        replace: Delete buckets stored for an earlier title first; new tasks
+            have none, so only edits need it
+    """
+    if replace:
+        session.exec(delete(TaskSignature).where(col(TaskSignature.task_id) == task_id))
+    rows = [
+        {"task_id": task_id, "band": band, "bucket": bucket, "owner_id": owner_id}
+        for band, bucket in enumerate(title_buckets(title))
+    ]
+    session.execute(insert(TaskSignature), rows)
+
+
+@retry_transient()
+def backfill_signatures(batch_size: int = 500) -> int:
+    """Hash titles of tasks created before duplicate detection existed.
+
+    Returns:
+        Number of tasks processed; call again until it returns 0
+    """
+    with all_owners_scope(), get_session() as session:
+        tasks = session.exec(
+            select(Task.id, Task.owner_id, Task.title)
+            .where(col(Task.title_hash).is_(None))
+            .limit(batch_size)
+        ).all()
+        for task_id, owner_id, title in tasks:
+            if task_id is None:
+                continue
+            session.exec(
+                update(Task)
+                .where(col(Task.id) == task_id)
+                .values(title_hash=title_hash(title))
+                .execution_options(synchronize_session=False)
+            )
+            store_signature(session, task_id, owner_id, title, replace=True)
+
+    return len(tasks)
+
+
+@dataclass
+class DuplicateGroup:
+    """Tasks of one owner that duplicate each other, oldest first."""
+
+    owner_id: int
+    task_ids: list[int]
+
+
+class _DisjointSet:
+    """Union-find over task IDs."""
+
+    def __init__(self) -> None:
+        self.parent: dict[int, int] = {}
+
+    def find(self, item: int) -> int:
+        root = self.parent.setdefault(item, item)
+        while root != self.parent[root]:
+            root = self.parent[root]
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, a: int, b: int) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # Keep the oldest task as the root
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+
+def _load_titles(session: Session, task_ids: Iterable[int]) -> dict[int, str]:
+    ids = list(task_ids)
+    titles: dict[int, str] = {}
+    for start in range(0, len(ids), _TITLE_BATCH_SIZE):
+        rows = session.exec(
+            select(Task.id, Task.title).where(
+                col(Task.id).in_(ids[start : start + _TITLE_BATCH_SIZE]),
+                col(Task.deleted_at).is_(None),
+            )
+        ).all()
+        titles.update({task_id: title for task_id, title in rows if task_id})
+    return titles
+
+
+def find_duplicate_groups(threshold: float | None = None) -> list[DuplicateGroup]:
+    """Find groups of duplicate live tasks across all owners.
+
+    Args:
+        threshold: Minimum trigram similarity of near duplicates
+            (default ``duplicate_similarity_threshold``)
+
+    Returns:
+        Groups of two or more tasks, ordered by their oldest task
+    """
+    if threshold is None:
+        threshold = get_settings().duplicate_similarity_threshold
+
+    groups = _DisjointSet()
+    owners: dict[int, int] = {}
+
+    with all_owners_scope(), get_session(read_only=True) as session:
+        duplicated = (
+            select(Task.owner_id, Task.title_hash)
+            .where(col(Task.deleted_at).is_(None), col(Task.title_hash).is_not(None))
+            .group_by(col(Task.owner_id), col(Task.title_hash))
+            .having(func.count() > 1)
+            .subquery()
+        )
+        exact = session.exec(
+            select(Task.id, Task.owner_id, Task.title_hash)
+            .join(
+                duplicated,
+                (col(Task.owner_id) == duplicated.c.owner_id)
+                & (col(Task.title_hash) == duplicated.c.title_hash),
+            )
+            .where(col(Task.deleted_at).is_(None))
+            .order_by(col(Task.owner_id), col(Task.title_hash), col(Task.id))
+        )
+        first_of_hash: dict[tuple[int, str | None], int] = {}
+        for task_id, owner_id, hashed in exact:
+            if task_id is None:
+                continue
+            owners[task_id] = owner_id
+            oldest = first_of_hash.setdefault((owner_id, hashed), task_id)
+            groups.union(oldest, task_id)
+
+        a = aliased(TaskSignature)
+        b = aliased(TaskSignature)
+        pairs = session.exec(
+            select(a.task_id, b.task_id, a.owner_id)
+            .join(
+                b,
+                (col(a.owner_id) == col(b.owner_id))
+                & (col(a.band) == col(b.band))
+                & (col(a.bucket) == col(b.bucket))
+                & (col(a.task_id) < col(b.task_id)),
+            )
+            .distinct()
+            .execution_options(yield_per=10_000)
+        )
+        candidates = []
+        for first_id, second_id, owner_id in pairs:
+            if groups.find(first_id) != groups.find(second_id):
+                candidates.append((first_id, second_id, owner_id))
+
+        titles = _load_titles(
+            session, {task_id for pair in candidates for task_id in pair[:2]}
+        )
+
+    shingle_sets: dict[int, set[str]] = {}
+    for first_id, second_id, owner_id in candidates:
+        if first_id not in titles or second_id not in titles:
+            continue  # deleted since its signature was stored
+        if groups.find(first_id) == groups.find(second_id):
+            continue
+        for task_id in (first_id, second_id):
+            if task_id not in shingle_sets:
+                shingle_sets[task_id] = shingles(titles[task_id])
+        if jaccard(shingle_sets[first_id], shingle_sets[second_id]) >= threshold:
+            owners[first_id] = owners[second_id] = owner_id
+            groups.union(first_id, second_id)
+
+    members: dict[int, list[int]] = {}
+    for task_id in owners:
+        members.setdefault(groups.find(task_id), []).append(task_id)
+    return [
+        DuplicateGroup(owners[root], sorted(task_ids))
+        for root, task_ids in sorted(members.items())
+        if len(task_ids) > 1
+    ]
+
+
+def remove_duplicates(groups: Iterable[DuplicateGroup]) -> int:
+    """Soft-delete every task of each group except the oldest.
+
+    Returns:
+        Number of tasks deleted
+    """
+    deleted = 0
+    for group in groups:
+        with owner_scope(group.owner_id):
+            for task_id in group.task_ids[1:]:
+                deleted += delete_task(task_id)
+    return deleted
+
+
+def main() -> None:
+    """Run the dedupe job from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold", type=float, default=None)
+    parser.add_argument(
+        "--backfill", action="store_true", help="hash titles of older tasks first"
+    )
+    parser.add_argument(
+        "--apply", action="store_true", help="delete all but the oldest duplicate"
+    )
+    args = parser.parse_args()
+
+    for shard in range(shard_count()):
+        prefix = f"Shard {shard}: " if shard_count() > 1 else ""
+        with shard_scope(shard):
+            if args.backfill:
+                backfilled = 0
+                while processed := backfill_signatures():
+                    backfilled += processed
+                print(f"{prefix}Hashed {backfilled} task title(s)")  # noqa: T201
+
+            groups = find_duplicate_groups(args.threshold)
+            duplicates = sum(len(group.task_ids) - 1 for group in groups)
+            print(  # noqa: T201
+                f"{prefix}Found {len(groups)} group(s) "
+                f"with {duplicates} duplicate task(s)"
+            )
+            if args.apply:
+                print(f"{prefix}Deleted {remove_duplicates(groups)} task(s)")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,270 @@
 """Database engine and session management."""
 
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator
+from contextvars import ContextVar
+from typing import Any, Generator, cast
 
+from sqlalchemy import URL, event, make_url
 from sqlalchemy.engine import Engine
+from sqlalchemy.engine.default import DefaultDialect
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.pool import NullPool, Pool, PoolProxiedConnection, QueuePool
 from sqlmodel import Session, create_engine
 
-from src.settings import settings
+from src.db.sharding import current_shard, sharding_enabled
+from src.db.tenancy import apply_row_level_security
+from src.metrics import gauge, histogram
+from src.settings import get_settings
 
-# Module-level engine singleton
+pool_checkout_seconds = histogram(
+    "todo_db_pool_checkout_seconds",
+    "Time to check a connection out of the pool, including the pre-ping.",
+    ["database"],
+)
+pool_connections_in_use = gauge(
+    "todo_db_pool_connections_in_use",
+    "Connections checked out of the pool.",
+    ["database"],
+)
+
+# Module-level engine singletons
 _engine: Engine | None = None
+_replica_engine: Engine | None = None
+_shard_engines: dict[int, Engine] = {}
+_engine_lock = threading.Lock()
+# Pool classes by base class and database, see _timed_pool_class
+_timed_pool_classes: dict[tuple[type[Pool], str], type[Pool]] = {}
+
+
+class RoutingState:
+    """Tracks when a user last wrote, to keep their reads on the primary.
+
+    Replicas lag behind the primary, so a user who just created or edited a
+    task reads from the primary for a short window afterwards to see their
+    own write.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a state that has never written."""
+        self.last_write_at: float | None = None
+
+    def mark_write(self) -> None:
+        """Record that a write was just committed."""
+        self.last_write_at = time.monotonic()
+
+    def wrote_within(self, seconds: float) -> bool:
+        """Check whether a write was committed in the last ``seconds``."""
+        if self.last_write_at is None:
+            return False
+        return time.monotonic() - self.last_write_at < seconds
+
+
+_routing_state: ContextVar[RoutingState | None] = ContextVar(
+    "routing_state", default=None
+)
+
+
+def bind_routing_state(state: RoutingState) -> None:
+    """Use the given routing state for sessions opened in the current context.
+
+    Streamlit apps bind a state kept in ``st.session_state`` at the top of
+    every rerun, so stickiness follows the browser session rather than the
+    script thread.
+    """
+    _routing_state.set(state)
+
+
+def get_routing_state() -> RoutingState:
+    """Get the routing state of the current context, creating one if needed."""
+    state = _routing_state.get()
+    if state is None:
+        state = RoutingState()
+        _routing_state.set(state)
+    return state
+
+
+def _connect_args(url: str) -> dict[str, Any]:
+    """Driver options for connections to the given database."""
+    if make_url(url).get_driver_name() != "psycopg":
+        return {}
+    if get_settings().database_pgbouncer:
+        # A prepared statement lives on one server connection, which
+        # PgBouncer hands to another client after every transaction
+        return {"prepare_threshold": None}
+    # psycopg 3 prepares statements it has run this often on the server,
+    # per connection; the hot functions always send the same SQL text (see
+    # src.db.statements), so each is prepared once and then only bound
+    threshold = get_settings().database_prepare_threshold
+    return {"prepare_threshold": threshold if threshold >= 0 else None}
+
+
+def _timed_pool_class(base: type[Pool], database: str) -> type[Pool]:
+    """Subclass a pool class to time its checkouts.
+
+    There is no pool event before a checkout, so ``connect`` is wrapped
+    instead; disposing an engine recreates its pool with the same class,
+    which keeps the timing.
+    """
+    pool_class = _timed_pool_classes.get((base, database))
+    if pool_class is not None:
+        return pool_class
+    seconds = pool_checkout_seconds.labels(database)
+
+    def connect(self: Pool) -> PoolProxiedConnection:
+        start = time.perf_counter()
+        try:
+            return base.connect(self)
+        finally:
+            seconds.observe(time.perf_counter() - start)
+
+    pool_class = type(f"Timed{base.__name__}", (base,), {"connect": connect})
+    _timed_pool_classes[base, database] = pool_class
+    return pool_class
+
+
+def _pool_options(url: URL) -> tuple[type[Pool], dict[str, Any]]:
+    """Pool class and options for engines of the given database.
+
+    Behind PgBouncer in transaction mode, PgBouncer does the pooling: a
+    client-side pool would only hold server connections idle in between.
+    """
+    settings = get_settings()
+    if not settings.database_pgbouncer:
+        dialect = cast(type[DefaultDialect], url.get_dialect())
+        # Verify connections before using
+        return dialect.get_pool_class(url), {"pool_pre_ping": True}
+    if settings.database_pool_size <= 0:
+        # Connecting to PgBouncer is cheap, and a new connection needs no ping
+        return NullPool, {}
+    return QueuePool, {
+        "pool_size": settings.database_pool_size,
+        "max_overflow": 0,
+        "pool_pre_ping": True,
+    }
+
+
+def _create_engine(url: str) -> Engine:
+    parsed = make_url(url)
+    # Metrics are labelled with the URL, without its password
+    database = parsed.render_as_string(hide_password=True)
+    pool_class, pool_options = _pool_options(parsed)
+    engine = create_engine(
+        url,
+        echo=get_settings().database_echo,
+        connect_args=_connect_args(url),
+        poolclass=_timed_pool_class(pool_class, database),
+        **pool_options,
+    )
+    in_use = pool_connections_in_use.labels(database)
+    event.listen(engine, "checkout", lambda *_args: in_use.inc())
+    event.listen(engine, "checkin", lambda *_args: in_use.dec())
+    return engine
+
+
+def get_shard_engine(shard: int) -> Engine:
+    """Get or create the engine of one of the ``database_shard_urls``."""
+    engine = _shard_engines.get(shard)
+    if engine is None:
+        with _engine_lock:
+            engine = _shard_engines.get(shard)
+            if engine is None:
+                url = get_settings().database_shard_urls[shard]
+                engine = _shard_engines[shard] = _create_engine(url)
+    return engine
 
 
 def get_engine() -> Engine:
     """Get or create the database engine singleton.
 
     This ensures connection pooling works properly by reusing
-    the same engine across all database sessions.
+    the same engine across all database sessions. Creation is guarded by a
+    lock because Streamlit runs each browser session in its own thread.
+
+    With sharding configured, this is the engine of the current shard (see
+    ``src.db.sharding``).
     """
+    if sharding_enabled():
+        return get_shard_engine(current_shard())
+
     global _engine
     if _engine is None:
-        _engine = create_engine(
-            settings.database_url,
-            echo=settings.database_echo,
-            pool_pre_ping=True,  # Verify connections before using
-        )
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine(get_settings().database_url)
     return _engine
 
 
+def get_replica_engine() -> Engine:
+    """Get or create the read-replica engine singleton.
+
+    Falls back to the primary engine when no replica is configured, and
+    when sharding is on: shards don't have replicas.
+    """
+    global _replica_engine
+    replica_url = get_settings().database_replica_url
+    if replica_url is None or sharding_enabled():
+        return get_engine()
+    if _replica_engine is None:
+        with _engine_lock:
+            if _replica_engine is None:
+                _replica_engine = _create_engine(replica_url)
+    return _replica_engine
+
+
 @contextmanager
-def get_session() -> Generator[Session, None, None]:
+def get_session(read_only: bool = False) -> Generator[Session, None, None]:
     """Context manager for database sessions.
 
     Automatically commits on success and rolls back on exceptions.
-    Always closes the session properly.
+    Always closes the session properly. Database functions flush rather
+    than commit, so each runs in this one transaction: behind PgBouncer in
+    transaction mode, a call holds a server connection once and relies on
+    no state left on it.
+
+    Args:
+        read_only: Route the session to the read replica, unless the current
+            user wrote within the last ``replica_stickiness_seconds``
+
+    A committed session counts as a write for the routing state only if it
+    flushed changes or executed an INSERT, UPDATE or DELETE. Statements run
+    on ``session.connection()`` directly aren't seen; callers writing that
+    way mark the write themselves.
     """
-    engine = get_engine()
+    state = get_routing_state()
+    stickiness = get_settings().replica_stickiness_seconds
+    if read_only and not state.wrote_within(stickiness):
+        engine = get_replica_engine()
+    else:
+        engine = get_engine()
+
     session = Session(engine)
+    if get_settings().row_level_security and engine.dialect.name == "postgresql":
+        # Scope every transaction the session begins
+        event.listen(
+            session,
+            "after_begin",
+            lambda session, transaction, connection: apply_row_level_security(
+                connection
+            ),
+        )
+    wrote = False
+
+    def flushed(session: Session, flush_context: Any) -> None:
+        nonlocal wrote
+        wrote = True
+
+    def executed(execute_state: ORMExecuteState) -> None:
+        nonlocal wrote
+        wrote = wrote or (
+            execute_state.is_insert
+            or execute_state.is_update
+            or execute_state.is_delete
+        )
+
+    event.listen(session, "after_flush", flushed)
+    event.listen(session, "do_orm_execute", executed)
     try:
         yield session
         session.commit()
@@ -45,3 +273,6 @@ def get_session() -> Generator[Session, None, None]:
         raise
     finally:
         session.close()
+
+    if wrote:
+        state.mark_write()
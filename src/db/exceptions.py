@@ -0,0 +1,53 @@
+"""Exceptions raised by the database layer."""
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from src.db.functions.find_duplicates import DuplicateMatch
+
+
+class StaleTaskError(Exception):
+    """Raised when a task was modified by someone else since it was read.
+
+    Attributes:
+        task_id: ID of the task that could not be updated
+        expected_version: Version the caller based its edit on
+        current_version: Version currently stored in the database
+    """
+
+    def __init__(self, task_id: int, expected_version: int, current_version: int):
+        """Initialize the error with the conflicting versions."""
+        super().__init__(
+            f"Task with id {task_id} was modified concurrently "
+            f"(expected version {expected_version}, found {current_version})"
+        )
+        self.task_id = task_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+class WriteBehindFullError(Exception):
+    """Raised when the write-behind queue stayed full for too long.
+
+    The worker isn't keeping up with incoming edits, e.g. because the
+    database is down. Callers should surface the error rather than keep
+    queueing edits that may never be written.
+    """
+
+
+class DuplicateTaskError(Exception):
+    """Raised when creating a task that duplicates existing ones.
+
+    Attributes:
+        title: Title of the rejected task
+        matches: Existing tasks with the same or a similar title
+    """
+
+    def __init__(self, title: str, matches: list["DuplicateMatch"]):
+        """Initialize the error with the matching tasks."""
+        super().__init__(
+            f"Task '{title}' duplicates "
+            + ", ".join(f"'{match.title}' (id {match.task_id})" for match in matches)
+        )
+        self.title = title
+        self.matches = matches
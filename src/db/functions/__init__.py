@@ -1,21 +1,11 @@
-"""Database CRUD functions."""
+"""Database CRUD functions.
 
-from src.db.functions.add_tag_to_task import add_tag_to_task
-from src.db.functions.create_tag import create_tag
-from src.db.functions.create_task import create_task
-from src.db.functions.delete_task import delete_task
-from src.db.functions.edit_task import edit_task
-from src.db.functions.list_tags import list_tags
-from src.db.functions.list_tasks import list_tasks
-from src.db.functions.remove_tag_from_task import remove_tag_from_task
+Each function lives in its own module of the same name, which callers
+import directly so they only pay for the functions they use::
 
-__all__ = [
-    "create_task",
-    "list_tasks",
-    "edit_task",
-    "delete_task",
-    "create_tag",
-    "list_tags",
-    "add_tag_to_task",
-    "remove_tag_from_task",
-]
+    from src.db.functions.create_task import create_task
+
+The package itself re-exports nothing: a lazy re-export of ``create_task``
+would be shadowed by the ``create_task`` submodule as soon as anything
+imported it.
+"""
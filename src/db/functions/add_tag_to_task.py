@@ -1,11 +1,18 @@
 """Add tag to task database function."""
 
-from sqlmodel import select
+from datetime import datetime
 
+from src.db.audit import log_change
 from src.db.engine import get_session
-from src.models import Tag, Task
+from src.db.retry import retry_transient
+from src.db.statements import TAG_BY_ID, TASK_BY_ID_FOR_UPDATE
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation, Tag, Task
 
 
+@timed
+@retry_transient(idempotent=False)
 def add_tag_to_task(task_id: int, tag_id: int) -> Task:
     """Add a tag to a task.
 
@@ -19,25 +26,44 @@ def add_tag_to_task(task_id: int, tag_id: int) -> Task:
     Raises:
         ValueError: If task or tag doesn't exist
     """
+    owner_id = current_owner_id()
     with get_session() as session:
-        task = session.exec(select(Task).where(Task.id == task_id)).first()
+        # Locked, so concurrent tag changes to it rewrite tag_ids in turn
+        task = session.exec(
+            TASK_BY_ID_FOR_UPDATE, params={"task_id": task_id, "owner": owner_id}
+        ).first()
         if not task:
             raise ValueError(f"Task with id {task_id} not found")
 
-        tag = session.exec(select(Tag).where(Tag.id == tag_id)).first()
+        tag = session.exec(
+            TAG_BY_ID, params={"tag_id": tag_id, "owner": owner_id}
+        ).first()
         if not tag:
             raise ValueError(f"Tag with id {tag_id} not found")
 
         if tag not in task.tags:
             task.tags.append(tag)
+            task.tag_ids = sorted(t.id for t in task.tags if t.id is not None)
+            # A tag change is a change of the task: clients holding the old
+            # version must refetch it before editing
+            task.version += 1
+            task.updated_at = datetime.now()
+            log_change(
+                session,
+                task_id,
+                ChangeOperation.TAG,
+                {"tag_id": tag_id},
+                version=task.version,
+            )
             session.add(task)
-            session.commit()
+            session.flush()
             session.refresh(task)
 
         # Convert to detached instance with tags
         task_data = {
             "id": task.id,
             "title": task.title,
+            "title_hash": task.title_hash,
             "description": task.description,
             "completed": task.completed,
             "priority": task.priority,
@@ -48,6 +74,9 @@ def add_tag_to_task(task_id: int, tag_id: int) -> Task:
             "completed_at": task.completed_at,
             "time_estimate_minutes": task.time_estimate_minutes,
             "repeat_interval": task.repeat_interval,
+            "version": task.version,
+            "owner_id": task.owner_id,
+            "tag_ids": task.tag_ids,
         }
 
         # Create detached task
@@ -60,6 +89,7 @@ def add_tag_to_task(task_id: int, tag_id: int) -> Task:
                 "id": t.id,
                 "name": t.name,
                 "color": t.color,
+                "owner_id": t.owner_id,
             }
             detached_tags.append(Tag(**tag_data))
 
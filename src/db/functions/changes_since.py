@@ -0,0 +1,157 @@
+"""Changes since database function."""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlmodel import Session, col, func, select
+
+from src.db.engine import get_session
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Tag, Task, TaskChange, TaskTagLink
+from src.settings import get_settings
+
+
+@dataclass
+class ChangeSet:
+    """Changes to the current owner's tasks after a sync cursor."""
+
+    cursor: int  # pass to the next call to get the changes after these
+    tasks: list[Task]  # created or changed live tasks, with their tags
+    deleted_task_ids: list[int]  # tombstones: deleted or purged since
+    snapshot: bool  # tasks holds every live task; drop any other local copy
+    has_more: bool  # call again straight away for the rest
+
+
+def _load_tasks(
+    session: Session, owner_id: int, task_ids: list[int] | None
+) -> list[Task]:
+    """Load detached tasks with their tags, all live ones if ``task_ids`` is None."""
+    statement = select(Task).where(Task.owner_id == owner_id)
+    links = select(TaskTagLink.task_id, Tag).join(
+        Tag, col(Tag.id) == col(TaskTagLink.tag_id)
+    )
+    if task_ids is None:
+        statement = statement.where(col(Task.deleted_at).is_(None))
+        links = links.where(TaskTagLink.owner_id == owner_id)
+    else:
+        statement = statement.where(col(Task.id).in_(task_ids))
+        links = links.where(
+            TaskTagLink.owner_id == owner_id, col(TaskTagLink.task_id).in_(task_ids)
+        )
+
+    tags: dict[int, list[Tag]] = {}
+    for task_id, tag in session.exec(links):
+        tags.setdefault(task_id, []).append(
+            Tag(id=tag.id, name=tag.name, color=tag.color, owner_id=tag.owner_id)
+        )
+
+    result = []
+    for task in session.exec(statement.order_by(col(Task.id))):
+        task_data = {
+            "id": task.id,
+            "title": task.title,
+            "title_hash": task.title_hash,
+            "description": task.description,
+            "completed": task.completed,
+            "priority": task.priority,
+            "created_at": task.created_at,
+            "updated_at": task.updated_at,
+            "due_date": task.due_date,
+            "start_date": task.start_date,
+            "completed_at": task.completed_at,
+            "time_estimate_minutes": task.time_estimate_minutes,
+            "repeat_interval": task.repeat_interval,
+            "version": task.version,
+            "owner_id": task.owner_id,
+            "tag_ids": task.tag_ids,
+            "deleted_at": task.deleted_at,
+        }
+        detached_task = Task(**task_data)
+        if task.id is not None:
+            detached_task.tags = tags.get(task.id, [])
+        result.append(detached_task)
+    return result
+
+
+@timed
+def changes_since(cursor: int | None = None, limit: int = 500) -> ChangeSet:
+    """Get what changed in the current owner's tasks since a sync cursor.
+
+    Changes are read from the change log (see ``src.db.audit``), whose IDs
+    form a monotonic sequence served by the index on ``(owner_id, id)``,
+    so a sync costs in proportion to the changes rather than to the table.
+    Each changed task is returned in its current state, or as a tombstone
+    if it has been deleted.
+
+    Log entries only become visible when their transaction commits, which
+    isn't always in ID order. The returned cursor therefore stops short of
+    entries younger than ``sync_settle_seconds``; they are sent again on
+    the next call, and applying a change twice is harmless. Transactions
+    that take longer than that to commit can be missed.
+
+    Without a cursor, when the log entries after it have been pruned, or
+    when it is ahead of the log because the log was replaced (by a snapshot
+    restore or a move to another shard), a snapshot of every live task is
+    returned instead.
+
+    Args:
+        cursor: Cursor returned by the previous call (None = start over)
+        limit: Maximum number of log entries to read
+
+    Returns:
+        Changed tasks, deleted task IDs and the cursor to continue from
+    """
+    owner_id = current_owner_id()
+    settled_before = datetime.now() - timedelta(
+        seconds=get_settings().sync_settle_seconds
+    )
+
+    with get_session(read_only=True) as session:
+        if cursor is not None:
+            oldest, newest = session.exec(
+                select(func.min(TaskChange.id), func.max(TaskChange.id))
+            ).one()
+            if oldest is not None and oldest > cursor + 1:
+                cursor = None  # the changes after it were pruned
+            elif cursor > (newest or 0):
+                cursor = None  # the log was replaced and its IDs started over
+
+        if cursor is None:
+            # Read the cursor before the tasks, so they're at least as new
+            high_water = session.exec(
+                select(func.max(TaskChange.id)).where(
+                    col(TaskChange.changed_at) < settled_before
+                )
+            ).one()
+            tasks = _load_tasks(session, owner_id, None)
+            return ChangeSet(high_water or 0, tasks, [], snapshot=True, has_more=False)
+
+        entries = session.exec(
+            select(TaskChange.id, TaskChange.task_id, TaskChange.changed_at)
+            .where(TaskChange.owner_id == owner_id, col(TaskChange.id) > cursor)
+            .order_by(col(TaskChange.id))
+            .limit(limit + 1)
+        ).all()
+        more = len(entries) > limit
+        entries = entries[:limit]
+
+        next_cursor = cursor
+        for entry_id, _task_id, changed_at in entries:
+            if entry_id is None or changed_at >= settled_before:
+                break
+            next_cursor = entry_id
+
+        task_ids = list(dict.fromkeys(task_id for _id, task_id, _at in entries))
+        changed = _load_tasks(session, owner_id, task_ids) if task_ids else []
+
+    live = [task for task in changed if task.deleted_at is None]
+    live_ids = {task.id for task in live}
+    return ChangeSet(
+        cursor=next_cursor,
+        tasks=live,
+        deleted_task_ids=[task_id for task_id in task_ids if task_id not in live_ids],
+        snapshot=False,
+        # Unsettled entries hold the cursor back; wait for them to settle
+        has_more=more and bool(entries) and next_cursor == entries[-1][0],
+    )
@@ -1,9 +1,15 @@
 """Create tag database function."""
 
 from src.db.engine import get_session
+from src.db.retry import retry_transient
+from src.db.tag_cache import tag_cache
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
 from src.models import Tag
 
 
+@timed
+@retry_transient(idempotent=False)
 def create_tag(name: str, color: str = "#808080") -> Tag:
     """Create a new tag.
 
@@ -14,11 +20,11 @@ def create_tag(name: str, color: str = "#808080") -> Tag:
     Returns:
         Created Tag object
     """
-    tag = Tag(name=name, color=color)
+    tag = Tag(name=name, color=color, owner_id=current_owner_id())
 
     with get_session() as session:
         session.add(tag)
-        session.commit()
+        session.flush()
         session.refresh(tag)
 
         # Convert to detached instance
@@ -26,6 +32,11 @@ def create_tag(name: str, color: str = "#808080") -> Tag:
             "id": tag.id,
             "name": tag.name,
             "color": tag.color,
+            "owner_id": tag.owner_id,
         }
 
-    return Tag(**tag_data)
+    detached_tag = Tag(**tag_data)
+    if detached_tag.id is not None:
+        tag_cache.put(detached_tag.owner_id, detached_tag.name, detached_tag.id)
+
+    return detached_tag
@@ -2,10 +2,20 @@
 
 from datetime import datetime
 
+from src.db.audit import TRACKED_FIELDS, diff_fields, log_change
+from src.db.dedupe import store_signature
 from src.db.engine import get_session
-from src.models import Priority, RepeatInterval, Task
+from src.db.exceptions import DuplicateTaskError
+from src.db.functions.find_duplicates import find_duplicates
+from src.db.retry import retry_transient
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation, Priority, RepeatInterval, Task
+from src.similarity import title_hash
 
 
+@timed
+@retry_transient(idempotent=False)
 def create_task(
     title: str,
     description: str | None = None,
@@ -14,6 +24,7 @@ def create_task(
     start_date: datetime | None = None,
     time_estimate_minutes: int | None = None,
     repeat_interval: RepeatInterval | None = None,
+    reject_duplicates: bool = False,
 ) -> Task:
     """Create a new task in the database.
 
@@ -25,12 +36,24 @@ def create_task(
         start_date: When to start the task
         time_estimate_minutes: Estimated time to complete
         repeat_interval: How often task repeats
+        reject_duplicates: Refuse to create the task if the owner already
+            has one with the same or a similar title (see find_duplicates)
 
     Returns:
         Created Task object with assigned ID
+
+    Raises:
+        DuplicateTaskError: If reject_duplicates is set and duplicates exist
     """
+    if reject_duplicates:
+        matches = find_duplicates(title)
+        if matches:
+            raise DuplicateTaskError(title, matches)
+
     task = Task(
+        owner_id=current_owner_id(),
         title=title,
+        title_hash=title_hash(title),
         description=description,
         priority=priority,
         due_date=due_date,
@@ -41,7 +64,18 @@ def create_task(
 
     with get_session() as session:
         session.add(task)
-        session.commit()
+        session.flush()
+        assert task.id is not None
+        created = {name: getattr(task, name) for name in TRACKED_FIELDS}
+        log_change(
+            session,
+            task.id,
+            ChangeOperation.CREATE,
+            diff_fields({}, created),
+            task.version,
+        )
+        store_signature(session, task.id, task.owner_id, title)
+        session.flush()
         session.refresh(task)
 
         # Access attributes while session is still open to avoid DetachedInstanceError
@@ -49,6 +83,7 @@ def create_task(
         task_data = {
             "id": task_id,
             "title": task.title,
+            "title_hash": task.title_hash,
             "description": task.description,
             "completed": task.completed,
             "priority": task.priority,
@@ -59,6 +94,9 @@ def create_task(
             "completed_at": task.completed_at,
             "time_estimate_minutes": task.time_estimate_minutes,
             "repeat_interval": task.repeat_interval,
+            "version": task.version,
+            "owner_id": task.owner_id,
+            "tag_ids": task.tag_ids,
         }
 
     # Create a new detached instance with the same data
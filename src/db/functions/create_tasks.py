@@ -0,0 +1,134 @@
+"""Batch create tasks database function."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import insert
+
+from src.db.audit import TRACKED_FIELDS, diff_fields, log_change
+from src.db.engine import get_session
+from src.db.functions.get_or_create_tags import _create_missing
+from src.db.retry import retry_transient
+from src.db.tag_cache import tag_cache
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import (
+    ChangeOperation,
+    Priority,
+    RepeatInterval,
+    Task,
+    TaskSignature,
+    TaskTagLink,
+)
+from src.similarity import title_buckets, title_hash
+
+
+@dataclass
+class NewTask:
+    """A task to create within a batch, mirroring the arguments of create_task."""
+
+    title: str
+    description: str | None = None
+    priority: Priority = Priority.MEDIUM
+    due_date: datetime | None = None
+    start_date: datetime | None = None
+    time_estimate_minutes: int | None = None
+    repeat_interval: RepeatInterval | None = None
+    # Tag names, created if the owner doesn't have them yet
+    tags: list[str] = field(default_factory=list)
+
+
+@timed
+@retry_transient(idempotent=False)
+def create_tasks(tasks: Sequence[NewTask], tag_color: str = "#808080") -> list[Task]:
+    """Create several tasks and attach their tags in a single transaction.
+
+    Missing tags are created first, in one statement. Tasks are then
+    inserted together, with their ``tag_ids``, followed by their
+    duplicate-detection signatures, tag links and change log entries, each
+    in one batched statement. Titles are not checked for duplicates.
+
+    Args:
+        tasks: Tasks to create, in order
+        tag_color: Hex color code for new tags (default gray)
+
+    Returns:
+        Created Task objects with assigned IDs, in the given order
+
+    Raises:
+        ValueError: If a tag could not be created
+    """
+    if not tasks:
+        return []
+
+    owner_id = current_owner_id()
+    names = list(dict.fromkeys(name for task in tasks for name in task.tags))
+    tag_ids = tag_cache.get_many(owner_id, names)
+    missing = [name for name in names if name not in tag_ids]
+    rows = [
+        Task(
+            owner_id=owner_id,
+            title=task.title,
+            title_hash=title_hash(task.title),
+            description=task.description,
+            priority=task.priority,
+            due_date=task.due_date,
+            start_date=task.start_date,
+            time_estimate_minutes=task.time_estimate_minutes,
+            repeat_interval=task.repeat_interval,
+        )
+        for task in tasks
+    ]
+
+    with get_session() as session:
+        created_tags = (
+            _create_missing(session, owner_id, missing, tag_color, {})
+            if missing
+            else {}
+        )
+        tag_ids.update(created_tags)
+        for row, task in zip(rows, tasks):
+            row.tag_ids = sorted({tag_ids[name] for name in task.tags})
+
+        session.add_all(rows)
+        session.flush()
+
+        signatures: list[dict[str, int]] = []
+        links: list[dict[str, int]] = []
+        for row, task in zip(rows, tasks):
+            assert row.id is not None
+            created = {name: getattr(row, name) for name in TRACKED_FIELDS}
+            log_change(
+                session,
+                row.id,
+                ChangeOperation.CREATE,
+                diff_fields({}, created),
+                row.version,
+            )
+            signatures.extend(
+                {
+                    "task_id": row.id,
+                    "band": band,
+                    "bucket": bucket,
+                    "owner_id": owner_id,
+                }
+                for band, bucket in enumerate(title_buckets(task.title))
+            )
+            for name in dict.fromkeys(task.tags):
+                links.append(
+                    {"task_id": row.id, "tag_id": tag_ids[name], "owner_id": owner_id}
+                )
+                log_change(
+                    session, row.id, ChangeOperation.TAG, {"tag_id": tag_ids[name]}
+                )
+
+        session.execute(insert(TaskSignature), signatures)
+        if links:
+            session.execute(insert(TaskTagLink), links)
+        session.flush()
+
+        created_tasks = [Task(**row.model_dump()) for row in rows]
+
+    tag_cache.put_many(owner_id, created_tags)
+    return created_tasks
@@ -1,13 +1,24 @@
 """Delete task database function."""
 
-from sqlmodel import select
+from datetime import datetime
 
+from src.db.audit import diff_fields, update_logged
 from src.db.engine import get_session
-from src.models import Task
+from src.db.retry import retry_transient
+from src.db.statements import SOFT_DELETE
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation
 
 
+@timed
+@retry_transient(idempotent=False)
 def delete_task(task_id: int) -> bool:
-    """Delete a task from the database.
+    """Soft-delete a task.
+
+    The task is hidden from every reader straight away; the row and its tag
+    links are removed later by the purge job (see ``src.db.purge``), so a
+    deleted task can be restored until then.
 
     Args:
         task_id: ID of the task to delete
@@ -15,14 +26,14 @@ def delete_task(task_id: int) -> bool:
     Returns:
         True if task was deleted, False if task didn't exist
     """
-    with get_session() as session:
-        statement = select(Task).where(Task.id == task_id)
-        task = session.exec(statement).first()
+    now = datetime.now()
+    params = {"task_id": task_id, "owner": current_owner_id(), "now": now}
+    changes = diff_fields({}, {"deleted_at": now})
 
-        if not task:
-            return False
-
-        session.delete(task)
-        session.commit()
+    with get_session() as session:
+        version = update_logged(
+            session, SOFT_DELETE, ChangeOperation.DELETE, changes, params=params
+        )
+        deleted = version is not None
 
-    return True
+    return deleted
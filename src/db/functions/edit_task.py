@@ -1,13 +1,119 @@
 """Edit task database function."""
 
 from datetime import datetime
+from typing import Any
 
-from sqlmodel import select
+from sqlmodel import Session
 
+from src.db.audit import TRACKED_FIELDS, diff_fields, update_logged
+from src.db.dedupe import store_signature
 from src.db.engine import get_session
-from src.models import Priority, RepeatInterval, Task
+from src.db.exceptions import StaleTaskError
+from src.db.retry import retry_transient
+from src.db.statements import TASK_BY_ID_FRESH, edit_statement
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation, Priority, RepeatInterval, Task
+from src.similarity import title_hash
 
+# How often an edit without an expected version re-reads the task after losing a race
+MAX_EDIT_ATTEMPTS = 5
 
+
+def _collect_changes(
+    title: str | None = None,
+    description: str | None = None,
+    completed: bool | None = None,
+    priority: Priority | None = None,
+    due_date: datetime | None = None,
+    start_date: datetime | None = None,
+    time_estimate_minutes: int | None = None,
+    repeat_interval: RepeatInterval | None = None,
+) -> dict[str, Any]:
+    """Build the column values to update from the provided fields."""
+    changes: dict[str, Any] = {}
+    if title is not None:
+        changes["title"] = title
+        changes["title_hash"] = title_hash(title)
+    if description is not None:
+        changes["description"] = description
+    if completed is not None:
+        changes["completed"] = completed
+        changes["completed_at"] = datetime.now() if completed else None
+    if priority is not None:
+        changes["priority"] = priority
+    if due_date is not None:
+        changes["due_date"] = due_date
+    if start_date is not None:
+        changes["start_date"] = start_date
+    if time_estimate_minutes is not None:
+        changes["time_estimate_minutes"] = time_estimate_minutes
+    if repeat_interval is not None:
+        changes["repeat_interval"] = repeat_interval
+    return changes
+
+
+def _update_if_unchanged(
+    session: Session, task: Task, changes: dict[str, Any]
+) -> Task | None:
+    """Apply changes to a task only if its stored version matches the one read.
+
+    Issues a single ``UPDATE ... WHERE id = :id AND version = :version``, so
+    no row lock is held between reading the task and writing it back. The
+    fields that changed are recorded in the change log.
+
+    Args:
+        session: Open database session
+        task: Task as previously read in this session
+        changes: Column values to set
+
+    Returns:
+        Detached Task with the changes applied, or None if the task was
+        modified by someone else since it was read
+    """
+    values = {**changes, "updated_at": datetime.now(), "version": task.version + 1}
+    columns = tuple(sorted(changes))
+    params = {f"new_{name}": value for name, value in values.items()}
+    params.update(task_id=task.id, read_version=task.version)
+    before = {name: getattr(task, name) for name in TRACKED_FIELDS}
+    changed = diff_fields(before, changes)
+    version = update_logged(
+        session,
+        edit_statement(columns),
+        ChangeOperation.UPDATE,
+        changed,
+        params=params,
+    )
+    if version is None:
+        return None
+    if "title" in changes and task.id is not None:
+        store_signature(session, task.id, task.owner_id, changes["title"], replace=True)
+
+    task_data = {
+        "id": task.id,
+        "title": task.title,
+        "title_hash": task.title_hash,
+        "description": task.description,
+        "completed": task.completed,
+        "priority": task.priority,
+        "created_at": task.created_at,
+        "updated_at": task.updated_at,
+        "due_date": task.due_date,
+        "start_date": task.start_date,
+        "completed_at": task.completed_at,
+        "time_estimate_minutes": task.time_estimate_minutes,
+        "repeat_interval": task.repeat_interval,
+        "version": task.version,
+        "owner_id": task.owner_id,
+        "tag_ids": task.tag_ids,
+    }
+    task_data.update(values)
+
+    return Task(**task_data)
+
+
+@timed
+@retry_transient(idempotent=False)
 def edit_task(
     task_id: int,
     title: str | None = None,
@@ -18,9 +124,15 @@ def edit_task(
     start_date: datetime | None = None,
     time_estimate_minutes: int | None = None,
     repeat_interval: RepeatInterval | None = None,
+    expected_version: int | None = None,
 ) -> Task:
     """Edit an existing task.
 
+    The write is conditional on the task's row version. When
+    ``expected_version`` is given the edit only succeeds if nobody else
+    changed the task since the caller read it; otherwise the latest version
+    is re-read and the edit is retried a few times.
+
     Args:
         task_id: ID of the task to edit
         title: New title (if provided)
@@ -31,62 +143,48 @@ def edit_task(
         start_date: New start date (if provided)
         time_estimate_minutes: New time estimate (if provided)
         repeat_interval: New repeat interval (if provided)
+        expected_version: Version the edit is based on (if provided)
 
     Returns:
         Updated Task object
 
     Raises:
         ValueError: If task with given ID doesn't exist
+        StaleTaskError: If the task was modified concurrently
     """
+    changes = _collect_changes(
+        title=title,
+        description=description,
+        completed=completed,
+        priority=priority,
+        due_date=due_date,
+        start_date=start_date,
+        time_estimate_minutes=time_estimate_minutes,
+        repeat_interval=repeat_interval,
+    )
+
     with get_session() as session:
-        statement = select(Task).where(Task.id == task_id)
-        task = session.exec(statement).first()
-
-        if not task:
-            raise ValueError(f"Task with id {task_id} not found")
-
-        # Update fields if provided
-        if title is not None:
-            task.title = title
-        if description is not None:
-            task.description = description
-        if completed is not None:
-            task.completed = completed
-            if completed:
-                task.completed_at = datetime.now()
-            else:
-                task.completed_at = None
-        if priority is not None:
-            task.priority = priority
-        if due_date is not None:
-            task.due_date = due_date
-        if start_date is not None:
-            task.start_date = start_date
-        if time_estimate_minutes is not None:
-            task.time_estimate_minutes = time_estimate_minutes
-        if repeat_interval is not None:
-            task.repeat_interval = repeat_interval
-
-        task.updated_at = datetime.now()
-
-        session.add(task)
-        session.commit()
-        session.refresh(task)
-
-        # Convert to detached instance
-        task_data = {
-            "id": task.id,
-            "title": task.title,
-            "description": task.description,
-            "completed": task.completed,
-            "priority": task.priority,
-            "created_at": task.created_at,
-            "updated_at": task.updated_at,
-            "due_date": task.due_date,
-            "start_date": task.start_date,
-            "completed_at": task.completed_at,
-            "time_estimate_minutes": task.time_estimate_minutes,
-            "repeat_interval": task.repeat_interval,
-        }
+        params = {"task_id": task_id, "owner": current_owner_id()}
+        updated_task = None
 
-    return Task(**task_data)
+        for _ in range(MAX_EDIT_ATTEMPTS):
+            task = session.exec(TASK_BY_ID_FRESH, params=params).first()
+
+            if not task:
+                raise ValueError(f"Task with id {task_id} not found")
+
+            if expected_version is not None and task.version != expected_version:
+                raise StaleTaskError(task_id, expected_version, task.version)
+
+            read_version = task.version
+            updated_task = _update_if_unchanged(session, task, changes)
+            if updated_task is not None:
+                break
+
+        if updated_task is None:
+            current = session.exec(TASK_BY_ID_FRESH, params=params).first()
+            if current is None:
+                raise ValueError(f"Task with id {task_id} not found")
+            raise StaleTaskError(task_id, read_version, current.version)
+
+    return updated_task
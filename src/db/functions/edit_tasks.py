@@ -0,0 +1,119 @@
+"""Batch edit tasks database function."""
+
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlmodel import col, select
+
+from src.db.engine import get_session
+from src.db.exceptions import StaleTaskError
+from src.db.functions.edit_task import _collect_changes, _update_if_unchanged
+from src.db.retry import retry_transient
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Priority, RepeatInterval, Task
+
+
+@dataclass
+class TaskEdit:
+    """A single edit within a batch, mirroring the arguments of edit_task."""
+
+    task_id: int
+    expected_version: int | None = None
+    title: str | None = None
+    description: str | None = None
+    completed: bool | None = None
+    priority: Priority | None = None
+    due_date: datetime | None = None
+    start_date: datetime | None = None
+    time_estimate_minutes: int | None = None
+    repeat_interval: RepeatInterval | None = None
+
+
+@dataclass
+class EditTasksResult:
+    """Per-row outcome of a batch edit."""
+
+    updated: list[Task] = field(default_factory=list)
+    conflicts: list[StaleTaskError] = field(default_factory=list)
+    missing: list[int] = field(default_factory=list)
+
+
+@timed
+@retry_transient(idempotent=False)
+def edit_tasks(edits: Sequence[TaskEdit]) -> EditTasksResult:
+    """Apply several task edits in a single transaction.
+
+    Each edit is applied with the same version check as edit_task. A
+    conflict or missing task only skips that row; the remaining edits are
+    still committed.
+
+    Args:
+        edits: Edits to apply, in order
+
+    Returns:
+        EditTasksResult with the updated tasks, the conflicting edits and
+        the IDs of tasks that don't exist
+    """
+    result = EditTasksResult()
+    if not edits:
+        return result
+
+    task_ids = {edit.task_id for edit in edits}
+
+    with get_session() as session:
+        statement = select(Task).where(
+            col(Task.id).in_(task_ids),
+            Task.owner_id == current_owner_id(),
+            col(Task.deleted_at).is_(None),
+        )
+        tasks = {task.id: task for task in session.exec(statement).all()}
+
+        for edit in edits:
+            task = tasks.get(edit.task_id)
+            if task is None:
+                result.missing.append(edit.task_id)
+                continue
+
+            expected_version = edit.expected_version
+            if expected_version is not None and task.version != expected_version:
+                result.conflicts.append(
+                    StaleTaskError(edit.task_id, expected_version, task.version)
+                )
+                continue
+
+            changes = _collect_changes(
+                title=edit.title,
+                description=edit.description,
+                completed=edit.completed,
+                priority=edit.priority,
+                due_date=edit.due_date,
+                start_date=edit.start_date,
+                time_estimate_minutes=edit.time_estimate_minutes,
+                repeat_interval=edit.repeat_interval,
+            )
+            updated_task = _update_if_unchanged(session, task, changes)
+
+            if updated_task is None:
+                # Someone else wrote or deleted the row after we read it
+                current_version = session.exec(
+                    select(Task.version).where(
+                        Task.id == edit.task_id,
+                        Task.owner_id == current_owner_id(),
+                        col(Task.deleted_at).is_(None),
+                    )
+                ).first()
+                if current_version is None:
+                    result.missing.append(edit.task_id)
+                    continue
+                result.conflicts.append(
+                    StaleTaskError(edit.task_id, task.version, current_version)
+                )
+                continue
+
+            # Later edits of the same task build on this one
+            tasks[edit.task_id] = updated_task
+            result.updated.append(updated_task)
+
+    return result
@@ -0,0 +1,140 @@
+"""Find duplicate tasks database function."""
+
+import time
+from dataclasses import dataclass
+
+from sqlalchemy import and_, func, or_, text
+from sqlalchemy.exc import OperationalError
+from sqlmodel import col, select
+
+from src.db.engine import get_session
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Task, TaskSignature
+from src.settings import get_settings
+from src.similarity import jaccard, shingles, title_buckets, title_hash
+
+# Tasks sharing the most band buckets whose titles are compared
+MAX_CANDIDATES = 50
+
+# SQLSTATE of a statement cancelled by statement_timeout
+QUERY_CANCELED = "57014"
+
+
+@dataclass
+class DuplicateMatch:
+    """An existing task that duplicates a title."""
+
+    task_id: int
+    title: str
+    similarity: float  # trigram Jaccard similarity of the titles
+    exact: bool  # same title after normalization
+
+
+@timed
+def find_duplicates(
+    title: str,
+    threshold: float | None = None,
+    limit: int = 5,
+    budget_ms: float | None = None,
+) -> list[DuplicateMatch]:
+    """Find live tasks of the current owner with the same or a similar title.
+
+    Exact matches are looked up by title hash. Near duplicates are looked
+    up by LSH band bucket (see ``src.similarity``) only while time is left
+    in the budget; on Postgres the lookup is cancelled with a statement
+    timeout once the budget runs out, and only the exact matches are
+    returned.
+
+    Args:
+        title: Title to check
+        threshold: Minimum similarity of near duplicates
+            (default ``duplicate_similarity_threshold``)
+        limit: Maximum number of matches
+        budget_ms: Time allowed for the whole check
+            (default ``duplicate_check_budget_ms``)
+
+    Returns:
+        Matches, exact ones first, then by decreasing similarity
+    """
+    settings = get_settings()
+    if threshold is None:
+        threshold = settings.duplicate_similarity_threshold
+    if budget_ms is None:
+        budget_ms = settings.duplicate_check_budget_ms
+    deadline = time.perf_counter() + budget_ms / 1000
+    owner_id = current_owner_id()
+
+    # One transaction for both lookups; a cancelled lookup rolls it back
+    matches: list[DuplicateMatch] = []
+    try:
+        with get_session(read_only=True) as session:
+            exact = session.exec(
+                select(Task.id, Task.title)
+                .where(
+                    Task.owner_id == owner_id,
+                    Task.title_hash == title_hash(title),
+                    col(Task.deleted_at).is_(None),
+                )
+                .order_by(col(Task.id))
+                .limit(limit)
+            ).all()
+            matches = [
+                DuplicateMatch(task_id, existing, 1.0, exact=True)
+                for task_id, existing in exact
+                if task_id is not None
+            ]
+
+            remaining_ms = (deadline - time.perf_counter()) * 1000
+            if len(matches) >= limit or remaining_ms <= 0:
+                return matches
+
+            buckets = title_buckets(title)
+            exact_ids = [match.task_id for match in matches]
+            if session.get_bind().dialect.name == "postgresql":
+                session.connection().execute(
+                    text("SELECT set_config('statement_timeout', :ms, true)"),
+                    {"ms": str(max(1, int(remaining_ms)))},
+                )
+            candidates = session.exec(
+                select(Task.id, Task.title)
+                .join(TaskSignature, col(TaskSignature.task_id) == Task.id)
+                .where(
+                    TaskSignature.owner_id == owner_id,
+                    or_(
+                        *(
+                            and_(
+                                col(TaskSignature.band) == band,
+                                col(TaskSignature.bucket) == bucket,
+                            )
+                            for band, bucket in enumerate(buckets)
+                        )
+                    ),
+                    Task.owner_id == owner_id,
+                    col(Task.deleted_at).is_(None),
+                    col(Task.id).not_in(exact_ids),
+                )
+                .group_by(col(Task.id), col(Task.title))
+                .order_by(func.count().desc())
+                .limit(MAX_CANDIDATES)
+            ).all()
+    except OperationalError as exc:
+        sqlstate = getattr(exc.orig, "pgcode", None) or getattr(
+            exc.orig, "sqlstate", None
+        )
+        if sqlstate != QUERY_CANCELED:
+            raise
+        # Out of time; the exact matches are all we have
+        return matches
+
+    title_shingles = shingles(title)
+    near = []
+    for task_id, existing in candidates:
+        if time.perf_counter() > deadline:
+            break
+        similarity = jaccard(title_shingles, shingles(existing))
+        if task_id is not None and similarity >= threshold:
+            near.append(DuplicateMatch(task_id, existing, similarity, exact=False))
+
+    near.sort(key=lambda match: match.similarity, reverse=True)
+    return (matches + near)[:limit]
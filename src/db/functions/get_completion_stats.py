@@ -0,0 +1,239 @@
+"""Get completion stats database function."""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+from sqlalchemy import ColumnElement, Float, Select, case, cast
+from sqlalchemy import select as select_columns
+from sqlmodel import Session, col, func, select
+
+from src.db.engine import get_session
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Priority, Tag, Task, TaskTagLink
+
+FloatArray = npt.NDArray[np.float64]
+IntArray = npt.NDArray[np.int64]
+
+# Rows fetched from the cursor at a time
+BATCH_SIZE = 50_000
+
+_SECONDS_PER_DAY = 86_400
+_PRIORITIES = list(Priority)
+
+
+@dataclass
+class CompletionGroup:
+    """Lead times and estimate accuracy of a group of completed tasks.
+
+    There is no time tracking, so the time a task actually took is measured
+    from its start date to its completion. The estimate ratio is that time
+    over the estimate: above 1 means the task took longer than estimated.
+    """
+
+    completed: int
+    lead_time_p50_hours: float | None
+    lead_time_p90_hours: float | None
+    # Tasks with an estimate and a start date before their completion
+    estimated: int
+    estimate_ratio_p50: float | None
+    estimate_ratio_p90: float | None
+
+
+@dataclass
+class CompletionStats:
+    """Throughput, lead times and estimate accuracy over a range of days."""
+
+    days: list[date]
+    completed_per_day: list[int]
+    # Mean of the completions per day over the trailing window
+    rolling_average: list[float]
+    overall: CompletionGroup
+    by_priority: dict[Priority, CompletionGroup]
+    # Tasks with several tags count in each; busiest tags first
+    by_tag: dict[str, CompletionGroup]
+
+
+def _epoch_seconds(column: Any, dialect: str) -> ColumnElement[float]:
+    """Convert a timestamp column to seconds since the epoch, in SQL.
+
+    Timestamps are naive, so both conversions treat them as UTC and the
+    day of a timestamp is its epoch seconds divided by a day's seconds.
+    """
+    if dialect == "sqlite":
+        return (func.julianday(column) - 2440587.5) * _SECONDS_PER_DAY
+    return cast(func.extract("epoch", column), Float)
+
+
+def _fetch_array(session: Session, statement: Select[Any], columns: int) -> FloatArray:
+    """Stream the rows of a query into an array, with NULLs as NaN.
+
+    Rows are read from the DBAPI cursor in batches: every column is a number
+    computed in SQL, so SQLAlchemy's row objects would only add overhead.
+    Only a plain execute can be read this way; with ``stream_results`` or
+    ``yield_per``, SQLAlchemy reads ahead from the cursor itself.
+    """
+    result = session.connection().execute(statement)
+    batches = []
+    try:
+        while rows := result.cursor.fetchmany(BATCH_SIZE):
+            batches.append(np.array(rows, dtype=np.float64))
+    finally:
+        result.close()
+    return np.concatenate(batches) if batches else np.empty((0, columns))
+
+
+def _percentiles(values: FloatArray) -> tuple[float | None, float | None]:
+    if values.size == 0:
+        return None, None
+    p50, p90 = np.percentile(values, [50, 90])
+    return float(p50), float(p90)
+
+
+def _summarize(lead_hours: FloatArray, ratios: FloatArray) -> CompletionGroup:
+    ratios = ratios[~np.isnan(ratios)]
+    lead_p50, lead_p90 = _percentiles(lead_hours)
+    ratio_p50, ratio_p90 = _percentiles(ratios)
+    return CompletionGroup(
+        completed=int(lead_hours.size),
+        lead_time_p50_hours=lead_p50,
+        lead_time_p90_hours=lead_p90,
+        estimated=int(ratios.size),
+        estimate_ratio_p50=ratio_p50,
+        estimate_ratio_p90=ratio_p90,
+    )
+
+
+def _summarize_groups(
+    codes: IntArray, lead_hours: FloatArray, ratios: FloatArray
+) -> dict[int, CompletionGroup]:
+    """Summarize the tasks of each group code, sorting once for all groups."""
+    order = np.argsort(codes, kind="stable")
+    codes, lead_hours, ratios = codes[order], lead_hours[order], ratios[order]
+    groups, starts = np.unique(codes, return_index=True)
+    ends = np.append(starts[1:], codes.size)
+    return {
+        int(group): _summarize(lead_hours[start:end], ratios[start:end])
+        for group, start, end in zip(groups, starts, ends)
+    }
+
+
+@timed
+def get_completion_stats(
+    start: date | None = None, end: date | None = None, window_days: int = 7
+) -> CompletionStats:
+    """Compute completion throughput, lead times and estimate accuracy.
+
+    Only the columns needed are fetched, as epoch seconds computed in SQL,
+    and streamed into NumPy arrays; daily counts, rolling averages and
+    percentiles are then computed on whole arrays.
+
+    Args:
+        start: First day (default 89 days before ``end``)
+        end: Last day, included (default today)
+        window_days: Days in the trailing window of the rolling average
+
+    Returns:
+        Stats of the tasks completed in the range, deleted ones excluded
+
+    Raises:
+        ValueError: If the range is empty or the window is under a day
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise ValueError(f"Start {start} is after end {end}")
+    if window_days < 1:
+        raise ValueError(f"Rolling window must be at least a day, got {window_days}")
+
+    # Count the days before the range too, so its first days get full windows
+    first_day = start - timedelta(days=window_days - 1)
+    day_count = (end - first_day).days + 1
+    since = datetime.combine(first_day, datetime.min.time())
+    until = datetime.combine(end + timedelta(days=1), datetime.min.time())
+    range_start = (start - date(1970, 1, 1)).days * _SECONDS_PER_DAY
+    owner_id = current_owner_id()
+    completed = (
+        col(Task.owner_id) == owner_id,
+        col(Task.deleted_at).is_(None),
+        col(Task.completed_at) >= since,
+        col(Task.completed_at) < until,
+    )
+
+    with get_session(read_only=True) as session:
+        dialect = session.get_bind().dialect.name
+        priority = case(
+            *((col(Task.priority) == p, code) for code, p in enumerate(_PRIORITIES))
+        )
+        table = _fetch_array(
+            session,
+            # More columns than sqlmodel's select() is typed for
+            select_columns(
+                col(Task.id),
+                priority,
+                _epoch_seconds(Task.completed_at, dialect),
+                _epoch_seconds(Task.created_at, dialect),
+                _epoch_seconds(Task.start_date, dialect),
+                col(Task.time_estimate_minutes),
+            ).where(*completed),
+            columns=6,
+        )
+        # All the owner's links, matched to the tasks in range below: cheaper
+        # than looking up the links of each task
+        links = _fetch_array(
+            session,
+            select_columns(col(TaskTagLink.task_id), col(TaskTagLink.tag_id)).where(
+                col(TaskTagLink.owner_id) == owner_id
+            ),
+            columns=2,
+        ).astype(np.int64)
+        tag_names = dict(
+            session.exec(select(Tag.id, Tag.name).where(Tag.owner_id == owner_id)).all()
+        )
+
+    ids, priorities, completed_at, created_at, started_at, estimates = table.T
+
+    days = np.floor(completed_at / _SECONDS_PER_DAY).astype(np.int64)
+    days -= (first_day - date(1970, 1, 1)).days
+    per_day = np.bincount(days, minlength=day_count)[:day_count]
+    totals = np.concatenate(([0], np.cumsum(per_day)))
+    rolling = (totals[window_days:] - totals[:-window_days]) / window_days
+
+    # Lead times and estimates only cover the range itself
+    in_range = completed_at >= range_start
+    ids, priorities = ids[in_range].astype(np.int64), priorities[in_range]
+    completed_at, created_at = completed_at[in_range], created_at[in_range]
+    started_at, estimates = started_at[in_range], estimates[in_range]
+
+    lead_hours = (completed_at - created_at) / 3600
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratios = (completed_at - started_at) / 60 / estimates
+    ratios[(started_at > completed_at) | ~(estimates > 0)] = np.nan
+
+    by_priority = _summarize_groups(priorities.astype(np.int64), lead_hours, ratios)
+
+    by_tag: dict[str, CompletionGroup] = {}
+    if links.size and ids.size:
+        link_tasks, link_tags = links.T
+        order = np.argsort(ids)
+        found = np.searchsorted(ids, link_tasks, sorter=order).clip(max=ids.size - 1)
+        positions = order[found]
+        linked = ids[positions] == link_tasks
+        positions, link_tags = positions[linked], link_tags[linked]
+        groups = _summarize_groups(link_tags, lead_hours[positions], ratios[positions])
+        for tag_id, group in sorted(groups.items(), key=lambda g: -g[1].completed):
+            by_tag[tag_names[tag_id]] = group
+
+    return CompletionStats(
+        days=[first_day + timedelta(days=i) for i in range(window_days - 1, day_count)],
+        completed_per_day=per_day[window_days - 1 :].tolist(),
+        rolling_average=rolling.tolist(),
+        overall=_summarize(lead_hours, ratios),
+        by_priority={
+            _PRIORITIES[code]: group for code, group in sorted(by_priority.items())
+        },
+        by_tag=by_tag,
+    )
@@ -0,0 +1,24 @@
+"""Get last change ID database function."""
+
+from src.db.engine import get_session
+from src.db.statements import LAST_CHANGE_ID
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+
+
+@timed
+def get_last_change_id() -> int | None:
+    """Get the ID of the owner's latest change log entry.
+
+    Every task write logs an entry (see ``src.db.audit``), with IDs from one
+    sequence, so unlike a timestamp the result moves forward with each
+    create, edit, delete, restore or tagging whatever process wrote it.
+    Served from the index on ``(owner_id, id)`` without reading rows, so
+    it's cheap enough to answer every poll.
+
+    Returns:
+        Latest change log ID of the owner, or None if the log has none
+    """
+    with get_session(read_only=True) as session:
+        params = {"owner": current_owner_id()}
+        return session.exec(LAST_CHANGE_ID, params=params).one()
@@ -0,0 +1,124 @@
+"""Get or create tags database function."""
+
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, col, select
+
+from src.db.engine import get_session
+from src.db.retry import retry_transient
+from src.db.tag_cache import tag_cache
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Tag
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING RETURNING
+_UPSERT_INSERTS: dict[str, Any] = {
+    "postgresql": postgresql.insert,
+    "sqlite": sqlite.insert,
+}
+
+
+@timed
+@retry_transient()
+def get_or_create_tags(
+    names: Iterable[str],
+    color: str = "#808080",
+    colors: Mapping[str, str] | None = None,
+) -> dict[str, int]:
+    """Resolve tag names to IDs, creating the tags that don't exist yet.
+
+    Cached names are resolved without touching the database. The rest are
+    inserted in a single statement that skips existing names, followed by
+    one SELECT for the names that already existed.
+
+    Args:
+        names: Tag names to resolve
+        color: Hex color code for new tags (default gray)
+        colors: Per-name hex color codes for new tags, overriding ``color``
+
+    Returns:
+        Dictionary of tag name to tag ID, for every given name in order
+    """
+    owner_id = current_owner_id()
+    wanted = list(dict.fromkeys(names))
+    ids = tag_cache.get_many(owner_id, wanted)
+    missing = [name for name in wanted if name not in ids]
+    if not missing:
+        return ids
+
+    with get_session() as session:
+        created = _create_missing(session, owner_id, missing, color, colors or {})
+
+    tag_cache.put_many(owner_id, created)
+    ids.update(created)
+    return {name: ids[name] for name in wanted}
+
+
+def _create_missing(
+    session: Session,
+    owner_id: int,
+    names: list[str],
+    color: str,
+    colors: Mapping[str, str],
+) -> dict[str, int]:
+    """Create the given tags in the session's transaction, returning all IDs.
+
+    Names that exist already, e.g. created concurrently, resolve to the
+    existing tags. Callers cache the IDs once the transaction commits.
+
+    Raises:
+        ValueError: If a tag could neither be created nor found
+    """
+    rows = [
+        {"owner_id": owner_id, "name": name, "color": colors.get(name, color)}
+        for name in names
+    ]
+    created = _insert_missing(session, owner_id, rows)
+    leftovers = [name for name in names if name not in created]
+    if leftovers:
+        statement = select(Tag.name, Tag.id).where(
+            Tag.owner_id == owner_id, col(Tag.name).in_(leftovers)
+        )
+        created.update(
+            {
+                name: tag_id
+                for name, tag_id in session.exec(statement).all()
+                if tag_id is not None
+            }
+        )
+
+    for name in names:
+        if name not in created:
+            raise ValueError(f"Tag {name!r} could not be created")
+    return created
+
+
+def _insert_missing(
+    session: Session, owner_id: int, rows: list[dict[str, Any]]
+) -> dict[str, int]:
+    """Insert the given tags, skipping existing names, and return the new IDs."""
+    insert = _UPSERT_INSERTS.get(session.get_bind().dialect.name)
+    if insert is None:
+        # No ON CONFLICT support: insert the names that don't exist yet
+        names = [row["name"] for row in rows]
+        existing = set(
+            session.exec(
+                select(Tag.name).where(
+                    Tag.owner_id == owner_id, col(Tag.name).in_(names)
+                )
+            ).all()
+        )
+        tags = [Tag(**row) for row in rows if row["name"] not in existing]
+        session.add_all(tags)
+        session.flush()
+        return {tag.name: tag.id for tag in tags if tag.id is not None}
+
+    statement = (
+        insert(Tag)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["owner_id", "name"])
+        .returning(col(Tag.name), col(Tag.id))
+    )
+    return {name: tag_id for name, tag_id in session.exec(statement).all()}
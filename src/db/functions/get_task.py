@@ -0,0 +1,49 @@
+"""Get task database function."""
+
+from src.db.engine import get_session
+from src.db.statements import TASK_BY_ID
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Task
+
+
+@timed
+def get_task(task_id: int) -> Task:
+    """Get a single task.
+
+    Args:
+        task_id: ID of the task
+
+    Returns:
+        Task object
+
+    Raises:
+        ValueError: If task with given ID doesn't exist
+    """
+    with get_session(read_only=True) as session:
+        params = {"task_id": task_id, "owner": current_owner_id()}
+        task = session.exec(TASK_BY_ID, params=params).first()
+        if not task:
+            raise ValueError(f"Task with id {task_id} not found")
+
+        # Convert to detached instance
+        task_data = {
+            "id": task.id,
+            "title": task.title,
+            "title_hash": task.title_hash,
+            "description": task.description,
+            "completed": task.completed,
+            "priority": task.priority,
+            "created_at": task.created_at,
+            "updated_at": task.updated_at,
+            "due_date": task.due_date,
+            "start_date": task.start_date,
+            "completed_at": task.completed_at,
+            "time_estimate_minutes": task.time_estimate_minutes,
+            "repeat_interval": task.repeat_interval,
+            "version": task.version,
+            "owner_id": task.owner_id,
+            "tag_ids": task.tag_ids,
+        }
+
+    return Task(**task_data)
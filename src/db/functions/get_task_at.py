@@ -0,0 +1,86 @@
+"""Get task as of a point in time database function."""
+
+from datetime import datetime
+
+from sqlmodel import col, select
+
+from src.db.audit import decode_value
+from src.db.engine import get_session
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation, Task, TaskChange
+from src.similarity import title_hash
+
+
+@timed
+def get_task_at(task_id: int, at: datetime) -> Task:
+    """Get a task as it was at a point in time.
+
+    Starts from the current row, deleted or not, and reverts the logged
+    changes made after ``at``, newest first. Tags are not loaded.
+
+    Args:
+        task_id: ID of the task
+        at: Point in time to reconstruct the task at
+
+    Returns:
+        Task object with the field values it had at ``at``
+
+    Raises:
+        ValueError: If the task doesn't exist (anymore), didn't exist yet
+            at ``at``, or its history back to ``at`` has been pruned
+    """
+    owner_id = current_owner_id()
+    with get_session(read_only=True) as session:
+        task = session.exec(
+            select(Task).where(Task.id == task_id, Task.owner_id == owner_id)
+        ).first()
+        if not task:
+            raise ValueError(f"Task with id {task_id} not found")
+
+        changes = session.exec(
+            select(TaskChange)
+            .where(TaskChange.owner_id == owner_id, TaskChange.task_id == task_id)
+            .order_by(col(TaskChange.id).desc())
+        ).all()
+
+        task_data = {
+            "id": task.id,
+            "title": task.title,
+            "title_hash": task.title_hash,
+            "description": task.description,
+            "completed": task.completed,
+            "priority": task.priority,
+            "created_at": task.created_at,
+            "updated_at": task.updated_at,
+            "due_date": task.due_date,
+            "start_date": task.start_date,
+            "completed_at": task.completed_at,
+            "time_estimate_minutes": task.time_estimate_minutes,
+            "repeat_interval": task.repeat_interval,
+            "version": task.version,
+            "owner_id": task.owner_id,
+            "deleted_at": task.deleted_at,
+        }
+
+        for change in changes:
+            if change.changed_at <= at:
+                # Everything older is already reflected in the current state
+                task_data["updated_at"] = change.changed_at
+                break
+            if change.operation == ChangeOperation.CREATE:
+                raise ValueError(f"Task with id {task_id} didn't exist at {at}")
+            if change.version is not None:
+                task_data["version"] = change.version - 1
+            if change.operation in (ChangeOperation.TAG, ChangeOperation.UNTAG):
+                continue
+            for name, (old, _new) in change.changes.items():
+                task_data[name] = decode_value(name, old)
+        else:
+            # No change at or before `at` is left: the early history was
+            # pruned, possibly along with some of the changes after `at`
+            raise ValueError(f"History of task with id {task_id} at {at} was pruned")
+
+        task_data["title_hash"] = title_hash(str(task_data["title"]))
+
+    return Task(**task_data)
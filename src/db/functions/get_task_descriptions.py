@@ -0,0 +1,51 @@
+"""Get task descriptions database function."""
+
+from collections.abc import Iterable
+
+from sqlalchemy import ColumnElement
+from sqlmodel import col, func, select
+
+from src.db.engine import get_session
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Task
+
+
+@timed
+def get_task_descriptions(
+    task_ids: Iterable[int], max_length: int | None = None
+) -> dict[int, str]:
+    """Get the descriptions of several tasks in one query.
+
+    Meant to follow a list with ``TaskFields.SUMMARY``, for the tasks whose
+    descriptions are shown.
+
+    Args:
+        task_ids: IDs of the tasks
+        max_length: Cut descriptions to this many characters in the database,
+            e.g. for a preview (None = whole descriptions)
+
+    Returns:
+        Description of each live task with one, by task ID; other tasks
+        are left out
+    """
+    ids = list(task_ids)
+    if not ids:
+        return {}
+
+    columns = Task.metadata.tables[Task.__tablename__].c
+    description: ColumnElement[str | None] = columns.description
+    if max_length is not None:
+        description = func.substr(description, 1, max_length)
+
+    with get_session(read_only=True) as session:
+        rows = session.exec(
+            select(Task.id, description).where(
+                col(Task.id).in_(ids),
+                Task.owner_id == current_owner_id(),
+                col(Task.deleted_at).is_(None),
+                col(Task.description).is_not(None),
+            )
+        ).all()
+
+    return {task_id: text for task_id, text in rows if task_id is not None and text}
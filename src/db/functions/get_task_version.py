@@ -0,0 +1,29 @@
+"""Get task version database function."""
+
+from src.db.engine import get_session
+from src.db.statements import TASK_VERSION
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+
+
+@timed
+def get_task_version(task_id: int) -> int:
+    """Get the row version of a task without loading the task.
+
+    Args:
+        task_id: ID of the task
+
+    Returns:
+        Current version of the task
+
+    Raises:
+        ValueError: If task with given ID doesn't exist
+    """
+    with get_session(read_only=True) as session:
+        params = {"task_id": task_id, "owner": current_owner_id()}
+        version = session.exec(TASK_VERSION, params=params).first()
+
+    if version is None:
+        raise ValueError(f"Task with id {task_id} not found")
+
+    return version
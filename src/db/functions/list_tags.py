@@ -1,20 +1,21 @@
 """List tags database function."""
 
-from sqlmodel import select
-
 from src.db.engine import get_session
+from src.db.statements import TAGS
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
 from src.models import Tag
 
 
+@timed
 def list_tags() -> list[Tag]:
     """List all tags ordered by name.
 
     Returns:
         List of all Tag objects
     """
-    with get_session() as session:
-        statement = select(Tag).order_by(Tag.name)
-        tags = session.exec(statement).all()
+    with get_session(read_only=True) as session:
+        tags = session.exec(TAGS, params={"owner": current_owner_id()}).all()
 
         # Convert to list of detached Tag objects
         result = []
@@ -23,6 +24,7 @@ def list_tags() -> list[Tag]:
                 "id": tag.id,
                 "name": tag.name,
                 "color": tag.color,
+                "owner_id": tag.owner_id,
             }
             result.append(Tag(**tag_data))
 
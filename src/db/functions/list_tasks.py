@@ -1,42 +1,69 @@
 """List tasks database function."""
 
-from sqlalchemy import nulls_last
-from sqlmodel import col, select
+from enum import Enum
+from typing import Any
 
 from src.db.engine import get_session
+from src.db.statements import list_tasks_statement
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
 from src.models import Priority, Task
 
 
+class TaskFields(str, Enum):
+    """Fields the list functions load of each task."""
+
+    FULL = "full"
+    SUMMARY = "summary"  # all but the description, which is left None
+
+
+@timed
 def list_tasks(
     completed: bool | None = None,
     priority: Priority | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+    fields: TaskFields = TaskFields.FULL,
+    tag_id: int | None = None,
 ) -> list[Task]:
     """List tasks with optional filters.
 
+    Descriptions can be long and list views rarely show them in full: list
+    with ``TaskFields.SUMMARY`` and fetch what's shown with
+    :func:`get_task_descriptions` in one more query.
+
+    Tasks carry the IDs of their tags in ``tag_ids``, and the tag filter
+    reads them too, so neither joins the tag tables.
+
     Args:
         completed: Filter by completion status (None = all tasks)
         priority: Filter by priority level (None = all priorities)
+        limit: Maximum number of tasks to return (None = all tasks)
+        offset: Number of tasks to skip, for pagination
+        fields: Fields to load
+        tag_id: Only tasks with this tag (None = any tags)
 
     Returns:
         List of Task objects matching the filters
     """
-    with get_session() as session:
-        statement = select(Task)
-
-        if completed is not None:
-            statement = statement.where(Task.completed == completed)
-
-        if priority is not None:
-            statement = statement.where(Task.priority == priority)
-
-        # Order by: incomplete first, then by due date, then by priority
-        statement = statement.order_by(
-            col(Task.completed),
-            nulls_last(col(Task.due_date)),
-            col(Task.priority).desc(),
+    with get_session(read_only=True) as session:
+        statement = list_tasks_statement(
+            completed=completed is not None,
+            priority=priority is not None,
+            limit=limit is not None,
+            offset=bool(offset),
+            summary=fields == TaskFields.SUMMARY,
+            tag=tag_id is not None,
         )
-
-        tasks = session.exec(statement).all()
+        params: dict[str, Any] = {
+            "owner": current_owner_id(),
+            "completed": completed,
+            "priority": priority,
+            "limit": limit,
+            "offset": offset,
+            "tag_id": tag_id,
+        }
+        tasks = session.exec(statement, params=params).all()
 
         # Convert to list of detached Task objects
         result = []
@@ -44,7 +71,10 @@ def list_tasks(
             task_data = {
                 "id": task.id,
                 "title": task.title,
-                "description": task.description,
+                "title_hash": task.title_hash,
+                "description": (
+                    task.description if fields == TaskFields.FULL else None
+                ),
                 "completed": task.completed,
                 "priority": task.priority,
                 "created_at": task.created_at,
@@ -54,6 +84,9 @@ def list_tasks(
                 "completed_at": task.completed_at,
                 "time_estimate_minutes": task.time_estimate_minutes,
                 "repeat_interval": task.repeat_interval,
+                "version": task.version,
+                "owner_id": task.owner_id,
+                "tag_ids": task.tag_ids,
             }
             result.append(Task(**task_data))
 
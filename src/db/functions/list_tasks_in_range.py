@@ -0,0 +1,191 @@
+"""List tasks in a date range database function."""
+
+from datetime import datetime, timedelta
+from enum import Enum
+
+from sqlalchemy import literal_column, nulls_last
+from sqlmodel import col, func, select
+
+from src.db.engine import get_session
+from src.db.functions.list_tasks import TaskFields
+from src.db.statements import WITHOUT_DESCRIPTION
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Priority, Task
+
+
+class DateField(str, Enum):
+    """Task dates a range query can filter on."""
+
+    DUE_DATE = "due_date"
+    START_DATE = "start_date"
+    COMPLETED_AT = "completed_at"
+    SPAN = "span"  # the start_date -> due_date interval overlaps the range
+
+
+class DateRangePreset(str, Enum):
+    """Commonly used due date ranges."""
+
+    OVERDUE = "overdue"
+    TODAY = "today"
+    THIS_WEEK = "this_week"
+
+
+def preset_range(
+    preset: DateRangePreset, now: datetime | None = None
+) -> tuple[datetime | None, datetime]:
+    """Resolve a preset to a half-open ``[start, end)`` due date range.
+
+    Due dates are stored as midnight of the day they're due, so a task is
+    overdue once that day has passed.
+
+    Args:
+        preset: Range to resolve
+        now: Reference time (default now)
+
+    Returns:
+        Tuple of start (None = unbounded) and end
+    """
+    today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+    if preset == DateRangePreset.OVERDUE:
+        return None, today
+    if preset == DateRangePreset.TODAY:
+        return today, today + timedelta(days=1)
+    week_start = today - timedelta(days=today.weekday())
+    return week_start, week_start + timedelta(days=7)
+
+
+@timed
+def list_tasks_in_range(
+    start: datetime | None,
+    end: datetime | None,
+    field: DateField = DateField.DUE_DATE,
+    completed: bool | None = None,
+    priority: Priority | None = None,
+    fields: TaskFields = TaskFields.FULL,
+) -> list[Task]:
+    """List tasks whose date falls in a half-open ``[start, end)`` range.
+
+    Single dates are served by their btree indexes. ``DateField.SPAN``
+    matches tasks with both a start and a due date whose interval overlaps
+    the range; on Postgres it uses the GiST index on that interval.
+
+    Args:
+        start: Range start (None = unbounded)
+        end: Range end, exclusive (None = unbounded)
+        field: Which date to filter on
+        completed: Filter by completion status (None = all tasks)
+        priority: Filter by priority level (None = all priorities)
+        fields: Fields to load
+
+    Returns:
+        List of Task objects ordered by the filtered date
+    """
+    with get_session(read_only=True) as session:
+        statement = select(Task).where(
+            Task.owner_id == current_owner_id(), col(Task.deleted_at).is_(None)
+        )
+
+        if field == DateField.SPAN:
+            statement = statement.where(
+                col(Task.start_date).is_not(None), col(Task.due_date).is_not(None)
+            )
+            if session.get_bind().dialect.name == "postgresql":
+                span = func.tsrange(
+                    func.least(col(Task.start_date), col(Task.due_date)),
+                    func.greatest(col(Task.start_date), col(Task.due_date)),
+                    literal_column("'[]'"),
+                )
+                statement = statement.where(
+                    span.op("&&")(func.tsrange(start, end, literal_column("'[)'")))
+                )
+            else:
+                # SQLite's multi-argument max()/min() are scalar, like
+                # Postgres' greatest()/least()
+                if start is not None:
+                    statement = statement.where(
+                        func.max(col(Task.start_date), col(Task.due_date)) >= start
+                    )
+                if end is not None:
+                    statement = statement.where(
+                        func.min(col(Task.start_date), col(Task.due_date)) < end
+                    )
+            order_column = col(Task.due_date)
+        else:
+            order_column = col(getattr(Task, field.value))
+            if start is not None:
+                statement = statement.where(order_column >= start)
+            if end is not None:
+                statement = statement.where(order_column < end)
+
+        if completed is not None:
+            statement = statement.where(Task.completed == completed)
+
+        if priority is not None:
+            statement = statement.where(Task.priority == priority)
+
+        statement = statement.order_by(
+            nulls_last(order_column), col(Task.priority).desc()
+        )
+        if fields == TaskFields.SUMMARY:
+            statement = statement.options(WITHOUT_DESCRIPTION)
+
+        tasks = session.exec(statement).all()
+
+        # Convert to list of detached Task objects
+        result = []
+        for task in tasks:
+            task_data = {
+                "id": task.id,
+                "title": task.title,
+                "title_hash": task.title_hash,
+                "description": (
+                    task.description if fields == TaskFields.FULL else None
+                ),
+                "completed": task.completed,
+                "priority": task.priority,
+                "created_at": task.created_at,
+                "updated_at": task.updated_at,
+                "due_date": task.due_date,
+                "start_date": task.start_date,
+                "completed_at": task.completed_at,
+                "time_estimate_minutes": task.time_estimate_minutes,
+                "repeat_interval": task.repeat_interval,
+                "version": task.version,
+                "owner_id": task.owner_id,
+                "tag_ids": task.tag_ids,
+            }
+            result.append(Task(**task_data))
+
+    return result
+
+
+@timed
+def list_tasks_for_preset(
+    preset: DateRangePreset,
+    completed: bool | None = False,
+    priority: Priority | None = None,
+    now: datetime | None = None,
+    fields: TaskFields = TaskFields.FULL,
+) -> list[Task]:
+    """List tasks due in a preset range, e.g. overdue or due this week.
+
+    Args:
+        preset: Due date range
+        completed: Filter by completion status (default open tasks only)
+        priority: Filter by priority level (None = all priorities)
+        now: Reference time (default now)
+        fields: Fields to load
+
+    Returns:
+        List of Task objects ordered by due date
+    """
+    start, end = preset_range(preset, now)
+    return list_tasks_in_range(
+        start,
+        end,
+        DateField.DUE_DATE,
+        completed=completed,
+        priority=priority,
+        fields=fields,
+    )
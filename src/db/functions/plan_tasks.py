@@ -0,0 +1,49 @@
+"""Plan tasks database function."""
+
+from datetime import datetime
+
+from sqlmodel import col, select
+
+from src.db.engine import get_session
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import Task
+from src.planner import PlanItem, Planner, ScheduledTask, WorkingHours
+
+
+@timed
+def plan_tasks(
+    hours: WorkingHours | None = None,
+    now: datetime | None = None,
+) -> list[ScheduledTask]:
+    """Schedule all open tasks into working hours.
+
+    Only the columns the planner needs are loaded. See src.planner for how
+    tasks are ordered and packed.
+
+    Args:
+        hours: Working hours to fill (default weekdays 9:00-17:00)
+        now: When planning starts (default now)
+
+    Returns:
+        Scheduled tasks in execution order; ``late`` marks tasks that can't
+        be finished by their due date
+    """
+    with get_session(read_only=True) as session:
+        # sqlmodel's select() is only typed for up to four columns
+        statement = select(  # type: ignore[call-overload]
+            Task.id,
+            Task.title,
+            Task.priority,
+            Task.due_date,
+            Task.start_date,
+            Task.time_estimate_minutes,
+        ).where(
+            Task.owner_id == current_owner_id(),
+            col(Task.completed).is_(False),
+            col(Task.deleted_at).is_(None),
+        )
+        rows = session.exec(statement).all()
+
+    planner = Planner(hours=hours, now=now)
+    return planner.plan(PlanItem._make(row) for row in rows)
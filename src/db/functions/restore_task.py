@@ -0,0 +1,69 @@
+"""Restore task database function."""
+
+from datetime import datetime
+from typing import Any
+
+from src.db.audit import diff_fields, update_logged
+from src.db.engine import get_session
+from src.db.retry import retry_transient
+from src.db.statements import DELETED_TASK_BY_ID, RESTORE
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation, Task
+
+
+@timed
+@retry_transient(idempotent=False)
+def restore_task(task_id: int) -> Task:
+    """Undo the deletion of a task that hasn't been purged yet.
+
+    Args:
+        task_id: ID of the deleted task
+
+    Returns:
+        Restored Task object
+
+    Raises:
+        ValueError: If no deleted task with given ID exists
+    """
+    params: dict[str, Any] = {"task_id": task_id, "owner": current_owner_id()}
+
+    with get_session() as session:
+        task = session.exec(DELETED_TASK_BY_ID, params=params).first()
+        if not task:
+            raise ValueError(f"Deleted task with id {task_id} not found")
+
+        updated_at = datetime.now()
+        changes = diff_fields({"deleted_at": task.deleted_at}, {"deleted_at": None})
+        version = update_logged(
+            session,
+            RESTORE,
+            ChangeOperation.RESTORE,
+            changes,
+            params={**params, "now": updated_at},
+        )
+        if version is None:
+            # Purged or restored by someone else since we read it
+            raise ValueError(f"Deleted task with id {task_id} not found")
+
+        # Convert to detached instance
+        task_data = {
+            "id": task.id,
+            "title": task.title,
+            "title_hash": task.title_hash,
+            "description": task.description,
+            "completed": task.completed,
+            "priority": task.priority,
+            "created_at": task.created_at,
+            "updated_at": updated_at,
+            "due_date": task.due_date,
+            "start_date": task.start_date,
+            "completed_at": task.completed_at,
+            "time_estimate_minutes": task.time_estimate_minutes,
+            "repeat_interval": task.repeat_interval,
+            "version": version,
+            "owner_id": task.owner_id,
+            "tag_ids": task.tag_ids,
+        }
+
+    return Task(**task_data)
@@ -0,0 +1,174 @@
+"""Undo changes database function."""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, col, delete, exists, select
+
+from src.db.audit import decode_value, diff_fields, log_change, update_logged
+from src.db.dedupe import store_signature
+from src.db.engine import get_session
+from src.db.retry import retry_transient
+from src.db.statements import RESTORE, SET_TAG_IDS, SOFT_DELETE, revert_statement
+from src.db.tenancy import current_owner_id
+from src.metrics import timed
+from src.models import ChangeOperation, Tag, Task, TaskChange, TaskTagLink
+from src.similarity import title_hash
+
+
+def _revert_update(session: Session, change: TaskChange) -> bool:
+    values: dict[str, Any] = {
+        name: decode_value(name, old) for name, (old, _new) in change.changes.items()
+    }
+    reverted = {name: [new, old] for name, (old, new) in change.changes.items()}
+    if "title" in values:
+        values["title_hash"] = title_hash(values["title"])
+    params = {f"new_{name}": value for name, value in values.items()}
+    params.update(task_id=change.task_id, owner=change.owner_id, now=datetime.now())
+    version = update_logged(
+        session,
+        revert_statement(tuple(sorted(values))),
+        ChangeOperation.UPDATE,
+        reverted,
+        undo_of=change.id,
+        params=params,
+    )
+    if version is None:
+        return False
+    if "title" in values:
+        store_signature(
+            session, change.task_id, change.owner_id, values["title"], replace=True
+        )
+    return True
+
+
+def _set_deleted(session: Session, change: TaskChange, deleted: bool) -> bool:
+    now = datetime.now()
+    deleted_at = now if deleted else None
+    statement = SOFT_DELETE if deleted else RESTORE
+    params = {"task_id": change.task_id, "owner": change.owner_id, "now": now}
+    operation = ChangeOperation.DELETE if deleted else ChangeOperation.RESTORE
+    before = None if deleted else change.changes.get("deleted_at", [None, None])[1]
+    changes = diff_fields(
+        {"deleted_at": decode_value("deleted_at", before)}, {"deleted_at": deleted_at}
+    )
+    version = update_logged(
+        session, statement, operation, changes, undo_of=change.id, params=params
+    )
+    return version is not None
+
+
+def _set_tagged(session: Session, change: TaskChange, tagged: bool) -> bool:
+    tag_id = change.changes["tag_id"]
+    # Locked before reading links, as add_tag_to_task does, so concurrent
+    # tag changes rewrite tag_ids in turn
+    task_exists = session.exec(
+        select(Task.id)
+        .where(Task.id == change.task_id, Task.owner_id == change.owner_id)
+        .with_for_update()
+    ).first()
+    link = session.exec(
+        select(TaskTagLink).where(
+            TaskTagLink.task_id == change.task_id, TaskTagLink.tag_id == tag_id
+        )
+    ).first()
+    if tagged == (link is not None):
+        return False
+
+    if tagged:
+        tag_exists = session.exec(
+            select(Tag.id).where(Tag.id == tag_id, Tag.owner_id == change.owner_id)
+        ).first()
+        if task_exists is None or tag_exists is None:
+            return False
+        session.add(
+            TaskTagLink(task_id=change.task_id, tag_id=tag_id, owner_id=change.owner_id)
+        )
+    else:
+        session.exec(
+            delete(TaskTagLink).where(
+                col(TaskTagLink.task_id) == change.task_id,
+                col(TaskTagLink.tag_id) == tag_id,
+            )
+        )
+
+    tag_ids = session.exec(
+        select(TaskTagLink.tag_id)
+        .where(TaskTagLink.task_id == change.task_id)
+        .order_by(col(TaskTagLink.tag_id))
+    ).all()
+    operation = ChangeOperation.TAG if tagged else ChangeOperation.UNTAG
+    update_logged(
+        session,
+        SET_TAG_IDS,
+        operation,
+        {"tag_id": tag_id},
+        undo_of=change.id,
+        params={
+            "task_id": change.task_id,
+            "owner": change.owner_id,
+            "new_tag_ids": list(tag_ids),
+            "now": datetime.now(),
+        },
+    )
+    return True
+
+
+def _revert(session: Session, change: TaskChange) -> bool:
+    """Revert one logged change; False if there was nothing left to revert."""
+    if change.operation == ChangeOperation.UPDATE:
+        return _revert_update(session, change)
+    if change.operation in (ChangeOperation.CREATE, ChangeOperation.RESTORE):
+        return _set_deleted(session, change, deleted=True)
+    if change.operation == ChangeOperation.DELETE:
+        return _set_deleted(session, change, deleted=False)
+    return _set_tagged(
+        session, change, tagged=change.operation == ChangeOperation.UNTAG
+    )
+
+
+@timed
+@retry_transient(idempotent=False)
+def undo_changes(count: int = 1) -> list[TaskChange]:
+    """Undo the current owner's latest changes, newest first.
+
+    All changes are reverted in one transaction. Undoing a creation deletes
+    the task. The reverting writes are logged like any other change, but
+    are never undone themselves, and each change is undone at most once, so
+    repeated calls walk further back through the history.
+
+    Args:
+        count: Number of changes to undo
+
+    Returns:
+        Log entries of the undone changes, newest first. Changes of tasks
+        that have been purged since are skipped, but count towards ``count``.
+    """
+    owner_id = current_owner_id()
+    undo = aliased(TaskChange)
+
+    with get_session() as session:
+        changes = session.exec(
+            select(TaskChange)
+            .where(
+                TaskChange.owner_id == owner_id,
+                col(TaskChange.undo_of).is_(None),
+                ~exists().where(col(undo.undo_of) == TaskChange.id),
+            )
+            .order_by(col(TaskChange.id).desc())
+            .limit(count)
+            .with_for_update(skip_locked=True)
+        ).all()
+
+        undone = []
+        for change in changes:
+            if _revert(session, change):
+                undone.append(TaskChange(**change.model_dump()))
+            else:
+                # Mark it as handled so it doesn't come up again
+                log_change(
+                    session, change.task_id, change.operation, {}, undo_of=change.id
+                )
+
+    return undone
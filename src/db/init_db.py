@@ -3,14 +3,24 @@
 from sqlmodel import SQLModel
 
 from src.db.engine import get_engine
+from src.db.sharding import shard_count, shard_scope
+from src.db.tenancy import enable_row_level_security
 from src.models import Tag, Task, TaskTagLink  # noqa: F401 - needed for table creation
+from src.settings import get_settings
 
 
 def init_db() -> None:
-    """Initialize database by creating all tables."""
-    engine = get_engine()
-    SQLModel.metadata.create_all(engine)
-    print("Database tables created successfully")  # noqa: T201
+    """Initialize database by creating all tables, in every shard."""
+    for shard in range(shard_count()):
+        with shard_scope(shard):
+            engine = get_engine()
+        SQLModel.metadata.create_all(engine)
+        print(f"Database tables created successfully in {engine.url!r}")  # noqa: T201
+
+        if get_settings().row_level_security and engine.dialect.name == "postgresql":
+            with engine.begin() as connection:
+                enable_row_level_security(connection)
+            print("Row-level security enabled")  # noqa: T201
 
 
 if __name__ == "__main__":
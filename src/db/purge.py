@@ -0,0 +1,256 @@
+"""Purge job that hard-deletes soft-deleted tasks in bounded batches.
+
+Deleting tasks only marks them (see :func:`delete_task`). This job removes
+the rows, and their tag links, once they have been deleted for longer than
+the retention period. Each batch runs in its own short transaction and
+batches are rate limited, so a mass delete turns into a steady trickle of
+small writes instead of one long transaction holding thousands of row locks.
+The change log (see ``src.db.audit``) is pruned by age the same way. With
+sharding, the shards are purged one after the other.
+
+Run it periodically, e.g. from cron::
+
+    python -m src.db.purge --retention-hours 24
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from sqlmodel import col, delete, func, select
+
+from src.db.engine import get_session
+from src.db.retry import retry_transient
+from src.db.sharding import shard_count, shard_scope
+from src.db.tenancy import all_owners_scope
+from src.models import Task, TaskChange, TaskSignature, TaskTagLink
+from src.settings import get_settings
+
+
+@dataclass
+class PurgeResult:
+    """Outcome of a purge run."""
+
+    purged: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def tasks_per_second(self) -> float:
+        """Purge throughput, including the time spent rate limiting."""
+        if self.elapsed_seconds == 0:
+            return 0.0
+        return self.purged / self.elapsed_seconds
+
+
+@retry_transient()
+def purge_batch(cutoff: datetime, batch_size: int) -> int:
+    """Hard-delete up to ``batch_size`` tasks deleted before ``cutoff``.
+
+    Rows are locked with ``SKIP LOCKED`` on Postgres, so concurrent purge
+    runs work on disjoint batches and a task being restored is left alone.
+    The purge covers every owner.
+
+    Returns:
+        Number of tasks purged
+    """
+    with all_owners_scope(), get_session() as session:
+        ids = list(
+            session.exec(
+                select(Task.id)
+                .where(
+                    col(Task.deleted_at).is_not(None),
+                    col(Task.deleted_at) < cutoff,
+                )
+                .order_by(col(Task.deleted_at))
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+        )
+        if not ids:
+            return 0
+
+        session.exec(delete(TaskTagLink).where(col(TaskTagLink.task_id).in_(ids)))
+        session.exec(delete(TaskSignature).where(col(TaskSignature.task_id).in_(ids)))
+        session.exec(
+            delete(Task).where(col(Task.id).in_(ids), col(Task.deleted_at).is_not(None))
+        )
+
+    return len(ids)
+
+
+@retry_transient()
+def prune_change_batch(cutoff: datetime, batch_size: int) -> int:
+    """Delete up to ``batch_size`` change log entries older than ``cutoff``.
+
+    The newest entry is always kept: sync clients compare their cursor with
+    the oldest entry to tell whether changes they missed were pruned (see
+    ``changes_since``), which needs the log's IDs to never restart.
+
+    Returns:
+        Number of entries deleted
+    """
+    with all_owners_scope(), get_session() as session:
+        newest = select(func.max(TaskChange.id)).scalar_subquery()
+        ids = list(
+            session.exec(
+                select(TaskChange.id)
+                .where(col(TaskChange.changed_at) < cutoff, col(TaskChange.id) < newest)
+                .order_by(col(TaskChange.id))
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+        )
+        if ids:
+            session.exec(delete(TaskChange).where(col(TaskChange.id).in_(ids)))
+
+    return len(ids)
+
+
+def _run_batches(
+    run_batch: Callable[[], int],
+    batch_size: int,
+    batches_per_second: float,
+    max_batches: int | None,
+) -> PurgeResult:
+    """Run batches until one comes up short, at most ``batches_per_second``."""
+    interval = 1 / batches_per_second if batches_per_second > 0 else 0.0
+    result = PurgeResult()
+    started = time.monotonic()
+
+    while max_batches is None or result.batches < max_batches:
+        batch_started = time.monotonic()
+        purged = run_batch()
+        if purged == 0:
+            break
+        result.purged += purged
+        result.batches += 1
+        if purged < batch_size:
+            break
+        time.sleep(max(0.0, interval - (time.monotonic() - batch_started)))
+
+    result.elapsed_seconds = time.monotonic() - started
+    return result
+
+
+def purge_deleted_tasks(
+    retention: timedelta | None = None,
+    batch_size: int | None = None,
+    batches_per_second: float | None = None,
+    max_batches: int | None = None,
+) -> PurgeResult:
+    """Hard-delete soft-deleted tasks in rate-limited batches.
+
+    Args:
+        retention: How long deleted tasks stay restorable
+            (default ``purge_retention_hours``)
+        batch_size: Tasks deleted per transaction (default ``purge_batch_size``)
+        batches_per_second: Maximum batch rate, 0 for no limit
+            (default ``purge_batches_per_second``)
+        max_batches: Stop after this many batches (None = until done)
+
+    Returns:
+        PurgeResult with the number of tasks and batches purged
+    """
+    settings = get_settings()
+    if retention is None:
+        retention = timedelta(hours=settings.purge_retention_hours)
+    if batch_size is None:
+        batch_size = settings.purge_batch_size
+    if batches_per_second is None:
+        batches_per_second = settings.purge_batches_per_second
+
+    cutoff = datetime.now() - retention
+    return _run_batches(
+        lambda: purge_batch(cutoff, batch_size),
+        batch_size,
+        batches_per_second,
+        max_batches,
+    )
+
+
+def prune_change_log(
+    retention: timedelta | None = None,
+    batch_size: int | None = None,
+    batches_per_second: float | None = None,
+    max_batches: int | None = None,
+) -> PurgeResult:
+    """Delete old change log entries in rate-limited batches.
+
+    Task history and undo don't reach further back than the retention.
+
+    Args:
+        retention: How long entries are kept
+            (default ``change_log_retention_days``)
+        batch_size: Entries deleted per transaction (default ``purge_batch_size``)
+        batches_per_second: Maximum batch rate, 0 for no limit
+            (default ``purge_batches_per_second``)
+        max_batches: Stop after this many batches (None = until done)
+
+    Returns:
+        PurgeResult with the number of entries and batches deleted
+    """
+    settings = get_settings()
+    if retention is None:
+        retention = timedelta(days=settings.change_log_retention_days)
+    if batch_size is None:
+        batch_size = settings.purge_batch_size
+    if batches_per_second is None:
+        batches_per_second = settings.purge_batches_per_second
+
+    cutoff = datetime.now() - retention
+    return _run_batches(
+        lambda: prune_change_batch(cutoff, batch_size),
+        batch_size,
+        batches_per_second,
+        max_batches,
+    )
+
+
+def main() -> None:
+    """Run the purge job from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--retention-hours", type=float, default=None)
+    parser.add_argument("--change-log-retention-days", type=float, default=None)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--batches-per-second", type=float, default=None)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+
+    retention = None
+    if args.retention_hours is not None:
+        retention = timedelta(hours=args.retention_hours)
+    change_log_retention = None
+    if args.change_log_retention_days is not None:
+        change_log_retention = timedelta(days=args.change_log_retention_days)
+
+    for shard in range(shard_count()):
+        prefix = f"Shard {shard}: " if shard_count() > 1 else ""
+        with shard_scope(shard):
+            result = purge_deleted_tasks(
+                retention=retention,
+                batch_size=args.batch_size,
+                batches_per_second=args.batches_per_second,
+                max_batches=args.max_batches,
+            )
+            print(  # noqa: T201
+                f"{prefix}Purged {result.purged} task(s) in {result.batches} "
+                f"batch(es), {result.tasks_per_second:.0f} tasks/s"
+            )
+
+            pruned = prune_change_log(
+                retention=change_log_retention,
+                batch_size=args.batch_size,
+                batches_per_second=args.batches_per_second,
+                max_batches=args.max_batches,
+            )
+            print(  # noqa: T201
+                f"{prefix}Pruned {pruned.purged} change log entries "
+                f"in {pruned.batches} batch(es)"
+            )
+
+
+if __name__ == "__main__":
+    main()
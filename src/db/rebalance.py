@@ -0,0 +1,224 @@
+"""Rebalancing tool that moves owners to the shard the hash ring assigns.
+
+After a shard is appended to ``database_shard_urls`` (see
+``src.db.sharding``), some owners hash to the new shard while their data is
+still on an old one. This tool finds them by scanning every shard and
+copies each one's tags, tasks, tag links and change log to the right shard,
+then deletes the originals.
+
+Task, tag and change log IDs are per database, so moved rows get new IDs
+on their new shard. Stop the app while rebalancing: requests for a moved
+owner would otherwise see half of their data, and in-process caches of tag
+IDs go stale. Sync clients of moved owners should start over without a
+cursor.
+
+The copy is committed before the originals are deleted. Should the tool
+die between the two commits, the owner ends up on both shards, and the
+next run moves them again. Rows already on the target are recognized and
+not copied twice: tags by name, tasks by creation time and title, tag
+links by their task and tag, and change log entries by their task, time
+and operation.
+
+    python -m src.db.rebalance           # list the owners to move
+    python -m src.db.rebalance --apply   # move them
+"""
+
+import argparse
+from dataclasses import dataclass
+
+from sqlmodel import col, delete, select
+
+from src.db.dedupe import store_signature
+from src.db.engine import get_session
+from src.db.sharding import scatter_gather, shard_for_owner, shard_scope
+from src.db.tag_cache import tag_cache
+from src.db.tenancy import all_owners_scope, owner_scope
+from src.models import Tag, Task, TaskChange, TaskSignature, TaskTagLink
+
+# undo_of of copied undo entries whose reverted entry wasn't copied, such
+# as one pruned from the log. No entry has this ID, and entries with
+# undo_of set are never undone themselves.
+UNKNOWN_CHANGE_ID = 0
+
+
+@dataclass
+class OwnerMove:
+    """An owner whose data is on another shard than the ring assigns."""
+
+    owner_id: int
+    source: int
+    target: int
+
+
+def _owners_in_shard() -> set[int]:
+    with all_owners_scope(), get_session(read_only=True) as session:
+        owners = set(session.exec(select(Task.owner_id).distinct()))
+        owners.update(session.exec(select(Tag.owner_id).distinct()))
+    return owners
+
+
+def find_misplaced_owners() -> list[OwnerMove]:
+    """Scan every shard for owners that belong on another one."""
+    moves = []
+    for source, owners in enumerate(scatter_gather(_owners_in_shard)):
+        for owner_id in sorted(owners):
+            target = shard_for_owner(owner_id)
+            if target != source:
+                moves.append(OwnerMove(owner_id, source, target))
+    return moves
+
+
+def move_owner(move: OwnerMove) -> int:
+    """Copy an owner's data to their target shard and delete the originals.
+
+    Rows the owner already has on the target shard, such as the copies of
+    an interrupted run, are reused rather than copied again.
+
+    Returns:
+        Number of tasks moved
+    """
+    owner_id = move.owner_id
+    with owner_scope(owner_id), all_owners_scope():
+        with shard_scope(move.source), get_session() as source:
+            tags = source.exec(select(Tag).where(Tag.owner_id == owner_id)).all()
+            tasks = source.exec(
+                select(Task).where(Task.owner_id == owner_id).order_by(col(Task.id))
+            ).all()
+            links = source.exec(
+                select(TaskTagLink).where(TaskTagLink.owner_id == owner_id)
+            ).all()
+            changes = source.exec(
+                select(TaskChange)
+                .where(TaskChange.owner_id == owner_id)
+                .order_by(col(TaskChange.id))
+            ).all()
+
+            with shard_scope(move.target), get_session() as target:
+                existing = {
+                    tag.name: tag
+                    for tag in target.exec(select(Tag).where(Tag.owner_id == owner_id))
+                }
+                tag_ids: dict[int | None, int | None] = {}
+                for tag in tags:
+                    copy = existing.get(tag.name)
+                    if copy is None:
+                        copy = Tag(name=tag.name, color=tag.color, owner_id=owner_id)
+                        target.add(copy)
+                        target.flush()
+                    tag_ids[tag.id] = copy.id
+
+                # Tag IDs change on the target, so rebuild each task's copy
+                linked: dict[int, list[int]] = {}
+                for link in links:
+                    target_tag_id = tag_ids[link.tag_id]
+                    assert target_tag_id is not None
+                    linked.setdefault(link.task_id, []).append(target_tag_id)
+
+                existing_tasks = {
+                    (created_at, title): task_id
+                    for task_id, created_at, title in target.exec(
+                        select(Task.id, Task.created_at, Task.title).where(
+                            Task.owner_id == owner_id
+                        )
+                    )
+                    if task_id is not None
+                }
+                task_ids: dict[int | None, int] = {}
+                for task in tasks:
+                    task_id = existing_tasks.get((task.created_at, task.title))
+                    if task_id is not None:
+                        task_ids[task.id] = task_id
+                        continue
+                    task_copy = Task(
+                        **task.model_dump(exclude={"id", "owner_id", "tag_ids"}),
+                        owner_id=owner_id,
+                        tag_ids=sorted(linked.get(task.id or 0, [])),
+                    )
+                    target.add(task_copy)
+                    target.flush()
+                    assert task_copy.id is not None
+                    task_ids[task.id] = task_copy.id
+                    store_signature(target, task_copy.id, owner_id, task.title)
+
+                existing_links = set(
+                    target.exec(
+                        select(TaskTagLink.task_id, TaskTagLink.tag_id).where(
+                            TaskTagLink.owner_id == owner_id
+                        )
+                    )
+                )
+                for link in links:
+                    link_ids = (task_ids[link.task_id], tag_ids[link.tag_id])
+                    if link_ids in existing_links:
+                        continue
+                    target.add(
+                        TaskTagLink(
+                            task_id=link_ids[0], tag_id=link_ids[1], owner_id=owner_id
+                        )
+                    )
+
+                existing_changes = {
+                    (task_id, changed_at, operation): change_id
+                    for change_id, task_id, changed_at, operation in target.exec(
+                        select(
+                            TaskChange.id,
+                            TaskChange.task_id,
+                            TaskChange.changed_at,
+                            TaskChange.operation,
+                        ).where(TaskChange.owner_id == owner_id)
+                    )
+                }
+                # History of purged tasks can't be attached to anything
+                change_ids: dict[int | None, int | None] = {}
+                for change in changes:
+                    if change.task_id not in task_ids:
+                        continue
+                    change_id = existing_changes.get(
+                        (task_ids[change.task_id], change.changed_at, change.operation)
+                    )
+                    if change_id is not None:
+                        change_ids[change.id] = change_id
+                        continue
+                    undo_of = None
+                    if change.undo_of is not None:
+                        undo_of = change_ids.get(change.undo_of, UNKNOWN_CHANGE_ID)
+                    details = dict(change.changes)
+                    if "tag_id" in details:
+                        details["tag_id"] = tag_ids.get(details["tag_id"])
+                    change_copy = TaskChange(
+                        **change.model_dump(
+                            exclude={"id", "owner_id", "task_id", "changes", "undo_of"}
+                        ),
+                        owner_id=owner_id,
+                        changes=details,
+                        task_id=task_ids[change.task_id],
+                        undo_of=undo_of,
+                    )
+                    target.add(change_copy)
+                    target.flush()
+                    change_ids[change.id] = change_copy.id
+
+            for model in (TaskTagLink, TaskSignature, TaskChange, Task, Tag):
+                source.exec(delete(model).where(col(model.owner_id) == owner_id))
+
+    tag_cache.clear()
+    return len(tasks)
+
+
+def main() -> None:
+    """Run the rebalancing tool from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="move the owners")
+    args = parser.parse_args()
+
+    moves = find_misplaced_owners()
+    for move in moves:
+        line = f"Owner {move.owner_id}: shard {move.source} -> {move.target}"
+        if args.apply:
+            line += f", moved {move_owner(move)} task(s)"
+        print(line)  # noqa: T201
+    print(f"{len(moves)} owner(s) to move" if not args.apply else "Done")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Retry policy for transient database errors.
+
+Write functions are wrapped with :func:`retry_transient`, which re-runs the
+whole function (and therefore the whole transaction) when it fails with an
+error the database is known to recover from: serialization failures,
+deadlocks, lock timeouts, pool timeouts and dropped connections.
+"""
+
+import functools
+import random
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import ParamSpec, TypeVar
+
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.settings import get_settings
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+# SQLSTATEs after which Postgres has rolled the transaction back, so running
+# it again can't apply anything twice
+ROLLED_BACK_SQLSTATES = {
+    "40001",  # serialization_failure
+    "40P01",  # deadlock_detected
+    "55P03",  # lock_not_available
+    "57P03",  # cannot_connect_now
+}
+
+# SQLSTATEs of a server shutting down, which may happen after it committed
+# the transaction, so running it again may apply it twice
+SHUTDOWN_SQLSTATES = {
+    "57P01",  # admin_shutdown
+    "57P02",  # crash_shutdown
+}
+
+# Messages of transient errors from drivers that don't report a SQLSTATE
+TRANSIENT_MESSAGES = (
+    "database is locked",
+    "could not connect",
+    "connection refused",
+    "could not serialize",
+    "deadlock detected",
+    "timeout expired",
+)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Bounded exponential backoff with full jitter."""
+
+    max_attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return how long to sleep after the given failed attempt (1-based)."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return random.uniform(0, ceiling)
+
+
+class RetryStats:
+    """Thread-safe counters of retries and give-ups per function."""
+
+    def __init__(self) -> None:
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self.retries: Counter[str] = Counter()
+        self.give_ups: Counter[str] = Counter()
+
+    def record_retry(self, name: str) -> None:
+        """Count one retry of the named function."""
+        with self._lock:
+            self.retries[name] += 1
+
+    def record_give_up(self, name: str) -> None:
+        """Count a call that still failed after being retried."""
+        with self._lock:
+            self.give_ups[name] += 1
+
+    def snapshot(self) -> dict[str, dict[str, int]]:
+        """Return a copy of the counters."""
+        with self._lock:
+            return {"retries": dict(self.retries), "give_ups": dict(self.give_ups)}
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        with self._lock:
+            self.retries.clear()
+            self.give_ups.clear()
+
+
+# Global retry counters
+retry_stats = RetryStats()
+
+
+def is_retryable(exc: BaseException, idempotent: bool = True) -> bool:
+    """Decide whether a failed database call can safely be run again.
+
+    Args:
+        exc: Exception raised by the call
+        idempotent: Whether applying the call twice has the same effect as
+            applying it once. A connection that drops or a server that shuts
+            down mid-transaction may do so after the commit reached the
+            server, so such errors are only retried for idempotent calls.
+
+    Returns:
+        True if the call should be retried
+    """
+    if isinstance(exc, PoolTimeoutError):
+        # Never got a connection, so nothing was sent
+        return True
+
+    if not isinstance(exc, DBAPIError):
+        return False
+
+    if exc.connection_invalidated:
+        return idempotent
+
+    sqlstate = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    if sqlstate in SHUTDOWN_SQLSTATES:
+        return idempotent
+    if sqlstate:
+        # Class 08 is connection exceptions raised while connecting
+        return sqlstate in ROLLED_BACK_SQLSTATES or sqlstate.startswith("08")
+
+    if isinstance(exc, OperationalError):
+        message = str(exc.orig).lower()
+        return any(marker in message for marker in TRANSIENT_MESSAGES)
+
+    return False
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Build the retry policy from the current settings."""
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.db_retry_max_attempts,
+        base_delay=settings.db_retry_base_delay,
+        max_delay=settings.db_retry_max_delay,
+    )
+
+
+def retry_transient(
+    idempotent: bool = True,
+) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """Retry the decorated database function on transient errors.
+
+    The function must open its own session, so each attempt runs in a fresh
+    transaction after the previous one was rolled back.
+
+    Args:
+        idempotent: Whether the function may be retried after a connection
+            dropped at an unknown point (see :func:`is_retryable`)
+    """
+
+    def decorator(func: Callable[P, R]) -> Callable[P, R]:
+        name = func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            policy = get_retry_policy()
+            attempt = 1
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except Exception as exc:
+                    if not is_retryable(exc, idempotent):
+                        raise
+                    if attempt >= policy.max_attempts:
+                        retry_stats.record_give_up(name)
+                        raise
+                    retry_stats.record_retry(name)
+                    time.sleep(policy.backoff(attempt))
+                    attempt += 1
+
+        return wrapper
+
+    return decorator
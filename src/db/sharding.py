@@ -0,0 +1,142 @@
+"""Hash sharding of owners over several databases.
+
+With ``database_shard_urls`` set, every owner's tasks, tags and change log
+live in one of those databases, picked by consistent hashing of the owner
+ID. The db functions need no changes: :func:`src.db.engine.get_engine`
+returns the engine of the current owner's shard, so each call only talks
+to that shard.
+
+Jobs that cover every owner (purge, dedupe, admin reads) run once per
+shard, either one shard at a time in :func:`shard_scope` or in parallel
+with :func:`scatter_gather`. Inside :func:`src.db.tenancy.all_owners_scope`
+a shard must be picked explicitly, so such a job can't silently cover only
+one shard.
+
+Consistent hashing moves few owners when a shard is added: about
+``1 / shards`` of them, all to the new shard. Add shards at the end of the
+list and move the affected owners with ``python -m src.db.rebalance``.
+"""
+
+import bisect
+import hashlib
+from collections.abc import Callable, Generator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import lru_cache
+from typing import TypeVar
+
+from src.db.tenancy import current_owner_id, in_all_owners_scope
+from src.settings import get_settings
+
+T = TypeVar("T")
+
+# Points per shard on the hash ring; more even out the shard sizes
+VIRTUAL_NODES = 100
+
+_shard: ContextVar[int | None] = ContextVar("shard", default=None)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring mapping keys to shard indexes."""
+
+    def __init__(self, shards: int, virtual_nodes: int = VIRTUAL_NODES) -> None:
+        """Place ``virtual_nodes`` points of each of ``shards`` shards on the ring.
+
+        A shard's points only depend on its index, so appending a shard
+        leaves every existing point in place.
+        """
+        points = sorted(
+            (_hash(f"shard-{shard}-{node}"), shard)
+            for shard in range(shards)
+            for node in range(virtual_nodes)
+        )
+        self._hashes = [point for point, _shard in points]
+        self._shards = [shard for _point, shard in points]
+
+    def shard_for(self, key: int) -> int:
+        """Get the shard of a key: the first point clockwise of its hash."""
+        index = bisect.bisect(self._hashes, _hash(f"key-{key}"))
+        return self._shards[index % len(self._shards)]
+
+
+@lru_cache(maxsize=8)
+def _ring(shards: int) -> HashRing:
+    return HashRing(shards)
+
+
+def shard_count() -> int:
+    """Get the number of shards, 1 when sharding is off."""
+    return max(1, len(get_settings().database_shard_urls))
+
+
+def sharding_enabled() -> bool:
+    """Check whether more than the single ``database_url`` is in use."""
+    return bool(get_settings().database_shard_urls)
+
+
+def shard_for_owner(owner_id: int) -> int:
+    """Get the index of the shard holding an owner's data."""
+    return _ring(shard_count()).shard_for(owner_id)
+
+
+def current_shard() -> int:
+    """Get the shard sessions opened in the current context go to.
+
+    Raises:
+        RuntimeError: If a job covering every owner didn't pick a shard
+    """
+    shard = _shard.get()
+    if shard is not None:
+        return shard
+    if in_all_owners_scope() and sharding_enabled():
+        raise RuntimeError(
+            "Jobs covering every owner must run per shard, "
+            "see shard_scope() and scatter_gather()"
+        )
+    return shard_for_owner(current_owner_id())
+
+
+@contextmanager
+def shard_scope(shard: int) -> Generator[None, None, None]:
+    """Send sessions opened inside the block to the given shard."""
+    token = _shard.set(shard)
+    try:
+        yield
+    finally:
+        _shard.reset(token)
+
+
+def _run_in_shard(shard: int, function: Callable[[], T]) -> T:
+    with shard_scope(shard):
+        return function()
+
+
+def scatter_gather(
+    function: Callable[[], T], max_workers: int | None = None
+) -> list[T]:
+    """Run a function once per shard, in parallel, each in its shard's scope.
+
+    The function runs in a copy of the caller's context, so owner and
+    all-owners scopes carry over.
+
+    Args:
+        function: Work to do on one shard
+        max_workers: Threads to use (default one per shard)
+
+    Returns:
+        The function's result on each shard, in shard order
+    """
+    shards = shard_count()
+    if shards == 1:
+        return [_run_in_shard(0, function)]
+    with ThreadPoolExecutor(max_workers or shards) as pool:
+        futures = [
+            pool.submit(copy_context().run, _run_in_shard, shard, function)
+            for shard in range(shards)
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,253 @@
+"""Pre-built statements of the hot database functions.
+
+Building a ``select(Task).where(...)`` costs more Python time than running
+it against a warm database: every call constructs the expression tree and
+SQLAlchemy walks it again to compute the key of its compiled-SQL cache.
+The statements below are built once, with bound parameters in place of the
+values, and executed with ``session.exec(statement, params={...})``, so a
+call only supplies its parameters. Statements that vary with the
+arguments, such as the filters of :func:`list_tasks_statement` or the
+columns an edit sets, are built on first use and cached per variant.
+
+Because the SQL text of each statement never changes, drivers that prepare
+statements on the server (psycopg 3, see ``database_prepare_threshold``)
+can reuse one prepared statement per variant.
+"""
+
+from functools import cache, lru_cache
+from typing import Any
+
+from sqlalchemy import Boolean, Integer, Update, bindparam, cast, nulls_last
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import defer
+from sqlalchemy.sql.compiler import SQLCompiler
+from sqlalchemy.sql.functions import FunctionElement
+from sqlmodel import col, func, select, update
+from sqlmodel.sql.expression import SelectOfScalar
+
+from src.models import TAG_IDS_TYPE, Tag, Task, TaskChange
+
+# Leaves out the unbounded description of tasks in list views; reading it
+# from a loaded task raises instead of querying once per task
+WITHOUT_DESCRIPTION = defer(Task.description, raiseload=True)  # type: ignore[arg-type]
+
+# Live task of an owner, by ID: task_id, owner
+TASK_BY_ID = select(Task).where(
+    col(Task.id) == bindparam("task_id"),
+    col(Task.owner_id) == bindparam("owner"),
+    col(Task.deleted_at).is_(None),
+)
+
+# TASK_BY_ID re-read into the session after a lost race
+TASK_BY_ID_FRESH = TASK_BY_ID.execution_options(populate_existing=True)
+
+# TASK_BY_ID, locking the row until the end of the transaction, so that
+# changes to its tags and their copy in tag_ids can't interleave
+TASK_BY_ID_FOR_UPDATE = TASK_BY_ID.with_for_update()
+
+# Soft-deleted task of an owner, by ID: task_id, owner
+DELETED_TASK_BY_ID = select(Task).where(
+    col(Task.id) == bindparam("task_id"),
+    col(Task.owner_id) == bindparam("owner"),
+    col(Task.deleted_at).is_not(None),
+)
+
+# Row version of a live task: task_id, owner
+TASK_VERSION = select(Task.version).where(
+    col(Task.id) == bindparam("task_id"),
+    col(Task.owner_id) == bindparam("owner"),
+    col(Task.deleted_at).is_(None),
+)
+
+# Latest change log entry of an owner: owner
+LAST_CHANGE_ID = select(func.max(col(TaskChange.id))).where(
+    col(TaskChange.owner_id) == bindparam("owner")
+)
+
+# Tag of an owner, by ID: tag_id, owner
+TAG_BY_ID = select(Tag).where(
+    col(Tag.id) == bindparam("tag_id"), col(Tag.owner_id) == bindparam("owner")
+)
+
+# Tags of an owner by name: owner
+TAGS = select(Tag).where(col(Tag.owner_id) == bindparam("owner")).order_by(Tag.name)
+
+# Soft-delete a live task: task_id, owner, now
+SOFT_DELETE = (
+    update(Task)
+    .where(
+        col(Task.id) == bindparam("task_id"),
+        col(Task.owner_id) == bindparam("owner"),
+        col(Task.deleted_at).is_(None),
+    )
+    .values(
+        deleted_at=bindparam("now"),
+        updated_at=bindparam("now"),
+        version=col(Task.version) + 1,
+    )
+    .execution_options(synchronize_session=False)
+)
+
+# Undo a soft delete: task_id, owner, now
+RESTORE = (
+    update(Task)
+    .where(
+        col(Task.id) == bindparam("task_id"),
+        col(Task.owner_id) == bindparam("owner"),
+        col(Task.deleted_at).is_not(None),
+    )
+    .values(
+        deleted_at=None,
+        updated_at=bindparam("now"),
+        version=col(Task.version) + 1,
+    )
+    .execution_options(synchronize_session=False)
+)
+
+
+# Rewrite the tag_ids of a task after its links changed:
+# task_id, owner, new_tag_ids, now
+SET_TAG_IDS = (
+    update(Task)
+    .where(
+        col(Task.id) == bindparam("task_id"),
+        col(Task.owner_id) == bindparam("owner"),
+    )
+    .values(
+        tag_ids=bindparam("new_tag_ids", type_=TAG_IDS_TYPE),
+        updated_at=bindparam("now"),
+        version=col(Task.version) + 1,
+    )
+    .execution_options(synchronize_session=False)
+)
+
+
+class has_tag(FunctionElement[bool]):  # noqa: N801 - used like func.*
+    """Whether a ``tag_ids`` column holds a tag ID: ``has_tag(column, tag_id)``.
+
+    Compiles to an array containment on Postgres, which the GIN index on
+    ``task.tag_ids`` serves, and to a ``json_each`` lookup elsewhere.
+    """
+
+    type = Boolean()
+    name = "has_tag"
+    inherit_cache = True
+
+
+@compiles(has_tag, "postgresql")
+def _has_tag_postgresql(element: has_tag, compiler: SQLCompiler, **kw: Any) -> str:
+    column, tag_id = element.clauses
+    tag = compiler.process(cast(tag_id, Integer), **kw)
+    return f"({compiler.process(column, **kw)} @> ARRAY[{tag}])"
+
+
+@compiles(has_tag)
+def _has_tag_json(element: has_tag, compiler: SQLCompiler, **kw: Any) -> str:
+    column, tag_id = element.clauses
+    return (
+        f"EXISTS (SELECT 1 FROM json_each({compiler.process(column, **kw)}) "
+        f"WHERE json_each.value = {compiler.process(tag_id, **kw)})"
+    )
+
+
+@cache
+def list_tasks_statement(
+    completed: bool,
+    priority: bool,
+    limit: bool,
+    offset: bool,
+    summary: bool,
+    tag: bool = False,
+) -> SelectOfScalar[Task]:
+    """Get the statement listing an owner's live tasks in display order.
+
+    Args:
+        completed: Filter by the ``completed`` parameter
+        priority: Filter by the ``priority`` parameter
+        limit: Return at most ``limit`` tasks
+        offset: Skip the first ``offset`` tasks
+        summary: Don't load descriptions
+        tag: Filter by the ``tag_id`` parameter, from ``tag_ids``
+
+    Returns:
+        Statement taking ``owner`` and the parameters enabled above
+    """
+    statement = select(Task).where(
+        col(Task.owner_id) == bindparam("owner"), col(Task.deleted_at).is_(None)
+    )
+    if completed:
+        statement = statement.where(col(Task.completed) == bindparam("completed"))
+    if priority:
+        statement = statement.where(col(Task.priority) == bindparam("priority"))
+    if tag:
+        statement = statement.where(has_tag(col(Task.tag_ids), bindparam("tag_id")))
+
+    # Order by: incomplete first, then by due date, then by priority
+    statement = statement.order_by(
+        col(Task.completed),
+        nulls_last(col(Task.due_date)),
+        col(Task.priority).desc(),
+        col(Task.id),
+    )
+
+    if offset:
+        statement = statement.offset(bindparam("offset"))
+    if limit:
+        statement = statement.limit(bindparam("limit"))
+    if summary:
+        statement = statement.options(WITHOUT_DESCRIPTION)
+    return statement
+
+
+@lru_cache(maxsize=256)
+def edit_statement(columns: tuple[str, ...]) -> Update:
+    """Get the conditional UPDATE of an edit setting the given columns.
+
+    Args:
+        columns: Names of the edited columns, in a stable order
+
+    Returns:
+        Statement taking ``task_id``, ``read_version``, ``new_version``,
+        ``new_updated_at`` and ``new_<column>`` for each edited column
+    """
+    values: dict[str, Any] = {name: bindparam(f"new_{name}") for name in columns}
+    return (
+        update(Task)
+        .where(
+            col(Task.id) == bindparam("task_id"),
+            col(Task.version) == bindparam("read_version"),
+        )
+        .values(
+            **values,
+            updated_at=bindparam("new_updated_at"),
+            version=bindparam("new_version"),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+@lru_cache(maxsize=256)
+def revert_statement(columns: tuple[str, ...]) -> Update:
+    """Get the UPDATE of an undo setting the given columns back.
+
+    Args:
+        columns: Names of the reverted columns, in a stable order
+
+    Returns:
+        Statement taking ``task_id``, ``owner``, ``now`` and ``new_<column>``
+        for each reverted column
+    """
+    values: dict[str, Any] = {name: bindparam(f"new_{name}") for name in columns}
+    return (
+        update(Task)
+        .where(
+            col(Task.id) == bindparam("task_id"),
+            col(Task.owner_id) == bindparam("owner"),
+        )
+        .values(
+            **values,
+            updated_at=bindparam("now"),
+            version=col(Task.version) + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,70 @@
+"""In-process cache of tag IDs by owner and name.
+
+Tags are never renamed, so a name keeps resolving to the same ID for as long
+as the tag exists. :func:`create_tag` and :func:`get_or_create_tags` add every
+tag they create or resolve; code that deletes tags directly must call
+:meth:`TagCache.clear` afterwards.
+"""
+
+import threading
+from collections.abc import Iterable, Mapping
+
+from src.metrics import counter
+
+lookups = counter(
+    "todo_tag_cache_lookups_total", "Tag ID lookups in the tag cache.", ["result"]
+)
+_hits = lookups.labels("hit")
+_misses = lookups.labels("miss")
+
+
+class TagCache:
+    """Thread-safe mapping of (owner ID, tag name) to tag ID."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._ids: dict[tuple[int, str], int] = {}
+
+    def get(self, owner_id: int, name: str) -> int | None:
+        """Return the cached ID of a tag, or None if it isn't cached."""
+        with self._lock:
+            tag_id = self._ids.get((owner_id, name))
+        (_misses if tag_id is None else _hits).inc()
+        return tag_id
+
+    def get_many(self, owner_id: int, names: Iterable[str]) -> dict[str, int]:
+        """Return the cached IDs of whichever of the given tags are cached."""
+        names = list(names)
+        with self._lock:
+            ids = self._ids
+            found = {
+                name: ids[owner_id, name] for name in names if (owner_id, name) in ids
+            }
+        _hits.inc(len(found))
+        _misses.inc(len(names) - len(found))
+        return found
+
+    def put(self, owner_id: int, name: str, tag_id: int) -> None:
+        """Cache the ID of a tag."""
+        with self._lock:
+            self._ids[owner_id, name] = tag_id
+
+    def put_many(self, owner_id: int, ids: Mapping[str, int]) -> None:
+        """Cache the IDs of several tags of one owner."""
+        with self._lock:
+            self._ids.update(((owner_id, name), tag_id) for name, tag_id in ids.items())
+
+    def discard(self, owner_id: int, name: str) -> None:
+        """Forget a tag, e.g. after deleting it."""
+        with self._lock:
+            self._ids.pop((owner_id, name), None)
+
+    def clear(self) -> None:
+        """Forget every tag."""
+        with self._lock:
+            self._ids.clear()
+
+
+# Global tag cache
+tag_cache = TagCache()
@@ -0,0 +1,103 @@
+"""Owner scoping of database access.
+
+Every task, tag and tag link belongs to an owner. The db functions only
+see and create rows of the current owner, which is bound per context (each
+Streamlit session or API request runs in its own context) and falls back to
+the ``default_owner_id`` setting for single-user deployments and scripts.
+
+With ``row_level_security`` enabled, Postgres enforces the same isolation:
+sessions pass the owner to the database with ``SET LOCAL``-scoped settings
+and the policies created by :func:`enable_row_level_security` hide other
+owners' rows even from a query that forgot its owner filter.
+"""
+
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from src.settings import get_settings
+
+# Tables holding per-owner rows
+OWNED_TABLES = ("task", "tag", "task_tag_link", "task_change", "task_signature")
+
+_owner_id: ContextVar[int | None] = ContextVar("owner_id", default=None)
+_all_owners: ContextVar[bool] = ContextVar("all_owners", default=False)
+
+
+def bind_owner(owner_id: int) -> None:
+    """Scope database access in the current context to the given owner."""
+    _owner_id.set(owner_id)
+
+
+def current_owner_id() -> int:
+    """Get the owner the current context is scoped to."""
+    owner_id = _owner_id.get()
+    if owner_id is None:
+        return get_settings().default_owner_id
+    return owner_id
+
+
+@contextmanager
+def owner_scope(owner_id: int) -> Generator[None, None, None]:
+    """Scope database access inside the block to the given owner."""
+    token = _owner_id.set(owner_id)
+    try:
+        yield
+    finally:
+        _owner_id.reset(token)
+
+
+@contextmanager
+def all_owners_scope() -> Generator[None, None, None]:
+    """Let maintenance jobs such as the purge see every owner's rows."""
+    token = _all_owners.set(True)
+    try:
+        yield
+    finally:
+        _all_owners.reset(token)
+
+
+def in_all_owners_scope() -> bool:
+    """Check whether the current context is inside :func:`all_owners_scope`."""
+    return _all_owners.get()
+
+
+def apply_row_level_security(connection: Connection) -> None:
+    """Pass the current scope to the row-level security policies.
+
+    The settings are transaction-local, so they never leak to the next
+    user of a pooled connection.
+    """
+    connection.execute(
+        text(
+            "SELECT set_config('app.owner_id', :owner_id, true), "
+            "set_config('app.all_owners', :all_owners, true)"
+        ),
+        {
+            "owner_id": str(current_owner_id()),
+            "all_owners": "on" if in_all_owners_scope() else "off",
+        },
+    )
+
+
+def enable_row_level_security(connection: Connection) -> None:
+    """Enable and force row-level security on the owned tables (Postgres).
+
+    Policies are forced so they apply to the table owner as well, which is
+    usually the role the app connects as.
+    """
+    for table in OWNED_TABLES:
+        connection.execute(text(f"ALTER TABLE {table} ENABLE ROW LEVEL SECURITY"))
+        connection.execute(text(f"ALTER TABLE {table} FORCE ROW LEVEL SECURITY"))
+        connection.execute(text(f"DROP POLICY IF EXISTS owner_isolation ON {table}"))
+        connection.execute(
+            text(
+                f"CREATE POLICY owner_isolation ON {table} USING ("
+                "current_setting('app.all_owners', true) = 'on' "
+                "OR owner_id = nullif(current_setting('app.owner_id', true), '')::int"
+                ")"
+            )
+        )
@@ -0,0 +1,388 @@
+"""Write-behind queue for edits originating from the UI.
+
+Toggling a checkbox shouldn't block the Streamlit rerun on a database round
+trip. With write-behind enabled, edits are queued in-process and a worker
+thread flushes them in batches through :func:`edit_tasks`. Edits of a task
+that is still queued are merged into one, and fields changed back to their
+original value are dropped, so toggling a task done and undone again writes
+nothing at all.
+
+The ``write_behind_mode`` setting picks the durability trade-off:
+
+- ``off``: edits are written synchronously, as before
+- ``wait``: callers block until their edit is committed, but concurrent
+  edits share a transaction
+- ``async``: callers return as soon as the edit is queued; queued edits are
+  flushed on shutdown, but lost if the process dies first
+"""
+
+import atexit
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+from src.db.exceptions import StaleTaskError, WriteBehindFullError
+from src.db.functions.edit_task import edit_task
+from src.db.functions.edit_tasks import EditTasksResult, TaskEdit, edit_tasks
+from src.db.tenancy import current_owner_id, owner_scope
+from src.models import Task
+from src.settings import get_settings
+
+# TaskEdit attributes that are column values rather than edit metadata
+_EDIT_FIELDS = [
+    f.name for f in fields(TaskEdit) if f.name not in ("task_id", "expected_version")
+]
+
+
+class PendingWrite:
+    """Completion handle for a queued edit."""
+
+    def __init__(self) -> None:
+        """Initialize an incomplete write."""
+        self._done = threading.Event()
+        self.error: BaseException | None = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the edit was committed, rejected or cancelled out."""
+        return self._done.is_set()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Wait until the edit is committed.
+
+        Raises:
+            TimeoutError: If the edit wasn't flushed within ``timeout``
+            StaleTaskError: If the task was modified concurrently
+            ValueError: If the task doesn't exist
+        """
+        if not self._done.wait(timeout):
+            raise TimeoutError("Queued edit was not flushed in time")
+        if self.error is not None:
+            raise self.error
+
+    def _complete(self, error: BaseException | None = None) -> None:
+        self.error = error
+        self._done.set()
+
+
+@dataclass
+class _Entry:
+    """Net change of one task waiting to be flushed."""
+
+    task_id: int
+    owner_id: int  # the worker writes each entry in its submitter's scope
+    expected_version: int | None
+    original: dict[str, Any]
+    changes: dict[str, Any] = field(default_factory=dict)
+    write: PendingWrite = field(default_factory=PendingWrite)
+
+    def to_edit(self) -> TaskEdit:
+        return TaskEdit(self.task_id, self.expected_version, **self.changes)
+
+
+@dataclass
+class WriteBehindStats:
+    """Counters of queued and flushed edits."""
+
+    submitted: int = 0
+    coalesced: int = 0  # merged into an edit that was already queued
+    cancelled: int = 0  # queued edits whose changes cancelled out
+    flushed: int = 0  # edits sent to the database
+    batches: int = 0
+    failed: int = 0  # conflicts, missing tasks and database errors
+
+
+class WriteBehindQueue:
+    """Coalescing queue of task edits flushed in batches by a worker thread."""
+
+    def __init__(
+        self,
+        flush: Callable[[Sequence[TaskEdit]], EditTasksResult] = edit_tasks,
+        max_pending: int = 1000,
+        batch_size: int = 100,
+        flush_interval: float = 0.05,
+        put_timeout: float = 5.0,
+    ):
+        """Initialize the queue and start its worker thread.
+
+        Args:
+            flush: Function writing a batch of edits in one transaction
+            max_pending: Tasks with queued edits before submitters block
+            batch_size: Edits written per transaction
+            flush_interval: Seconds the worker waits to collect a batch
+            put_timeout: Seconds a submitter blocks on a full queue before
+                giving up with WriteBehindFullError
+        """
+        self._flush = flush
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.stats = WriteBehindStats()
+
+        self._condition = threading.Condition()
+        # Queued entries by owner and task ID, in submission order
+        self._pending: dict[tuple[int, int], _Entry] = {}
+        # Entries of the batch being written
+        self._in_flight: dict[tuple[int, int], _Entry] = {}
+        # Conflicts not yet taken, by the owner who submitted the edit
+        self._conflicts: dict[int, list[StaleTaskError]] = {}
+        self._closed = False
+        self._flush_requested = False
+        self._worker = threading.Thread(
+            target=self._run, name="write-behind", daemon=True
+        )
+        self._worker.start()
+
+    def submit(self, edit: TaskEdit, original: Task | None = None) -> PendingWrite:
+        """Queue an edit, merging it with a queued edit of the same task.
+
+        Args:
+            edit: Edit to apply
+            original: Task as the caller read it. Fields changed back to
+                their value in the first queued edit's original are dropped.
+
+        Returns:
+            Handle to wait for the edit to be committed
+
+        Raises:
+            WriteBehindFullError: If the queue stayed full for ``put_timeout``
+        """
+        changes = {
+            name: getattr(edit, name)
+            for name in _EDIT_FIELDS
+            if getattr(edit, name) is not None
+        }
+        deadline = time.monotonic() + self.put_timeout
+        key = (current_owner_id(), edit.task_id)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Write-behind queue is closed")
+            self.stats.submitted += 1
+
+            # Wait for room unless the task is queued already; another
+            # submitter may queue it while this one waits
+            while key not in self._pending and len(self._pending) >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise WriteBehindFullError(
+                        f"{len(self._pending)} edits are waiting to be written"
+                    )
+
+            entry = self._pending.get(key)
+            if entry is None:
+                original_values = {}
+                if original is not None:
+                    original_values = {
+                        name: getattr(original, name) for name in _EDIT_FIELDS
+                    }
+                entry = _Entry(
+                    edit.task_id, key[0], edit.expected_version, original_values
+                )
+                self._pending[key] = entry
+            else:
+                self.stats.coalesced += 1
+
+            entry.changes.update(changes)
+            for name, value in list(entry.changes.items()):
+                if name in entry.original and entry.original[name] == value:
+                    del entry.changes[name]
+
+            if not entry.changes:
+                # Back to where it started: nothing to write
+                del self._pending[key]
+                self.stats.cancelled += 1
+                entry.write._complete()
+            self._condition.notify_all()
+
+            return entry.write
+
+    def overlay(self, tasks: Sequence[Task]) -> list[Task]:
+        """Apply edits that haven't been committed yet to tasks read from the db.
+
+        Only edits submitted in the current owner's scope are applied.
+
+        Returns:
+            Copies of the tasks with queued and in-flight changes applied
+        """
+        owner_id = current_owner_id()
+        with self._condition:
+            changes: dict[int, dict[str, Any]] = {}
+            for entries in (self._in_flight, self._pending):
+                for (entry_owner_id, task_id), entry in entries.items():
+                    if entry_owner_id == owner_id:
+                        changes.setdefault(task_id, {}).update(entry.changes)
+
+        result = []
+        for task in tasks:
+            task_changes = changes.get(task.id) if task.id is not None else None
+            if task_changes:
+                task = task.model_copy(update=task_changes)
+            result.append(task)
+        return result
+
+    def take_conflicts(self) -> list[StaleTaskError]:
+        """Return and forget the conflicts hit by queued edits so far.
+
+        Only conflicts of edits submitted in the current owner's scope are
+        returned; other owners' are kept for them.
+        """
+        with self._condition:
+            return self._conflicts.pop(current_owner_id(), [])
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Wait until every edit queued so far has been written.
+
+        Returns:
+            True if the queue drained within ``timeout``
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._pending or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Flush queued edits and stop the worker."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+
+                # Give concurrent edits a moment to join the batch
+                deadline = time.monotonic() + self.flush_interval
+                while (
+                    not self._closed
+                    and not self._flush_requested
+                    and len(self._pending) < self.batch_size
+                ):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+
+                if not self._pending:
+                    self._flush_requested = False
+                    if self._closed:
+                        return
+                    continue
+
+                keys = list(self._pending)[: self.batch_size]
+                for key in keys:
+                    self._in_flight[key] = self._pending.pop(key)
+                if not self._pending:
+                    self._flush_requested = False
+                batch = list(self._in_flight.values())
+                # Room for submitters blocked on a full queue
+                self._condition.notify_all()
+
+            self._write(batch)
+
+    def _write(self, batch: list[_Entry]) -> None:
+        errors: dict[tuple[int, int], BaseException] = {}
+        versions: dict[tuple[int, int], int] = {}
+        by_owner: dict[int, list[_Entry]] = {}
+        for entry in batch:
+            by_owner.setdefault(entry.owner_id, []).append(entry)
+
+        for owner_id, entries in by_owner.items():
+            try:
+                with owner_scope(owner_id):
+                    result = self._flush([entry.to_edit() for entry in entries])
+            except Exception as exc:
+                errors.update({(owner_id, entry.task_id): exc for entry in entries})
+                continue
+            for error in result.conflicts:
+                errors[owner_id, error.task_id] = error
+            for task_id in result.missing:
+                errors[owner_id, task_id] = ValueError(
+                    f"Task with id {task_id} not found"
+                )
+            for task in result.updated:
+                if task.id is not None:
+                    versions[owner_id, task.id] = task.version
+
+        with self._condition:
+            self.stats.batches += len(by_owner)
+            self.stats.flushed += len(batch)
+            self.stats.failed += len(errors)
+            for (owner_id, _task_id), failure in errors.items():
+                if isinstance(failure, StaleTaskError):
+                    self._conflicts.setdefault(owner_id, []).append(failure)
+            for entry in batch:
+                key = (entry.owner_id, entry.task_id)
+                del self._in_flight[key]
+                # A follow-up edit queued during the write was based on the
+                # version before it; rebase it on the version just written
+                queued = self._pending.get(key)
+                if (
+                    queued is not None
+                    and key in versions
+                    and queued.expected_version == entry.expected_version
+                ):
+                    queued.expected_version = versions[key]
+                entry.write._complete(errors.get(key))
+            self._condition.notify_all()
+
+
+_queue: WriteBehindQueue | None = None
+_queue_lock = threading.Lock()
+
+
+def get_write_behind_queue() -> WriteBehindQueue:
+    """Get or create the process-wide write-behind queue.
+
+    The queue is flushed when the interpreter exits.
+    """
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                settings = get_settings()
+                _queue = WriteBehindQueue(
+                    max_pending=settings.write_behind_max_pending,
+                    batch_size=settings.write_behind_batch_size,
+                    flush_interval=settings.write_behind_flush_interval,
+                )
+                atexit.register(_queue.close)
+    return _queue
+
+
+def queue_edit(edit: TaskEdit, original: Task | None = None) -> None:
+    """Apply an edit according to the ``write_behind_mode`` setting.
+
+    Args:
+        edit: Edit to apply
+        original: Task as the caller read it, to cancel out reverted changes
+
+    Raises:
+        StaleTaskError: If the task was modified concurrently (off and wait
+            modes only; in async mode see WriteBehindQueue.take_conflicts)
+        ValueError: If the task doesn't exist (off and wait modes only)
+        WriteBehindFullError: If the queue stayed full for too long
+        TimeoutError: If the edit wasn't committed within
+            ``write_behind_wait_timeout`` (wait mode only)
+    """
+    mode = get_settings().write_behind_mode
+    if mode == "off":
+        changes = {name: getattr(edit, name) for name in _EDIT_FIELDS}
+        edit_task(edit.task_id, expected_version=edit.expected_version, **changes)
+        return
+
+    write = get_write_behind_queue().submit(edit, original)
+    if mode == "wait":
+        write.wait(get_settings().write_behind_wait_timeout)
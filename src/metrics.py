@@ -0,0 +1,441 @@
+"""In-process metrics, exported in the Prometheus text format.
+
+Counters, gauges and histograms are kept in memory and rendered by
+:func:`render`; with ``metrics_port`` set, the app and the API serve them
+from a local HTTP endpoint (see :func:`start_metrics_server`) for Prometheus
+to scrape::
+
+    curl http://127.0.0.1:9464/metrics
+
+Collected out of the box:
+
+- latency and errors of every function in ``src.db.functions``
+  (:func:`timed`),
+- pool checkout time and connections in use of every engine
+  (``src.db.engine``),
+- tag cache hits and misses (``src.db.tag_cache``),
+- tasks by state, counted over every shard at scrape time.
+
+Recording is always on, so it must stay cheap: a timed call costs two clock
+reads and one histogram update, well under :data:`OVERHEAD_BUDGET_US` (see
+``benchmarks/metrics_overhead.py``).
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Sequence
+from typing import TYPE_CHECKING, ParamSpec, TypeVar
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+logger = logging.getLogger(__name__)
+
+# Added cost of a timed call, in microseconds, that the benchmark enforces
+OVERHEAD_BUDGET_US = 2.0
+
+# Upper bounds of latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Task counts are cached between scrapes for this long, in seconds
+TASK_COUNT_INTERVAL = 30.0
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + ",".join(pairs) + "}"
+
+
+class _Value:
+    """A float behind a lock; the child of a counter or gauge."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Add to the value."""
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Subtract from the value."""
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        """Replace the value."""
+        with self._lock:
+            self.value = value
+
+
+class _Buckets:
+    """Observation counts per bucket; the child of a histogram."""
+
+    def __init__(self, upper_bounds: Sequence[float]) -> None:
+        self._lock = threading.Lock()
+        self._upper_bounds = upper_bounds
+        # Counts per bucket, not cumulative; the last one is +Inf
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record one observation."""
+        index = bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Metric(ABC):
+    """A named metric, with a child per combination of label values."""
+
+    kind = ""
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self) -> object:
+        """Create the value holder of one combination of label values."""
+
+    def _child(self, values: tuple[str, ...]) -> object:
+        if len(values) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} takes labels {self.labelnames}, got {len(values)} values"
+            )
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    @abstractmethod
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        """Yield the name, rendered labels and value of each sample."""
+
+    def render(self) -> str:
+        """Render the metric in the Prometheus text format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(
+            f"{name}{labels} {_format_value(value)}"
+            for name, labels, value in self._samples()
+        )
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """A value that only goes up, like a number of events."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def labels(self, *values: str) -> _Value:
+        """Get the counter of the given label values, to call ``inc`` on."""
+        child = self._child(values)
+        assert isinstance(child, _Value)
+        return child
+
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        for values, child in list(self._children.items()):
+            assert isinstance(child, _Value)
+            yield self.name, _format_labels(self.labelnames, values), child.value
+
+
+class Gauge(Counter):
+    """A value that goes up and down, like a number of open connections."""
+
+    kind = "gauge"
+
+
+class Histogram(_Metric):
+    """Counts of observations in buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        """Create a histogram with the given bucket upper bounds, in seconds."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def labels(self, *values: str) -> _Buckets:
+        """Get the histogram of the given label values, to call ``observe`` on."""
+        child = self._child(values)
+        assert isinstance(child, _Buckets)
+        return child
+
+    def _samples(self) -> Iterator[tuple[str, str, float]]:
+        names = (*self.labelnames, "le")
+        bounds = [_format_value(bound) for bound in (*self.buckets, math.inf)]
+        for values, child in list(self._children.items()):
+            assert isinstance(child, _Buckets)
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(names, (*values, bound))
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, values)
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    """The metrics of a process, and callbacks that refresh some at scrape."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        """Add a metric; names must be unique."""
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Run the given callback before every render, e.g. to set gauges."""
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format.
+
+        A collector that fails is logged and skipped, so one broken source
+        doesn't hide the others.
+        """
+        with self._lock:
+            collectors, metrics = list(self._collectors), list(self._metrics.values())
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+        return "".join(metric.render() for metric in metrics)
+
+
+# Global registry
+registry = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Create a counter in the global registry."""
+    metric = Counter(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Create a gauge in the global registry."""
+    metric = Gauge(name, documentation, labelnames)
+    registry.register(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    """Create a histogram in the global registry."""
+    metric = Histogram(name, documentation, labelnames, buckets)
+    registry.register(metric)
+    return metric
+
+
+def render() -> str:
+    """Render the global registry in the Prometheus text format."""
+    return registry.render()
+
+
+function_seconds = histogram(
+    "todo_db_function_seconds",
+    "Latency of database functions, including retries.",
+    ["function"],
+)
+function_errors = counter(
+    "todo_db_function_errors_total",
+    "Calls of database functions that raised.",
+    ["function"],
+)
+tasks = gauge(
+    "todo_tasks", "Tasks of every owner by state, over every shard.", ["state"]
+)
+
+
+def timed(func: Callable[P, R]) -> Callable[P, R]:
+    """Record the latency and errors of the decorated database function.
+
+    Apply it outermost, so retries count towards the latency of the call.
+    """
+    name = func.__name__
+    seconds = function_seconds.labels(name)
+    errors = function_errors.labels(name)
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        start = clock()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            errors.inc()
+            raise
+        finally:
+            seconds.observe(clock() - start)
+
+    return wrapper
+
+
+class _TaskCountCollector:
+    """Sets the task gauges, counting at most every ``TASK_COUNT_INTERVAL``."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counted_at: float | None = None
+
+    def __call__(self) -> None:
+        # Imported here: src.db.engine imports this module
+        from src.db.admin import count_tasks
+
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._counted_at is not None
+                and now - self._counted_at < TASK_COUNT_INTERVAL
+            ):
+                return
+            counts = count_tasks()
+            self._counted_at = now
+        completed = sum(c.completed for c in counts)
+        tasks.labels("open").set(sum(c.live for c in counts) - completed)
+        tasks.labels("completed").set(completed)
+        tasks.labels("deleted").set(sum(c.deleted for c in counts))
+
+
+_collect_task_counts = _TaskCountCollector()
+
+
+_server: "ThreadingHTTPServer | None" = None
+_server_lock = threading.Lock()
+
+
+def _create_server(host: str, port: int) -> "ThreadingHTTPServer":
+    # Imported here: http.server takes longer to import than every module
+    # that records metrics
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            pass  # one line per scrape is noise
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve the metrics over HTTP from a daemon thread; idempotent.
+
+    Task counts are collected from the database at scrape time. Only the
+    first call starts a server: Streamlit runs the app script once per
+    rerun, and every call after the first returns the running server.
+
+    Args:
+        port: Port to listen on; 0 picks a free one
+        host: Interface to listen on, local only by default
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            registry.add_collector(_collect_task_counts)
+            server = _create_server(host, port)
+            threading.Thread(
+                target=server.serve_forever, name="metrics-server", daemon=True
+            ).start()
+            _server = server
+    return _server
+
+
+def stop_metrics_server() -> None:
+    """Stop the server started by :func:`start_metrics_server`, if any."""
+    global _server
+    with _server_lock:
+        if _server is not None:
+            _server.shutdown()
+            _server.server_close()
+            _server = None
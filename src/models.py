@@ -2,8 +2,24 @@
 
 from datetime import datetime
 from enum import Enum
-
-from sqlmodel import Field, Relationship, SQLModel
+from typing import Any
+
+from sqlalchemy import Integer
+from sqlalchemy.dialects import postgresql
+from sqlmodel import (
+    JSON,
+    Column,
+    Field,
+    Index,
+    Relationship,
+    SQLModel,
+    UniqueConstraint,
+    and_,
+    col,
+    func,
+)
+
+from src.db.tenancy import current_owner_id
 
 
 class Priority(str, Enum):
@@ -23,6 +39,24 @@ class RepeatInterval(str, Enum):
     MONTHLY = "monthly"
 
 
+class ChangeOperation(str, Enum):
+    """Kinds of task changes recorded in the change log."""
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    RESTORE = "restore"
+    TAG = "tag"
+    UNTAG = "untag"
+
+
+# IDs of a task's tags, copied from task_tag_link: an integer array on
+# Postgres, a JSON array elsewhere
+TAG_IDS_TYPE = JSON(none_as_null=True).with_variant(
+    postgresql.ARRAY(Integer), "postgresql"
+)
+
+
 class TaskTagLink(SQLModel, table=True):
     """Many-to-many relationship between tasks and tags."""
 
@@ -30,15 +64,19 @@ class TaskTagLink(SQLModel, table=True):
 
     task_id: int = Field(foreign_key="task.id", primary_key=True)
     tag_id: int = Field(foreign_key="tag.id", primary_key=True)
+    owner_id: int = Field(default_factory=current_owner_id)
 
 
 class Tag(SQLModel, table=True):
     """Tag model for categorizing tasks."""
 
     __tablename__ = "tag"
+    # Tag names are unique per owner; the constraint's index serves lookups
+    __table_args__ = (UniqueConstraint("owner_id", "name", name="uq_tag_owner_name"),)
 
     id: int | None = Field(default=None, primary_key=True)
-    name: str = Field(unique=True, index=True, max_length=50)
+    owner_id: int = Field(default_factory=current_owner_id)
+    name: str = Field(max_length=50)
     color: str = Field(max_length=7, default="#808080")  # Hex color
 
     # Relationships
@@ -49,19 +87,24 @@ class Task(SQLModel, table=True):
     """Task model with all TODO features."""
 
     __tablename__ = "task"
+    # Never reuse IDs of purged tasks, their change log entries may still exist
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id: int | None = Field(default=None, primary_key=True)
+    owner_id: int = Field(default_factory=current_owner_id)
     title: str = Field(max_length=200)
+    # Hash of the normalized title, for finding duplicates (see src.similarity)
+    title_hash: str | None = Field(default=None, max_length=16)
     description: str | None = Field(default=None)
-    completed: bool = Field(default=False, index=True)
+    completed: bool = Field(default=False)
 
     # Priority
-    priority: Priority = Field(default=Priority.MEDIUM, index=True)
+    priority: Priority = Field(default=Priority.MEDIUM)
 
-    # Dates
+    # Dates (indexed per owner, see below)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
-    due_date: datetime | None = Field(default=None, index=True)
+    due_date: datetime | None = Field(default=None)
     start_date: datetime | None = Field(default=None)
     completed_at: datetime | None = Field(default=None)
 
@@ -71,5 +114,135 @@ class Task(SQLModel, table=True):
     # Repeat functionality
     repeat_interval: RepeatInterval | None = Field(default=None)
 
+    # Row version for optimistic concurrency control, bumped on every edit
+    version: int = Field(default=1)
+
+    # Soft delete: set when the task is deleted, the row is purged later
+    deleted_at: datetime | None = Field(default=None)
+
+    # Sorted IDs of the task's tags, so lists can show and filter by tags
+    # without joining task_tag_link. The links stay the source of truth;
+    # every function that links or unlinks tags rewrites this in the same
+    # transaction. None for rows inserted without it.
+    tag_ids: list[int] | None = Field(
+        default_factory=list, sa_column=Column(TAG_IDS_TYPE)
+    )
+
     # Relationships
     tags: list[Tag] = Relationship(back_populates="tasks", link_model=TaskTagLink)
+
+
+class TaskSignature(SQLModel, table=True):
+    """LSH band bucket of a task title, for finding near-duplicate tasks.
+
+    Not a foreign key, so deleting tasks doesn't have to clean these up
+    first; lookups join to live tasks and the purge job removes stale rows.
+    """
+
+    __tablename__ = "task_signature"
+
+    task_id: int = Field(primary_key=True)
+    band: int = Field(primary_key=True)
+    bucket: int
+    owner_id: int = Field(default_factory=current_owner_id)
+
+
+class TaskChange(SQLModel, table=True):
+    """Append-only log entry of one change to a task (see ``src.db.audit``)."""
+
+    __tablename__ = "task_change"
+
+    id: int | None = Field(default=None, primary_key=True)
+    owner_id: int = Field(default_factory=current_owner_id)
+    # Not a foreign key: the log outlives purged tasks until it is pruned
+    task_id: int
+    operation: ChangeOperation
+    # Changed fields only, as {"field": [old, new]}; {"tag_id": id} for tags
+    changes: dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    # Task version after the change
+    version: int | None = Field(default=None)
+    # Change this entry reverted, if it was written by undo
+    undo_of: int | None = Field(default=None)
+    changed_at: datetime = Field(default_factory=datetime.now, index=True)
+
+
+# Every query is scoped to one owner, so task indexes lead with owner_id and
+# a user's queries only touch their own part of each index
+Index("ix_task_owner_due_date", col(Task.owner_id), col(Task.due_date))
+Index("ix_task_owner_start_date", col(Task.owner_id), col(Task.start_date))
+Index("ix_task_owner_completed_at", col(Task.owner_id), col(Task.completed_at))
+Index("ix_task_owner_updated_at", col(Task.owner_id), col(Task.updated_at))
+
+Index(
+    "ix_task_tag_link_owner_tag",
+    col(TaskTagLink.owner_id),
+    col(TaskTagLink.tag_id),
+)
+
+# Exact duplicates of a live task, and tasks sharing a band bucket
+Index(
+    "ix_task_owner_title_hash",
+    col(Task.owner_id),
+    col(Task.title_hash),
+    postgresql_where=col(Task.deleted_at).is_(None),
+    sqlite_where=col(Task.deleted_at).is_(None),
+)
+Index(
+    "ix_task_signature_bucket",
+    col(TaskSignature.owner_id),
+    col(TaskSignature.band),
+    col(TaskSignature.bucket),
+)
+
+# History of one task, and an owner's latest changes for undo
+Index(
+    "ix_task_change_owner_task",
+    col(TaskChange.owner_id),
+    col(TaskChange.task_id),
+    col(TaskChange.id),
+)
+Index("ix_task_change_owner_id", col(TaskChange.owner_id), col(TaskChange.id))
+Index("ix_task_change_undo_of", col(TaskChange.undo_of))
+
+# Readers only ever see live tasks, and the purge job only deleted ones, so
+# both get partial indexes that leave the other kind of row out
+Index(
+    "ix_task_live",
+    col(Task.owner_id),
+    col(Task.completed),
+    col(Task.priority),
+    postgresql_where=col(Task.deleted_at).is_(None),
+    sqlite_where=col(Task.deleted_at).is_(None),
+)
+Index(
+    "ix_task_deleted_at",
+    col(Task.deleted_at),
+    postgresql_where=col(Task.deleted_at).is_not(None),
+    sqlite_where=col(Task.deleted_at).is_not(None),
+)
+
+# GIN index over the tag IDs of live tasks, for tag filters (Postgres only)
+Index(
+    "ix_task_tag_ids",
+    col(Task.tag_ids),
+    postgresql_using="gin",
+    postgresql_where=col(Task.deleted_at).is_(None),
+).ddl_if(dialect="postgresql")
+
+# GiST index over the start -> due interval of tasks that have both dates,
+# for calendar overlap queries. Postgres only; the expression has to match
+# the one used by list_tasks_in_range for the planner to pick it.
+Index(
+    "ix_task_span",
+    func.tsrange(
+        func.least(col(Task.start_date), col(Task.due_date)),
+        func.greatest(col(Task.start_date), col(Task.due_date)),
+        "[]",
+    ),
+    postgresql_using="gist",
+    postgresql_where=and_(
+        col(Task.start_date).is_not(None),
+        col(Task.due_date).is_not(None),
+        col(Task.deleted_at).is_(None),
+    ),
+).ddl_if(dialect="postgresql")
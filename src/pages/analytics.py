@@ -0,0 +1,94 @@
+"""Streamlit dashboard of completion throughput and estimate accuracy."""
+
+from datetime import date, timedelta
+
+import streamlit as st
+
+from src.db.engine import RoutingState, bind_routing_state
+from src.db.functions.get_completion_stats import CompletionGroup, get_completion_stats
+from src.db.tenancy import bind_owner
+
+
+def _rows(groups: dict[str, CompletionGroup]) -> list[dict[str, object]]:
+    """Table rows of grouped stats, with hours and ratios rounded."""
+
+    def rounded(value: float | None) -> float | None:
+        return None if value is None else round(value, 1)
+
+    return [
+        {
+            "": name,
+            "Completed": group.completed,
+            "Lead time p50 (h)": rounded(group.lead_time_p50_hours),
+            "Lead time p90 (h)": rounded(group.lead_time_p90_hours),
+            "Estimated": group.estimated,
+            "Actual / estimate p50": rounded(group.estimate_ratio_p50),
+            "Actual / estimate p90": rounded(group.estimate_ratio_p90),
+        }
+        for name, group in groups.items()
+    ]
+
+
+st.set_page_config(page_title="Analytics", page_icon="✓", layout="wide")
+st.title("Analytics")
+
+bind_routing_state(st.session_state.setdefault("db_routing", RoutingState()))
+owner_header = st.context.headers.get("X-Owner-Id")
+if owner_header is not None and owner_header.isdigit():
+    bind_owner(int(owner_header))
+
+today = date.today()
+col1, col2, col3 = st.columns(3)
+with col1:
+    start = st.date_input("From", value=today - timedelta(days=89))
+with col2:
+    end = st.date_input("To", value=today)
+with col3:
+    window_days = st.number_input("Rolling window (days)", 1, 90, value=7)
+
+try:
+    stats = get_completion_stats(start, end, window_days=int(window_days))
+except ValueError as e:
+    st.error(str(e))
+    st.stop()
+
+overall = stats.overall
+col1, col2, col3 = st.columns(3)
+col1.metric("Completed", overall.completed)
+col2.metric(
+    "Median lead time",
+    "-"
+    if overall.lead_time_p50_hours is None
+    else f"{overall.lead_time_p50_hours:.1f} h",
+)
+col3.metric(
+    "Median actual / estimate",
+    "-" if overall.estimate_ratio_p50 is None else f"{overall.estimate_ratio_p50:.2f}",
+)
+
+st.header("Completed per day")
+st.line_chart(
+    {
+        "Day": stats.days,
+        "Completed": stats.completed_per_day,
+        f"{window_days}-day average": stats.rolling_average,
+    },
+    x="Day",
+)
+
+st.header("By priority")
+st.dataframe(
+    _rows({p.value.title(): group for p, group in stats.by_priority.items()}),
+    hide_index=True,
+)
+
+st.header("By tag")
+if stats.by_tag:
+    st.dataframe(_rows(stats.by_tag), hide_index=True)
+else:
+    st.caption("No tagged tasks were completed in this range.")
+
+st.caption(
+    "Lead time runs from creation to completion. Actual time runs from a "
+    "task's start date to its completion, for tasks with an estimate."
+)
@@ -0,0 +1,296 @@
+"""Workload planner that packs open tasks into working hours.
+
+Tasks are laid out back to back on a timeline that only counts working
+minutes, so a task that doesn't fit into the rest of a day simply continues
+on the next working day. Whenever the current task finishes, the planner
+picks the released task (``start_date`` reached) with the earliest
+priority-weighted deadline. Tasks without a due date come last, highest
+priority first.
+
+Dates are converted to and from working minutes with numpy, which is most
+of the work for large plans; the ordering itself only needs a heap until
+every task has been released, and a sort after that.
+"""
+
+import heapq
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import NamedTuple
+
+import numpy as np
+import numpy.typing as npt
+
+from src.models import Priority
+
+# Duration used for tasks without a time estimate
+DEFAULT_ESTIMATE_MINUTES = 30
+
+# Working days a task's deadline is moved earlier for ordering, by priority
+PRIORITY_WEIGHT_DAYS = {
+    Priority.HIGH: 1.0,
+    Priority.MEDIUM: 0.0,
+    Priority.LOW: -1.0,
+}
+
+_PRIORITY_RANK = {Priority.HIGH: 0, Priority.MEDIUM: 1, Priority.LOW: 2}
+
+# Ordering rank of tasks without a due date (plus their priority rank),
+# after every deadline
+_NO_DUE_DATE_RANK = 1 << 60
+
+# Due offset of tasks without a due date, later than any working minute
+_NO_DUE_DATE = 1 << 62
+
+_UNIX_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_MINUTES_PER_DAY = 24 * 60
+
+IntArray = npt.NDArray[np.int64]
+
+
+@dataclass(frozen=True)
+class WorkingHours:
+    """Daily working window and the weekdays it applies to (Monday = 0)."""
+
+    start: time = time(9)
+    end: time = time(17)
+    weekdays: tuple[int, ...] = (0, 1, 2, 3, 4)
+
+
+class PlanItem(NamedTuple):
+    """The task fields the planner needs."""
+
+    id: int
+    title: str
+    priority: Priority = Priority.MEDIUM
+    due_date: datetime | None = None
+    start_date: datetime | None = None
+    time_estimate_minutes: int | None = None
+
+
+class ScheduledTask(NamedTuple):
+    """A task placed on the calendar."""
+
+    task_id: int
+    title: str
+    start: datetime
+    end: datetime
+    due_date: datetime | None
+    late: bool  # finishes after its due date, i.e. the deadline is infeasible
+
+
+class _WorkCalendar:
+    """Converts between datetimes and offsets in working minutes.
+
+    Offset ``d * minutes_per_day + m`` is minute ``m`` of working day ``d``,
+    where working days are numbered consecutively from 0001-01-01.
+    """
+
+    def __init__(self, hours: WorkingHours):
+        weekdays = sorted(set(hours.weekdays))
+        self.days_per_week = len(weekdays)
+        self.day_start = hours.start.hour * 60 + hours.start.minute
+        self.minutes_per_day = hours.end.hour * 60 + hours.end.minute - self.day_start
+        if not weekdays or self.minutes_per_day <= 0:
+            raise ValueError("Working hours must cover at least one minute a week")
+        # By weekday (Monday = 0): whether it's a working day, and the index
+        # in the week of the next working day from it on
+        self._is_working = np.array([d in weekdays for d in range(7)])
+        self._day_index = np.searchsorted(weekdays, np.arange(7))
+        self._weekdays = np.array(weekdays, dtype=np.int64)
+
+    def to_offsets(
+        self, moments: list[datetime], midnight_is_end_of_day: bool = False
+    ) -> IntArray:
+        """Convert datetimes to working-minute offsets.
+
+        Moments outside working hours snap to the next working minute. Due
+        dates stored as midnight mean "by the end of that day" and are
+        converted with ``midnight_is_end_of_day``.
+        """
+        # Reading the fields in Python is much faster than letting numpy
+        # convert the datetimes
+        ordinals = np.array([moment.toordinal() for moment in moments], np.int64)
+        minutes = np.array(
+            [moment.hour * 60 + moment.minute for moment in moments], np.int64
+        )
+        weeks, weekdays = np.divmod(ordinals - 1, 7)
+        days = weeks * self.days_per_week + self._day_index[weekdays]
+        offsets: IntArray = days * self.minutes_per_day + np.clip(
+            minutes - self.day_start, 0, self.minutes_per_day
+        )
+        if midnight_is_end_of_day:
+            midnight = np.array(
+                [moment.time() == time.min for moment in moments], dtype=bool
+            )
+            offsets[midnight] = (days[midnight] + 1) * self.minutes_per_day
+        # Not a working day: nothing happens until the next one starts
+        day_off = ~self._is_working[weekdays]
+        offsets[day_off] = days[day_off] * self.minutes_per_day
+        return offsets
+
+    def to_datetimes(
+        self, offsets: IntArray, is_end: npt.NDArray[np.bool_] | None = None
+    ) -> list[datetime]:
+        """Convert working-minute offsets back to datetimes.
+
+        End offsets (where ``is_end`` is set) on a day boundary map to the
+        end of the earlier day rather than the start of the next one.
+        """
+        days, minutes = np.divmod(offsets, self.minutes_per_day)
+        if is_end is not None:
+            boundary = is_end & (minutes == 0)
+            days -= boundary
+            minutes[boundary] = self.minutes_per_day
+        weeks, indexes = np.divmod(days, self.days_per_week)
+        ordinals = weeks * 7 + self._weekdays[indexes] + 1
+        stamps = (ordinals - _UNIX_EPOCH_ORDINAL) * _MINUTES_PER_DAY
+        stamps += self.day_start + minutes
+        times: list[datetime] = stamps.astype("datetime64[m]").tolist()
+        return times
+
+
+class Planner:
+    """Earliest-deadline-first planner with priority weighting."""
+
+    def __init__(
+        self,
+        hours: WorkingHours | None = None,
+        now: datetime | None = None,
+        default_estimate_minutes: int = DEFAULT_ESTIMATE_MINUTES,
+    ):
+        """Initialize a planner that schedules from ``now`` onwards.
+
+        Raises:
+            ValueError: If the working hours are empty or the default
+                estimate is negative
+        """
+        if default_estimate_minutes < 0:
+            raise ValueError("The default time estimate can't be negative")
+        self._calendar = _WorkCalendar(hours or WorkingHours())
+        self._origin = int(self._calendar.to_offsets([now or datetime.now()])[0])
+        self._default_estimate = default_estimate_minutes
+        # Deadline shift in working minutes, by priority rank
+        self._weights = np.zeros(len(_PRIORITY_RANK), dtype=np.int64)
+        for priority, days in PRIORITY_WEIGHT_DAYS.items():
+            self._weights[_PRIORITY_RANK[priority]] = round(
+                days * self._calendar.minutes_per_day
+            )
+
+    def plan(self, items: Iterable[PlanItem]) -> list[ScheduledTask]:
+        """Schedule the given tasks.
+
+        Args:
+            items: Open tasks to schedule
+
+        Returns:
+            Scheduled tasks in execution order
+
+        Raises:
+            ValueError: If a task has a negative time estimate
+        """
+        items = list(items)
+        durations = np.array(
+            [
+                self._default_estimate if minutes is None else minutes
+                for minutes in (item.time_estimate_minutes for item in items)
+            ],
+            dtype=np.int64,
+        )
+        negative = np.flatnonzero(durations < 0)
+        if len(negative):
+            raise ValueError(
+                f"Task {items[negative[0]].id} has a negative time estimate"
+            )
+
+        releases = np.full(len(items), self._origin, dtype=np.int64)
+        started = [i for i, item in enumerate(items) if item.start_date is not None]
+        if started:
+            start_dates = [
+                item.start_date for item in items if item.start_date is not None
+            ]
+            releases[started] = np.maximum(
+                self._calendar.to_offsets(start_dates), self._origin
+            )
+
+        # Ordering rank: the weighted deadline, or for tasks without a due
+        # date, their priority after every deadline
+        priorities = np.array(
+            [_PRIORITY_RANK[item.priority] for item in items], dtype=np.int64
+        )
+        ranks = priorities + _NO_DUE_DATE_RANK
+        dues = np.full(len(items), _NO_DUE_DATE, dtype=np.int64)
+        with_due = [i for i, item in enumerate(items) if item.due_date is not None]
+        if with_due:
+            due_dates = [item.due_date for item in items if item.due_date is not None]
+            dues[with_due] = self._calendar.to_offsets(
+                due_dates, midnight_is_end_of_day=True
+            )
+            weights = self._weights[priorities[with_due]]
+            ranks[with_due] = np.maximum(dues[with_due] - weights, 0)
+
+        ids = np.array([item.id for item in items], dtype=np.int64)
+        order, starts = self._sequence(releases, ranks, ids, durations)
+        ends = starts + durations[order]
+        late = (ends > dues[order]).tolist()
+        start_times = self._calendar.to_datetimes(starts)
+        end_times = self._calendar.to_datetimes(ends, ends > starts)
+
+        return [
+            ScheduledTask(item.id, item.title, start, end, item.due_date, is_late)
+            for item, start, end, is_late in zip(
+                [items[i] for i in order.tolist()], start_times, end_times, late
+            )
+        ]
+
+    def _sequence(
+        self, releases: IntArray, ranks: IntArray, ids: IntArray, durations: IntArray
+    ) -> tuple[IntArray, IntArray]:
+        """Order tasks for execution.
+
+        Returns:
+            Indexes of the tasks in execution order, and their start offsets
+        """
+        # Tasks are compared by their place in (rank, ID) order, so the heap
+        # holds plain ints
+        by_rank = np.lexsort((ids, ranks))
+        places = np.empty_like(by_rank)
+        places[by_rank] = np.arange(len(by_rank))
+        by_release = np.argsort(releases, kind="stable")
+        release_places = places[by_release].tolist()
+        release_times = releases[by_release].tolist()
+        durations_by_place = durations[by_rank].tolist()
+
+        order: list[int] = []
+        starts: list[int] = []
+        heap: list[int] = []
+        cursor = self._origin
+        released = 0
+        while released < len(release_times):
+            if not heap and release_times[released] > cursor:
+                # Nothing to work on until the next task is released
+                cursor = release_times[released]
+            first = released
+            released = bisect_right(release_times, cursor, first)
+            if released - first > len(heap):
+                heap.extend(release_places[first:released])
+                heapq.heapify(heap)
+            else:
+                for place in release_places[first:released]:
+                    heapq.heappush(heap, place)
+
+            if released < len(release_times):
+                place = heapq.heappop(heap)
+                order.append(place)
+                starts.append(cursor)
+                cursor += durations_by_place[place]
+
+        # Everything has been released, so the rest simply runs in rank order
+        rest = np.sort(np.array(heap, dtype=np.int64))
+        rest_durations = durations[by_rank[rest]]
+        rest_starts = np.cumsum(rest_durations) - rest_durations + cursor
+        return (
+            by_rank[np.concatenate([np.array(order, dtype=np.int64), rest])],
+            np.concatenate([np.array(starts, dtype=np.int64), rest_starts]),
+        )
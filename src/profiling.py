@@ -0,0 +1,159 @@
+"""Timing of the sections of a Streamlit rerun and the queries they issue.
+
+With ``profile_ui`` set, the app starts a :class:`RerunProfile` on every
+rerun and wraps its sections (sidebar, create form, fetch, rendering, ...)
+in :func:`profile_section`. Each section's wall time and the SQL statements
+executed inside it are recorded; the sidebar then shows the breakdown.
+Without a profile, :func:`profile_section` does nothing.
+
+With ``profile_ui_dump_dir`` also set, each rerun runs under cProfile and
+its stats are written to that directory, to be read with ``pstats`` or
+snakeviz. Only one profiler can run at a time in a process, so reruns that
+overlap with another session's profiled rerun are timed but not dumped.
+"""
+
+import cProfile
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current: ContextVar["RerunProfile | None"] = ContextVar("rerun_profile", default=None)
+_listening = False
+
+
+@dataclass
+class SectionTiming:
+    """Time spent in one section of a rerun and the queries it issued."""
+
+    name: str
+    seconds: float
+    queries: int
+
+
+class RerunProfile:
+    """Section timings and query counts of one script run."""
+
+    def __init__(self, dump_dir: str | Path | None = None) -> None:
+        """Start timing, and profiling too if ``dump_dir`` is set."""
+        self.started_at = datetime.now()
+        self.sections: list[SectionTiming] = []
+        self.queries = 0
+        self.seconds: float | None = None
+        # Set when the run ended early, e.g. by st.rerun()
+        self.interrupted = False
+        self.dump_path: Path | None = None
+        self._dump_dir = None if dump_dir is None else Path(dump_dir)
+        self._start = self._last_end = time.perf_counter()
+        self._profiler: cProfile.Profile | None = None
+        if self._dump_dir is not None:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                pass  # another rerun is being profiled
+            else:
+                self._profiler = profiler
+
+    @contextmanager
+    def section(self, name: str) -> Generator[None, None, None]:
+        """Time a block of the script under the given name."""
+        start, queries = time.perf_counter(), self.queries
+        try:
+            yield
+        finally:
+            self._last_end = time.perf_counter()
+            self.sections.append(
+                SectionTiming(name, self._last_end - start, self.queries - queries)
+            )
+
+    def finish(self, interrupted: bool = False) -> None:
+        """Stop timing and write the cProfile dump, if any; idempotent.
+
+        Args:
+            interrupted: The run stopped before reaching its end, so it is
+                timed up to the end of its last section
+        """
+        if self.seconds is not None:
+            return
+        self.interrupted = interrupted
+        end = self._last_end if interrupted else time.perf_counter()
+        self.seconds = end - self._start
+        if self._profiler is not None and self._dump_dir is not None:
+            self._profiler.disable()
+            self._dump_dir.mkdir(parents=True, exist_ok=True)
+            self.dump_path = (
+                self._dump_dir / f"rerun-{self.started_at:%Y%m%d-%H%M%S-%f}.prof"
+            )
+            self._profiler.dump_stats(self.dump_path)
+            self._profiler = None
+
+    def breakdown(self) -> list[SectionTiming]:
+        """Get the time of each section, summed over repeats, slowest first.
+
+        Time outside every section is reported as "other".
+        """
+        totals: dict[str, SectionTiming] = {}
+        for timing in self.sections:
+            total = totals.setdefault(timing.name, SectionTiming(timing.name, 0.0, 0))
+            total.seconds += timing.seconds
+            total.queries += timing.queries
+        rows = sorted(totals.values(), key=lambda timing: -timing.seconds)
+        if self.seconds is not None:
+            rows.append(
+                SectionTiming(
+                    "other",
+                    max(0.0, self.seconds - sum(t.seconds for t in rows)),
+                    self.queries - sum(t.queries for t in rows),
+                )
+            )
+        return rows
+
+
+def _count_query(*_args: Any) -> None:
+    profile = _current.get()
+    if profile is not None:
+        profile.queries += 1
+
+
+def start_profile(dump_dir: str | Path | None = None) -> RerunProfile:
+    """Start profiling the current script run.
+
+    Queries are counted on every engine, but only while executed in the
+    context the profile was started in, so other sessions' reruns and
+    background threads aren't counted.
+    """
+    global _listening
+    if not _listening:
+        event.listen(Engine, "before_cursor_execute", _count_query)
+        _listening = True
+    profile = RerunProfile(dump_dir)
+    _current.set(profile)
+    return profile
+
+
+def stop_profile() -> RerunProfile | None:
+    """Finish the current run's profile, if any, and stop counting queries."""
+    profile = _current.get()
+    if profile is not None:
+        profile.finish()
+        _current.set(None)
+    return profile
+
+
+@contextmanager
+def profile_section(name: str) -> Generator[None, None, None]:
+    """Time a section of the current run, when it is being profiled."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    with profile.section(name):
+        yield
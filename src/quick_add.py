@@ -0,0 +1,151 @@
+"""Parser of the quick-add box, where each line of text becomes a task.
+
+Words of a line make up the title, except for these tokens, which may
+appear anywhere in it:
+
+- ``#tag`` attaches a tag, created if it doesn't exist yet
+- ``!high``, ``!medium`` or ``!low`` sets the priority
+- ``due:`` followed by ``today``, ``tomorrow``, a weekday (``due:fri`` is
+  the next Friday, or today on a Friday) or a date (``due:2026-03-10``)
+
+Blank lines are skipped and list markers (``-``, ``*``, ``[ ]``) at the
+start of a line are dropped, so lists pasted from notes work as they are::
+
+    - Call the plumber !high due:tomorrow #home
+    Draft the Q3 report #work due:fri
+"""
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from src.models import Priority
+
+# Lines accepted in one quick add
+MAX_LINES = 500
+
+# Longest title and tag name, as enforced by the Task and Tag models
+MAX_TITLE_LENGTH = 200
+MAX_TAG_LENGTH = 50
+
+_LIST_MARKER = re.compile(r"^\s*(?:[-*•]|\[[ xX]?\])\s+")
+_PRIORITY_TOKEN = re.compile(r"!([A-Za-z]+)")
+_WEEKDAYS = (
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+)
+
+
+@dataclass
+class QuickTask:
+    """A task parsed from one line of the quick-add box."""
+
+    title: str
+    # None when the line doesn't set one, so the form's default applies
+    priority: Priority | None = None
+    due_date: date | None = None
+    tags: list[str] = field(default_factory=list)
+
+
+def _parse_due(value: str, today: date) -> date:
+    """Resolve the value of a ``due:`` token to a date."""
+    lowered = value.lower()
+    if lowered == "today":
+        return today
+    if lowered == "tomorrow":
+        return today + timedelta(days=1)
+    if len(lowered) >= 3:
+        # Weekday names, or their first three letters or more
+        for index, name in enumerate(_WEEKDAYS):
+            if name.startswith(lowered):
+                return today + timedelta(days=(index - today.weekday()) % 7)
+    return date.fromisoformat(value)
+
+
+def parse_line(line: str, today: date) -> QuickTask | None:
+    """Parse one line of the quick-add box.
+
+    Args:
+        line: Text of the line
+        today: Day that relative due dates count from
+
+    Returns:
+        The task, or None for a blank line
+
+    Raises:
+        ValueError: If a token is invalid, or the title is empty or too long
+    """
+    line = _LIST_MARKER.sub("", line, count=1).strip()
+    if not line:
+        return None
+
+    task = QuickTask(title="")
+    words = []
+    for word in line.split():
+        if word.startswith("#") and len(word) > 1:
+            if len(word) - 1 > MAX_TAG_LENGTH:
+                raise ValueError(
+                    f"Tag {word!r} is longer than {MAX_TAG_LENGTH} characters"
+                )
+            if word[1:] not in task.tags:
+                task.tags.append(word[1:])
+        elif match := _PRIORITY_TOKEN.fullmatch(word):
+            try:
+                task.priority = Priority(match.group(1).lower())
+            except ValueError:
+                raise ValueError(f"Unknown priority {word!r}") from None
+        elif word.lower().startswith("due:"):
+            try:
+                task.due_date = _parse_due(word[4:], today)
+            except ValueError:
+                raise ValueError(f"Unknown due date {word[4:]!r}") from None
+        else:
+            words.append(word)
+
+    task.title = " ".join(words)
+    if not task.title:
+        raise ValueError("No title")
+    if len(task.title) > MAX_TITLE_LENGTH:
+        raise ValueError(f"Title is longer than {MAX_TITLE_LENGTH} characters")
+    return task
+
+
+def parse_quick_add(text: str, today: date | None = None) -> list[QuickTask]:
+    """Parse the quick-add box into one task per non-blank line.
+
+    Every line is checked before anything is returned, so a typo on one
+    line doesn't leave the others half added.
+
+    Args:
+        text: Contents of the quick-add box
+        today: Day that relative due dates count from (default today)
+
+    Returns:
+        Parsed tasks, in the order of their lines
+
+    Raises:
+        ValueError: Listing every invalid line by number, or if there are
+            more than MAX_LINES tasks
+    """
+    today = today or date.today()
+    tasks = []
+    errors = []
+    for number, line in enumerate(text.splitlines(), start=1):
+        try:
+            task = parse_line(line, today)
+        except ValueError as e:
+            errors.append(f"Line {number}: {e}")
+            continue
+        if task is not None:
+            tasks.append(task)
+
+    if errors:
+        raise ValueError("; ".join(errors))
+    if len(tasks) > MAX_LINES:
+        raise ValueError(f"At most {MAX_LINES} tasks can be added at once")
+    return tasks
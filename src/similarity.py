@@ -0,0 +1,91 @@
+"""Title similarity for detecting duplicate tasks.
+
+Exact duplicates share the hash of their normalized title. Near duplicates
+("Buy milk" vs "buy milk!!" vs "Buy the milk") are found with MinHash
+locality-sensitive hashing: each title gets a signature of minimum hash
+values over its character trigrams, and the signature is cut into bands.
+Titles whose trigram sets are similar agree on at least one band with high
+probability, so candidates are found by looking up band buckets instead of
+comparing every pair of titles. Candidates are then confirmed with the
+exact Jaccard similarity of their trigrams.
+
+With 10 bands of 3 rows, pairs with a similarity of 0.6 become candidates
+91% of the time and pairs at 0.7 over 98% of the time, while unrelated
+titles (similarity around 0.1) collide in about 1% of pairs.
+"""
+
+import hashlib
+import random
+import re
+import unicodedata
+import zlib
+from collections.abc import Iterable
+
+BANDS = 10
+ROWS_PER_BAND = 3
+NUM_PERMUTATIONS = BANDS * ROWS_PER_BAND
+
+# Universal hashing h(x) = (a * x + b) mod p over a Mersenne prime. The
+# coefficients are fixed because signatures are stored in the database.
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240601)
+_PERMUTATIONS = [
+    (_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME))
+    for _ in range(NUM_PERMUTATIONS)
+]
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_title(title: str) -> str:
+    """Normalize a title for comparison.
+
+    Folds case and Unicode compatibility forms and reduces punctuation and
+    runs of whitespace to single spaces.
+    """
+    folded = unicodedata.normalize("NFKC", title).casefold()
+    return _NON_WORD.sub(" ", folded).strip()
+
+
+def title_hash(title: str) -> str:
+    """Hash of the normalized title, equal for exact duplicates."""
+    normalized = normalize_title(title)
+    return hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def shingles(title: str) -> set[str]:
+    """Character trigrams of the normalized title, padded at word edges."""
+    normalized = f" {normalize_title(title)} "
+    if len(normalized) < 3:
+        return {normalized}
+    return {normalized[i : i + 3] for i in range(len(normalized) - 2)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(shingle_set: Iterable[str]) -> list[int]:
+    """MinHash signature of a shingle set."""
+    hashes = [zlib.crc32(shingle.encode()) for shingle in shingle_set]
+    return [min([(a * x + b) % _PRIME for x in hashes]) for a, b in _PERMUTATIONS]
+
+
+def band_buckets(signature: list[int]) -> list[int]:
+    """Bucket of each band of a signature, as signed 32-bit integers."""
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS_PER_BAND : (band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            b"".join(row.to_bytes(8, "little") for row in rows), digest_size=4
+        ).digest()
+        buckets.append(int.from_bytes(digest, "little", signed=True))
+    return buckets
+
+
+def title_buckets(title: str) -> list[int]:
+    """LSH band buckets of a title."""
+    return band_buckets(minhash(shingles(title)))
@@ -0,0 +1,195 @@
+"""Local SQLite copy of a user's tasks, kept up to date through the API.
+
+Clients that work offline, or just want fast local reads, keep their tasks
+in a SQLite file and pull what changed since their last sync from
+``GET /sync`` (see ``changes_since``). The first sync downloads every task;
+later ones only download the tasks that changed, so syncing costs in
+proportion to the changes rather than to the number of tasks.
+
+Only the standard library is used, so the client runs without the app's
+dependencies::
+
+    replica = LocalReplica("tasks.db", http_fetch("http://localhost:8000"))
+    replica.sync()
+    for task in replica.tasks():
+        print(task["title"])
+"""
+
+import json
+import sqlite3
+import urllib.request
+from collections.abc import Callable
+from typing import Any
+
+# Gets one page of changes since a cursor, as returned by GET /sync
+Fetch = Callable[[int | None], dict[str, Any]]
+
+_TASK_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "completed",
+    "priority",
+    "created_at",
+    "updated_at",
+    "due_date",
+    "start_date",
+    "completed_at",
+    "time_estimate_minutes",
+    "repeat_interval",
+    "version",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    completed INTEGER NOT NULL,
+    priority TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    due_date TEXT,
+    start_date TEXT,
+    completed_at TEXT,
+    time_estimate_minutes INTEGER,
+    repeat_interval TEXT,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tag (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    color TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS task_tag (
+    task_id INTEGER NOT NULL,
+    tag_id INTEGER NOT NULL,
+    PRIMARY KEY (task_id, tag_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    cursor INTEGER
+);
+"""
+
+
+def http_fetch(
+    base_url: str, owner_id: int | None = None, timeout: float = 30.0
+) -> Fetch:
+    """Build a fetch function that calls ``GET /sync`` of a running API.
+
+    Args:
+        base_url: URL the API is served at
+        owner_id: Sent as ``X-Owner-Id``, when not set by a proxy
+        timeout: Seconds to wait for each response
+    """
+    headers = {"Accept": "application/json"}
+    if owner_id is not None:
+        headers["X-Owner-Id"] = str(owner_id)
+
+    def fetch(cursor: int | None) -> dict[str, Any]:
+        url = f"{base_url.rstrip('/')}/sync"
+        if cursor is not None:
+            url += f"?cursor={cursor}"
+        request = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            page: dict[str, Any] = json.load(response)
+        return page
+
+    return fetch
+
+
+class LocalReplica:
+    """Tasks and tags of one user in a local SQLite database."""
+
+    def __init__(self, path: str, fetch: Fetch) -> None:
+        """Open or create the replica.
+
+        Args:
+            path: SQLite file (":memory:" for a throwaway copy)
+            fetch: Gets pages of changes, e.g. from :func:`http_fetch`
+        """
+        self._fetch = fetch
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.executescript(_SCHEMA)
+
+    @property
+    def cursor(self) -> int | None:
+        """Cursor of the last sync, None before the first one."""
+        row = self._connection.execute(
+            "SELECT cursor FROM sync_state WHERE id = 1"
+        ).fetchone()
+        return None if row is None else int(row["cursor"])
+
+    def sync(self) -> int:
+        """Download and apply the changes since the last sync.
+
+        Each page is applied in its own transaction along with its cursor,
+        so an interrupted sync resumes where it stopped.
+
+        Returns:
+            Number of tasks updated or removed
+        """
+        applied = 0
+        while True:
+            page = self._fetch(self.cursor)
+            with self._connection:
+                self._apply(page)
+            applied += len(page["tasks"]) + len(page["deleted"])
+            if not page["has_more"]:
+                return applied
+
+    def _apply(self, page: dict[str, Any]) -> None:
+        db = self._connection
+        if page["snapshot"]:
+            db.execute("DELETE FROM task_tag")
+            db.execute("DELETE FROM task")
+            db.execute("DELETE FROM tag")
+
+        db.executemany(
+            "INSERT OR REPLACE INTO tag (id, name, color) VALUES (:id, :name, :color)",
+            page["tags"],
+        )
+
+        columns = ", ".join(_TASK_COLUMNS)
+        values = ", ".join(f":{column}" for column in _TASK_COLUMNS)
+        for task in page["tasks"]:
+            db.execute(
+                f"INSERT OR REPLACE INTO task ({columns}) VALUES ({values})",
+                {column: task[column] for column in _TASK_COLUMNS},
+            )
+            db.execute("DELETE FROM task_tag WHERE task_id = ?", (task["id"],))
+            db.executemany(
+                "INSERT INTO task_tag (task_id, tag_id) VALUES (?, ?)",
+                [(task["id"], tag_id) for tag_id in task["tag_ids"]],
+            )
+
+        for task_id in page["deleted"]:
+            db.execute("DELETE FROM task_tag WHERE task_id = ?", (task_id,))
+            db.execute("DELETE FROM task WHERE id = ?", (task_id,))
+
+        db.execute(
+            "INSERT OR REPLACE INTO sync_state (id, cursor) VALUES (1, ?)",
+            (page["cursor"],),
+        )
+
+    def tasks(self) -> list[dict[str, Any]]:
+        """Get the local copy of every task, with a ``tag_ids`` list, by ID."""
+        tags: dict[int, list[int]] = {}
+        for row in self._connection.execute(
+            "SELECT task_id, tag_id FROM task_tag ORDER BY tag_id"
+        ):
+            tags.setdefault(row["task_id"], []).append(row["tag_id"])
+        return [
+            {
+                **dict(row),
+                "completed": bool(row["completed"]),
+                "tag_ids": tags.get(row["id"], []),
+            }
+            for row in self._connection.execute("SELECT * FROM task ORDER BY id")
+        ]
+
+    def close(self) -> None:
+        """Close the local database."""
+        self._connection.close()
@@ -0,0 +1,240 @@
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("starlette")
+pytest.importorskip("orjson")
+pytest.importorskip("httpx")
+
+from sqlmodel import select  # noqa: E402
+from starlette.testclient import TestClient  # noqa: E402
+
+from src.api import app  # noqa: E402
+from src.db.engine import get_session  # noqa: E402
+from src.db.tag_cache import tag_cache  # noqa: E402
+from src.models import Tag, Task  # noqa: E402
+from src.settings import get_settings  # noqa: E402
+from src.sync import LocalReplica  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def _cleanup(task_ids=(), tag_ids=()):
+    with get_session() as session:
+        for task_id in task_ids:
+            task = session.exec(select(Task).where(Task.id == task_id)).first()
+            if task:
+                task.tags = []
+                session.delete(task)
+        for tag_id in tag_ids:
+            tag = session.exec(select(Tag).where(Tag.id == tag_id)).first()
+            if tag:
+                session.delete(tag)
+    tag_cache.clear()
+
+
+def test_task_crud(client):
+    """Test creating, reading, editing and deleting a task over HTTP."""
+    response = client.post("/tasks", json={"title": "API Task", "priority": "high"})
+    assert response.status_code == 201
+    task = response.json()
+    assert task["title"] == "API Task"
+    assert task["priority"] == "high"
+
+    response = client.get(f"/tasks/{task['id']}")
+    assert response.status_code == 200
+    assert response.json()["id"] == task["id"]
+
+    response = client.patch(f"/tasks/{task['id']}", json={"completed": True})
+    assert response.status_code == 200
+    assert response.json()["completed"] is True
+    assert response.json()["version"] == task["version"] + 1
+
+    assert client.delete(f"/tasks/{task['id']}").status_code == 204
+    assert client.get(f"/tasks/{task['id']}").status_code == 404
+    assert client.post(f"/tasks/{task['id']}/restore").status_code == 200
+
+    _cleanup(task_ids=[task["id"]])
+
+
+def test_invalid_requests(client):
+    """Test validation and not-found errors."""
+    assert client.post("/tasks", json={"title": ""}).status_code == 422
+    assert client.get("/tasks?limit=-1").status_code == 400
+    assert client.get("/tasks?priority=urgent").status_code == 400
+    assert client.get("/tasks?fields=some").status_code == 400
+    assert client.patch("/tasks/99999", json={"title": "Nope"}).status_code == 404
+    assert client.delete("/tasks/99999").status_code == 404
+
+
+def test_list_tasks_paginates(client):
+    """Test that listing follows limit and offset."""
+    ids = [
+        client.post("/tasks", json={"title": f"API Page {i}"}).json()["id"]
+        for i in range(3)
+    ]
+
+    seen = []
+    offset = 0
+    while offset is not None:
+        page = client.get(f"/tasks?limit=2&offset={offset}").json()
+        assert len(page["items"]) <= 2
+        seen.extend(item["id"] for item in page["items"])
+        offset = page["next_offset"]
+
+    assert set(ids) <= set(seen)
+    assert len(seen) == len(set(seen))
+
+    _cleanup(task_ids=ids)
+
+
+def test_list_etag_returns_304_until_a_write(client):
+    """Test conditional list reads."""
+    response = client.get("/tasks")
+    etag = response.headers["etag"]
+
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    task = client.post("/tasks", json={"title": "API Invalidate"}).json()
+
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+    _cleanup(task_ids=[task["id"]])
+
+
+def test_list_etag_ignores_clock_skew(client):
+    """Test that a write stamped with an older time still changes the ETag."""
+    task = client.post("/tasks", json={"title": "API Skewed"}).json()
+    etag = client.get("/tasks").headers["etag"]
+
+    client.patch(f"/tasks/{task['id']}", json={"title": "API Skewed again"})
+    # As if written by a process whose clock is behind
+    with get_session() as session:
+        row = session.exec(select(Task).where(Task.id == task["id"])).one()
+        row.updated_at = datetime.fromisoformat(task["updated_at"])
+
+    response = client.get("/tasks", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+
+    _cleanup(task_ids=[task["id"]])
+
+
+def test_task_etag_and_if_match(client):
+    """Test conditional task reads and optimistic concurrency with If-Match."""
+    created = client.post("/tasks", json={"title": "API Versioned"})
+    task_id = created.json()["id"]
+    etag = created.headers["etag"]
+
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = client.patch(
+        f"/tasks/{task_id}", json={"title": "First"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 200
+    new_etag = response.headers["etag"]
+
+    response = client.patch(
+        f"/tasks/{task_id}", json={"title": "Second"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] == new_etag
+
+    _cleanup(task_ids=[task_id])
+
+
+def test_tag_changes_change_the_task_etag(client):
+    """Test that tagging a task invalidates its ETag for reads and If-Match."""
+    tag = client.post("/tags", json={"name": "api-etag-tag"}).json()
+    created = client.post("/tasks", json={"title": "API Tagged"})
+    task_id = created.json()["id"]
+    etag = created.headers["etag"]
+
+    assert client.put(f"/tasks/{task_id}/tags/{tag['id']}").status_code == 204
+
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    response = client.patch(
+        f"/tasks/{task_id}", json={"title": "Stale"}, headers={"If-Match": etag}
+    )
+    assert response.status_code == 412
+
+    _cleanup(task_ids=[task_id], tag_ids=[tag["id"]])
+
+
+def test_tags_and_gzip(client):
+    """Test the tag endpoints and gzip encoding of large responses."""
+    tag = client.post("/tags", json={"name": "api-tag", "color": "#112233"}).json()
+    task_ids = [
+        client.post("/tasks", json={"title": f"API Gzip {i}"}).json()["id"]
+        for i in range(10)
+    ]
+
+    assert client.put(f"/tasks/{task_ids[0]}/tags/{tag['id']}").status_code == 204
+    assert "api-tag" in [t["name"] for t in client.get("/tags").json()]
+    assert client.delete(f"/tasks/{task_ids[0]}/tags/{tag['id']}").status_code == 204
+
+    response = client.get("/tasks", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+
+    _cleanup(task_ids=task_ids, tag_ids=[tag["id"]])
+
+
+def test_owner_header_scopes_requests(client):
+    """Test that X-Owner-Id hides other owners' tasks."""
+    response = client.post(
+        "/tasks", json={"title": "Owned"}, headers={"X-Owner-Id": "2001"}
+    )
+    task = response.json()
+    assert task["owner_id"] == 2001
+
+    assert client.get(f"/tasks/{task['id']}").status_code == 404
+    assert (
+        client.get(f"/tasks/{task['id']}", headers={"X-Owner-Id": "2001"}).status_code
+        == 200
+    )
+    assert client.get("/tasks", headers={"X-Owner-Id": "abc"}).status_code == 400
+
+    _cleanup(task_ids=[task["id"]])
+
+
+def test_local_replica_syncs_changes(client, tmp_path, monkeypatch):
+    """Test that a local replica follows creates, edits, tags and deletes."""
+    monkeypatch.setattr(get_settings(), "sync_settle_seconds", 0.0)
+    headers = {"X-Owner-Id": "5002"}
+
+    def fetch(cursor):
+        params = {} if cursor is None else {"cursor": cursor}
+        return client.get("/sync", params=params, headers=headers).json()
+
+    first = client.post("/tasks", json={"title": "Replica 1"}, headers=headers).json()
+    replica = LocalReplica(str(tmp_path / "replica.db"), fetch)
+    assert replica.sync() == 1
+    assert [task["title"] for task in replica.tasks()] == ["Replica 1"]
+
+    second = client.post("/tasks", json={"title": "Replica 2"}, headers=headers)
+    tag = client.post("/tags", json={"name": "offline"}, headers=headers).json()
+    client.put(f"/tasks/{first['id']}/tags/{tag['id']}", headers=headers)
+    client.patch(f"/tasks/{first['id']}", json={"completed": True}, headers=headers)
+    client.delete(f"/tasks/{second.json()['id']}", headers=headers)
+
+    assert replica.sync() == 2
+    tasks = replica.tasks()
+    assert [(t["id"], t["completed"], t["tag_ids"]) for t in tasks] == [
+        (first["id"], True, [tag["id"]])
+    ]
+    assert replica.sync() == 0
+    replica.close()
+
+    _cleanup(task_ids=[first["id"], second.json()["id"]], tag_ids=[tag["id"]])
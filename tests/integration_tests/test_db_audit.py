@@ -0,0 +1,201 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import col, select
+
+from src.db import audit
+from src.db.engine import get_session
+from src.db.exceptions import StaleTaskError
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.get_task import get_task
+from src.db.functions.get_task_at import get_task_at
+from src.db.functions.restore_task import restore_task
+from src.db.functions.undo_changes import undo_changes
+from src.db.purge import prune_change_log
+from src.db.tag_cache import tag_cache
+from src.db.tenancy import owner_scope
+from src.models import ChangeOperation, Priority, Tag, Task, TaskChange, TaskTagLink
+
+OWNER = 3001
+
+
+@pytest.fixture(autouse=True)
+def _owner():
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (TaskChange, TaskTagLink, Task, Tag):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+    tag_cache.clear()
+
+
+def _changes(task_id):
+    with get_session() as session:
+        changes = session.exec(
+            select(TaskChange)
+            .where(TaskChange.owner_id == OWNER, TaskChange.task_id == task_id)
+            .order_by(col(TaskChange.id))
+        ).all()
+        return [(change.operation, change.changes) for change in changes]
+
+
+def _backdate(task_id, delta):
+    with get_session() as session:
+        changes = session.exec(
+            select(TaskChange).where(
+                TaskChange.owner_id == OWNER, TaskChange.task_id == task_id
+            )
+        ).all()
+        for change in changes:
+            change.changed_at -= delta
+
+
+def test_writes_log_changed_fields_only():
+    """Test that every write logs a diff of just the fields it changed."""
+    task = create_task(title="Audit Task", priority=Priority.LOW)
+    edit_task(task.id, title="Audit Task", priority=Priority.HIGH)
+    delete_task(task.id)
+    restore_task(task.id)
+
+    operations = _changes(task.id)
+    assert [operation for operation, _ in operations] == [
+        ChangeOperation.CREATE,
+        ChangeOperation.UPDATE,
+        ChangeOperation.DELETE,
+        ChangeOperation.RESTORE,
+    ]
+    assert operations[0][1] == {
+        "title": [None, "Audit Task"],
+        "completed": [None, False],
+        "priority": [None, "low"],
+    }
+    assert operations[1][1] == {"priority": ["low", "high"]}
+    assert set(operations[2][1]) == {"deleted_at"}
+    assert operations[3][1]["deleted_at"][1] is None
+
+
+def test_rejected_edit_is_not_logged():
+    """Test that an edit losing the version check leaves no log entry."""
+    task = create_task(title="Audit Task")
+    edit_task(task.id, title="Changed")
+
+    with pytest.raises(StaleTaskError):
+        edit_task(task.id, title="Stale", expected_version=task.version)
+
+    assert len(_changes(task.id)) == 2
+
+
+def test_get_task_at_reverts_later_changes():
+    """Test reading a task as it was before later edits."""
+    task = create_task(title="Before", priority=Priority.LOW)
+    _backdate(task.id, timedelta(hours=2))
+    edit_task(task.id, completed=True)
+    _backdate(task.id, timedelta(hours=1))
+    edit_task(task.id, title="After")
+    delete_task(task.id)
+
+    an_hour_ago = datetime.now() - timedelta(minutes=90)
+    past = get_task_at(task.id, an_hour_ago)
+    assert past.title == "Before"
+    assert past.completed is False
+    assert past.completed_at is None
+    assert past.deleted_at is None
+    assert past.version == 1
+
+    recent = get_task_at(task.id, datetime.now() - timedelta(minutes=30))
+    assert recent.title == "Before"
+    assert recent.completed is True
+    assert recent.version == 2
+
+    with pytest.raises(ValueError, match="didn't exist"):
+        get_task_at(task.id, datetime.now() - timedelta(days=1))
+
+
+def test_undo_walks_back_through_changes():
+    """Test undoing the latest changes one call at a time and in bulk."""
+    task = create_task(title="Original")
+    edit_task(task.id, title="First")
+    edit_task(task.id, title="Second", priority=Priority.HIGH)
+
+    undone = undo_changes()
+    assert [change.operation for change in undone] == [ChangeOperation.UPDATE]
+    assert get_task(task.id).title == "First"
+    assert get_task(task.id).priority == Priority.MEDIUM
+
+    undone = undo_changes()
+    assert get_task(task.id).title == "Original"
+
+    # Next is the creation itself, which deletes the task
+    undone = undo_changes(5)
+    assert [change.operation for change in undone] == [ChangeOperation.CREATE]
+    with pytest.raises(ValueError, match="not found"):
+        get_task(task.id)
+    assert undo_changes() == []
+
+
+def test_undo_reuses_cached_statements():
+    """Test that undoing an edit doesn't build new audit statements each time."""
+    task = create_task(title="Original")
+    edit_task(task.id, title="First")
+    undo_changes()
+    sizes = (audit._returning.cache_info(), audit._logged.cache_info())
+
+    for title in ("Second", "Third"):
+        edit_task(task.id, title=title)
+        undo_changes()
+
+    assert get_task(task.id).title == "Original"
+    returning, logged = sizes
+    assert audit._returning.cache_info().currsize == returning.currsize
+    assert audit._logged.cache_info().currsize == logged.currsize
+    assert audit._returning.cache_info().hits > returning.hits
+
+
+def test_undo_delete_and_tagging():
+    """Test that undo restores a deleted task and reverts tagging."""
+    task = create_task(title="Tagged")
+    tag = create_tag(name="audit-tag", color="#FF0000")
+    add_tag_to_task(task.id, tag.id)
+    delete_task(task.id)
+
+    undone = undo_changes(2)
+    assert [change.operation for change in undone] == [
+        ChangeOperation.DELETE,
+        ChangeOperation.TAG,
+    ]
+    assert get_task(task.id).title == "Tagged"
+    assert get_task(task.id).tag_ids == []
+    # Tagging, deleting and undoing both are each a new version
+    assert get_task(task.id).version == 5
+    with get_session() as session:
+        versions = session.exec(
+            select(TaskChange.version)
+            .where(TaskChange.task_id == task.id)
+            .order_by(col(TaskChange.id))
+        ).all()
+    assert versions == [1, 2, 3, 4, 5]
+    with get_session() as session:
+        links = session.exec(
+            select(TaskTagLink).where(TaskTagLink.task_id == task.id)
+        ).all()
+        assert links == []
+
+
+def test_prune_change_log():
+    """Test that old log entries are pruned and history stops there."""
+    task = create_task(title="Old")
+    _backdate(task.id, timedelta(days=40))
+    edit_task(task.id, title="New")
+
+    result = prune_change_log(retention=timedelta(days=30), batches_per_second=0)
+
+    assert result.purged >= 1
+    assert [operation for operation, _ in _changes(task.id)] == [ChangeOperation.UPDATE]
+    with pytest.raises(ValueError, match="pruned"):
+        get_task_at(task.id, datetime.now() - timedelta(days=35))
@@ -0,0 +1,122 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlmodel import select
+
+from src.db.engine import get_session
+from src.db.functions.get_completion_stats import get_completion_stats
+from src.db.tenancy import owner_scope
+from src.models import Priority, Tag, Task, TaskTagLink
+
+OWNER = 6001
+END = date(2026, 3, 10)
+
+
+@pytest.fixture(autouse=True)
+def _owner():
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (TaskTagLink, Task, Tag):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+
+
+def _completed(day, lead_hours, priority=Priority.MEDIUM, **fields):
+    completed_at = datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+    return Task(
+        title="Done",
+        owner_id=OWNER,
+        completed=True,
+        priority=priority,
+        created_at=completed_at - timedelta(hours=lead_hours),
+        completed_at=completed_at,
+        **fields,
+    )
+
+
+def _add(*tasks):
+    with get_session() as session:
+        session.add_all(tasks)
+        session.flush()
+        return [task.id for task in tasks]
+
+
+def test_completions_per_day_and_rolling_average():
+    """Test daily counts, and a window reaching back before the range."""
+    _add(
+        _completed(END - timedelta(days=3), 1),
+        _completed(END - timedelta(days=2), 1),
+        _completed(END, 1),
+        _completed(END, 1),
+    )
+
+    stats = get_completion_stats(start=END - timedelta(days=1), end=END, window_days=3)
+
+    assert stats.days == [END - timedelta(days=1), END]
+    assert stats.completed_per_day == [0, 2]
+    assert stats.rolling_average == pytest.approx([2 / 3, 1])
+    # Tasks before the range only count towards the rolling average
+    assert stats.overall.completed == 2
+
+
+def test_lead_time_and_estimates_by_priority_and_tag():
+    """Test percentiles of lead times and of actual over estimated time."""
+    day = END - timedelta(days=1)
+    noon = datetime.combine(day, datetime.min.time()) + timedelta(hours=12)
+    ids = _add(
+        _completed(day, 2, Priority.HIGH),
+        _completed(day, 4, Priority.HIGH),
+        _completed(
+            day,
+            10,
+            Priority.LOW,
+            start_date=noon - timedelta(hours=2),
+            time_estimate_minutes=60,
+        ),
+        _completed(day, 100, Priority.LOW, deleted_at=noon),
+    )
+    with get_session() as session:
+        tag = Tag(name="stats", owner_id=OWNER)
+        session.add(tag)
+        session.flush()
+        session.add_all(
+            TaskTagLink(task_id=task_id, tag_id=tag.id, owner_id=OWNER)
+            for task_id in ids[1:]
+        )
+
+    stats = get_completion_stats(start=day, end=END)
+
+    assert stats.overall.completed == 3
+    assert stats.overall.lead_time_p50_hours == pytest.approx(4, abs=0.01)
+    high = stats.by_priority[Priority.HIGH]
+    assert (high.completed, high.estimated) == (2, 0)
+    assert high.lead_time_p50_hours == pytest.approx(3, abs=0.01)
+    assert high.lead_time_p90_hours == pytest.approx(3.8, abs=0.01)
+    low = stats.by_priority[Priority.LOW]
+    assert (low.completed, low.estimated) == (1, 1)
+    assert low.estimate_ratio_p50 == pytest.approx(2, abs=0.01)
+    assert Priority.MEDIUM not in stats.by_priority
+
+    assert list(stats.by_tag) == ["stats"]
+    assert stats.by_tag["stats"].completed == 2
+    assert stats.by_tag["stats"].lead_time_p50_hours == pytest.approx(7, abs=0.01)
+
+
+def test_no_completions():
+    """Test that a range without completed tasks has empty stats."""
+    stats = get_completion_stats(start=END, end=END)
+
+    assert stats.completed_per_day == [0]
+    assert stats.overall.completed == 0
+    assert stats.overall.lead_time_p50_hours is None
+    assert stats.by_priority == {} and stats.by_tag == {}
+
+
+def test_invalid_range():
+    """Test that an empty range or window is rejected."""
+    with pytest.raises(ValueError):
+        get_completion_stats(start=END, end=END - timedelta(days=1))
+    with pytest.raises(ValueError):
+        get_completion_stats(window_days=0)
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import col, select
+
+from src.db.engine import get_engine, get_session
+from src.db.functions.changes_since import changes_since
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_tasks import NewTask, create_tasks
+from src.db.functions.find_duplicates import find_duplicates
+from src.db.tenancy import owner_scope
+from src.models import (
+    ChangeOperation,
+    Priority,
+    Tag,
+    Task,
+    TaskChange,
+    TaskSignature,
+    TaskTagLink,
+)
+
+OWNER = 9001
+
+
+@pytest.fixture(autouse=True)
+def _owner():
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (TaskChange, TaskTagLink, TaskSignature, Task, Tag):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+
+
+def test_tasks_and_tags_in_one_transaction():
+    """Test that a batch with new and existing tags commits once."""
+    existing = create_tag("home")
+    begins = []
+    engine = get_engine()
+
+    def count_begin(connection):
+        begins.append(connection)
+
+    event.listen(engine, "begin", count_begin)
+    try:
+        tasks = create_tasks(
+            [
+                NewTask(
+                    title="Call the plumber", priority=Priority.HIGH, tags=["home"]
+                ),
+                NewTask(title="Draft the report", tags=["work", "q3"]),
+                NewTask(title="Water the plants", tags=["home", "home"]),
+                NewTask(title="No tags"),
+            ]
+        )
+    finally:
+        event.remove(engine, "begin", count_begin)
+
+    assert len(begins) == 1
+    assert [task.title for task in tasks] == [
+        "Call the plumber",
+        "Draft the report",
+        "Water the plants",
+        "No tags",
+    ]
+    assert tasks[0].priority == Priority.HIGH
+    assert all(task.id is not None and task.owner_id == OWNER for task in tasks)
+
+    with get_session() as session:
+        tags = dict(session.exec(select(Tag.name, Tag.id)).all())
+        links = session.exec(
+            select(TaskTagLink.task_id, TaskTagLink.tag_id).order_by(
+                col(TaskTagLink.task_id), col(TaskTagLink.tag_id)
+            )
+        ).all()
+    assert tags["home"] == existing.id
+    assert [task.tag_ids for task in tasks] == [
+        [tags["home"]],
+        sorted([tags["work"], tags["q3"]]),
+        [tags["home"]],
+        [],
+    ]
+    assert sorted(links) == sorted(
+        [
+            (tasks[0].id, tags["home"]),
+            (tasks[1].id, tags["work"]),
+            (tasks[1].id, tags["q3"]),
+            (tasks[2].id, tags["home"]),
+        ]
+    )
+
+
+def test_batch_is_logged_and_deduplicated_like_single_creates():
+    """Test that change log and title signatures match create_task's."""
+    [task] = create_tasks([NewTask(title="Renew the passport", tags=["admin"])])
+
+    changes = changes_since()
+    with get_session() as session:
+        operations = session.exec(
+            select(TaskChange.operation)
+            .where(TaskChange.task_id == task.id)
+            .order_by(col(TaskChange.id))
+        ).all()
+
+    assert operations == [ChangeOperation.CREATE, ChangeOperation.TAG]
+    assert [synced.id for synced in changes.tasks] == [task.id]
+    assert [match.task_id for match in find_duplicates("Renew passport")] == [task.id]
+
+
+def test_empty_batch():
+    """Test that an empty batch doesn't touch the database."""
+    assert create_tasks([]) == []
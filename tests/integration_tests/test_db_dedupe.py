@@ -0,0 +1,156 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import col, delete, select, update
+
+from src.db.dedupe import (
+    DuplicateGroup,
+    backfill_signatures,
+    find_duplicate_groups,
+    remove_duplicates,
+)
+from src.db.engine import get_engine, get_session
+from src.db.exceptions import DuplicateTaskError
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.find_duplicates import find_duplicates
+from src.db.functions.list_tasks import list_tasks
+from src.db.tenancy import owner_scope
+from src.models import Task, TaskChange, TaskSignature
+
+OWNER = 4001
+
+
+@pytest.fixture(autouse=True)
+def _owner():
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (TaskSignature, TaskChange, Task):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+
+
+def test_find_exact_and_near_duplicates():
+    """Test that same and similar titles are found, unrelated ones aren't."""
+    same = create_task(title="Buy milk")
+    similar = create_task(title="Call mom about trip")
+    create_task(title="Renew passport")
+
+    matches = find_duplicates("buy MILK!")
+    assert [(m.task_id, m.exact) for m in matches] == [(same.id, True)]
+
+    matches = find_duplicates("Call mom about the trip", budget_ms=10_000)
+    assert [(m.task_id, m.exact) for m in matches] == [(similar.id, False)]
+    assert matches[0].similarity >= 0.5
+
+    assert find_duplicates("File taxes", budget_ms=10_000) == []
+
+
+def test_no_budget_only_finds_exact_duplicates():
+    """Test that near-duplicate lookups are skipped without time left."""
+    create_task(title="Call mom about trip")
+
+    assert find_duplicates("Call mom about the trip", budget_ms=0) == []
+
+
+def test_deleted_and_other_owners_tasks_are_not_duplicates():
+    """Test that only the owner's live tasks count."""
+    task = create_task(title="Buy milk")
+    delete_task(task.id)
+    with owner_scope(OWNER + 1):
+        other = create_task(title="Buy milk")
+
+    try:
+        assert find_duplicates("Buy milk") == []
+    finally:
+        with owner_scope(OWNER + 1):
+            delete_task(other.id)
+        with get_session() as session:
+            for model in (TaskSignature, TaskChange, Task):
+                rows = session.exec(select(model).where(model.owner_id == OWNER + 1))
+                for row in rows:
+                    session.delete(row)
+                session.flush()
+
+
+def test_create_task_rejects_duplicates():
+    """Test that create_task refuses duplicates only when asked to."""
+    existing = create_task(title="Water plants")
+
+    with pytest.raises(DuplicateTaskError) as exc_info:
+        create_task(title="water plants", reject_duplicates=True)
+    assert [m.task_id for m in exc_info.value.matches] == [existing.id]
+
+    create_task(title="water plants")
+    assert len(list_tasks()) == 2
+
+
+def test_edited_title_is_rehashed():
+    """Test that duplicates are found by the current title after an edit."""
+    task = create_task(title="Draft")
+    edit_task(task.id, title="Prepare slides for review")
+
+    assert find_duplicates("Draft") == []
+    matches = find_duplicates("prepare slides for the review", budget_ms=10_000)
+    assert [m.task_id for m in matches] == [task.id]
+
+
+def test_only_edits_delete_old_signatures():
+    """Test that creating a task inserts its signature without a DELETE first."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(get_engine(), "before_cursor_execute", record)
+    try:
+        task = create_task(title="Draft")
+        created = len(statements)
+        edit_task(task.id, title="Prepare slides for review")
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", record)
+
+    deletes = [
+        i
+        for i, statement in enumerate(statements)
+        if statement.startswith("DELETE FROM task_signature")
+    ]
+    assert len(deletes) == 1
+    assert deletes[0] >= created
+
+
+def test_batch_job_groups_and_removes_duplicates():
+    """Test that the batch job merges exact and near duplicates into groups."""
+    first = create_task(title="Book dentist appointment")
+    exact = create_task(title="book dentist appointment")
+    near = create_task(title="Book the dentist appointment")
+    other = create_task(title="Renew passport")
+
+    groups = [g for g in find_duplicate_groups() if g.owner_id == OWNER]
+    assert groups == [DuplicateGroup(OWNER, [first.id, exact.id, near.id])]
+
+    assert remove_duplicates(groups) == 2
+    assert {task.id for task in list_tasks()} == {first.id, other.id}
+
+
+def test_backfill_hashes_older_tasks():
+    """Test that tasks without a title hash get one, and their signature."""
+    task = create_task(title="Legacy task")
+    with get_session() as session:
+        session.exec(
+            update(Task).where(col(Task.id) == task.id).values(title_hash=None)
+        )
+        session.exec(delete(TaskSignature).where(col(TaskSignature.task_id) == task.id))
+
+    while backfill_signatures():
+        pass
+
+    matches = find_duplicates("legacy task")
+    assert [m.task_id for m in matches] == [task.id]
+    with get_session() as session:
+        signature = session.exec(
+            select(TaskSignature).where(TaskSignature.task_id == task.id)
+        ).all()
+        assert len(signature) > 0
@@ -1,9 +1,19 @@
-from sqlmodel import select
+from datetime import datetime, timedelta
+
+import pytest
+from sqlmodel import col, select
 
 from src.db.engine import get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_tag import create_tag
 from src.db.functions.create_task import create_task
 from src.db.functions.delete_task import delete_task
-from src.models import Task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.list_tasks import list_tasks
+from src.db.functions.restore_task import restore_task
+from src.db.purge import purge_deleted_tasks
+from src.db.tag_cache import tag_cache
+from src.models import Tag, Task, TaskTagLink
 
 
 def test_delete_existing_task():
@@ -15,11 +25,21 @@ def test_delete_existing_task():
 
     assert result is True
 
-    # Verify task is actually deleted
+    # Verify task is soft-deleted and hidden from readers
     with get_session() as session:
         statement = select(Task).where(Task.id == task_id)
         deleted_task = session.exec(statement).first()
-        assert deleted_task is None
+        assert deleted_task is not None
+        assert deleted_task.deleted_at is not None
+    assert task_id not in [t.id for t in list_tasks()]
+    with pytest.raises(ValueError):
+        edit_task(task_id, title="Edited")
+
+    # Deleting again is a no-op
+    assert delete_task(task_id) is False
+
+    # Cleanup
+    purge_deleted_tasks(retention=timedelta(0))
 
 
 def test_delete_nonexistent_task():
@@ -27,3 +47,84 @@ def test_delete_nonexistent_task():
     result = delete_task(99999)
 
     assert result is False
+
+
+def test_restore_task():
+    """Test undoing a deletion."""
+    task = create_task(title="Task to Restore")
+    delete_task(task.id)
+
+    restored = restore_task(task.id)
+
+    assert restored.id == task.id
+    assert restored.version == task.version + 2
+    assert task.id in [t.id for t in list_tasks()]
+    with pytest.raises(ValueError):
+        restore_task(task.id)
+
+    # Cleanup
+    delete_task(task.id)
+    purge_deleted_tasks(retention=timedelta(0))
+
+
+def test_purge_removes_deleted_tasks_and_links():
+    """Test that the purge job hard-deletes tasks past retention only."""
+    old = create_task(title="Purge Old")
+    recent = create_task(title="Purge Recent")
+    live = create_task(title="Purge Live")
+    tag = create_tag(name="purge-tag")
+    add_tag_to_task(old.id, tag.id)
+    delete_task(old.id)
+    delete_task(recent.id)
+    with get_session() as session:
+        db_old = session.exec(select(Task).where(Task.id == old.id)).one()
+        db_old.deleted_at = datetime.now() - timedelta(hours=2)
+        session.add(db_old)
+
+    result = purge_deleted_tasks(retention=timedelta(hours=1))
+
+    assert result.purged >= 1
+    with get_session() as session:
+        remaining = set(
+            session.exec(
+                select(Task.id).where(col(Task.id).in_([old.id, recent.id, live.id]))
+            ).all()
+        )
+        links = session.exec(
+            select(TaskTagLink).where(TaskTagLink.task_id == old.id)
+        ).all()
+    assert remaining == {recent.id, live.id}
+    assert links == []
+
+    # Cleanup
+    delete_task(live.id)
+    purge_deleted_tasks(retention=timedelta(0))
+    with get_session() as session:
+        db_tag = session.exec(select(Tag).where(Tag.id == tag.id)).first()
+        if db_tag:
+            session.delete(db_tag)
+    tag_cache.clear()
+
+
+def test_purge_batches_are_bounded_and_rate_limited():
+    """Test purge throughput with bounded, rate-limited batches."""
+    deleted_at = datetime.now() - timedelta(days=1)
+    with get_session() as session:
+        session.add_all(
+            Task(title=f"Bulk Deleted {i}", deleted_at=deleted_at) for i in range(250)
+        )
+
+    result = purge_deleted_tasks(
+        retention=timedelta(0), batch_size=100, batches_per_second=20
+    )
+
+    assert result.purged >= 250
+    assert result.batches >= 3
+    # Two full batches are each followed by a 50ms pause
+    assert result.elapsed_seconds >= 0.1
+    assert result.tasks_per_second > 0
+    with get_session() as session:
+        left = session.exec(
+            select(Task.id).where(col(Task.deleted_at).is_not(None))
+        ).all()
+    assert left == []
@@ -4,8 +4,10 @@ import pytest
 from sqlmodel import select
 
 from src.db.engine import get_session
+from src.db.exceptions import StaleTaskError
 from src.db.functions.create_task import create_task
 from src.db.functions.edit_task import edit_task
+from src.db.functions.edit_tasks import TaskEdit, edit_tasks
 from src.models import Priority, Task
 
 
@@ -70,3 +72,69 @@ def test_edit_nonexistent_task():
     """Test editing a task that doesn't exist."""
     with pytest.raises(ValueError, match="Task with id 99999 not found"):
         edit_task(99999, title="New Title")
+
+
+def test_edit_task_bumps_version():
+    """Test that every edit increments the row version."""
+    task = create_task(title="Versioned Task")
+    assert task.version == 1
+
+    updated_task = edit_task(task.id, title="Versioned Task v2")
+    assert updated_task.version == 2
+
+    updated_task = edit_task(task.id, completed=True, expected_version=2)
+    assert updated_task.version == 3
+    assert updated_task.title == "Versioned Task v2"
+
+    # Cleanup
+    with get_session() as session:
+        db_task = session.exec(select(Task).where(Task.id == task.id)).first()
+        if db_task:
+            session.delete(db_task)
+
+
+def test_edit_task_stale_version():
+    """Test that an edit based on an outdated version is rejected."""
+    task = create_task(title="Contended Task")
+
+    # Another session toggles the task first
+    edit_task(task.id, completed=True, expected_version=task.version)
+
+    with pytest.raises(StaleTaskError) as exc_info:
+        edit_task(task.id, completed=False, expected_version=task.version)
+
+    assert exc_info.value.expected_version == 1
+    assert exc_info.value.current_version == 2
+
+    with get_session() as session:
+        db_task = session.exec(select(Task).where(Task.id == task.id)).first()
+        assert db_task is not None
+        assert db_task.completed is True
+        session.delete(db_task)
+
+
+def test_edit_tasks_reports_per_row_conflicts():
+    """Test that a batch edit applies what it can and reports the rest."""
+    task1 = create_task(title="Batch Task 1")
+    task2 = create_task(title="Batch Task 2")
+    edit_task(task2.id, title="Changed elsewhere")
+
+    result = edit_tasks(
+        [
+            TaskEdit(task_id=task1.id, completed=True, expected_version=1),
+            TaskEdit(task_id=task2.id, completed=True, expected_version=1),
+            TaskEdit(task_id=99999, completed=True),
+        ]
+    )
+
+    assert [t.id for t in result.updated] == [task1.id]
+    assert result.updated[0].completed is True
+    assert [c.task_id for c in result.conflicts] == [task2.id]
+    assert result.missing == [99999]
+
+    # Cleanup
+    with get_session() as session:
+        for task in [task1, task2]:
+            db_task = session.exec(select(Task).where(Task.id == task.id)).first()
+            if db_task:
+                session.delete(db_task)
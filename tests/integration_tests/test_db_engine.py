@@ -1,7 +1,10 @@
+import threading
+
 import pytest
 from sqlalchemy.exc import OperationalError
 from sqlmodel import Field, Session, SQLModel, select
 
+from src.db import engine as engine_module
 from src.db.engine import get_engine, get_session
 
 
@@ -46,6 +49,26 @@ def test_get_engine_singleton():
     assert engine1 is engine2, "get_engine should return the same instance"
 
 
+def test_get_engine_thread_safe(monkeypatch):
+    """Test that concurrent first calls create a single engine."""
+    monkeypatch.setattr(engine_module, "_engine", None)
+    barrier = threading.Barrier(16)
+    engines = []
+
+    def worker():
+        barrier.wait()
+        engines.append(get_engine())
+
+    threads = [threading.Thread(target=worker) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(engine) for engine in engines}) == 1
+    engines[0].dispose()
+
+
 def test_get_session():
     """Test that get_session returns a valid session."""
     with get_session() as session:
@@ -1,10 +1,13 @@
 import pytest
-from sqlmodel import select
+from sqlmodel import col, select
 
 from src.db.engine import get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_tag import create_tag
 from src.db.functions.create_task import create_task
-from src.db.functions.list_tasks import list_tasks
-from src.models import Priority, Task
+from src.db.functions.get_task_descriptions import get_task_descriptions
+from src.db.functions.list_tasks import TaskFields, list_tasks
+from src.models import Priority, Tag, Task, TaskChange, TaskTagLink
 
 
 @pytest.fixture
@@ -57,3 +60,58 @@ def test_list_tasks_filter_by_priority(sample_tasks):
 
     assert len(high_priority_tasks) >= 1
     assert all(task.priority == Priority.HIGH for task in high_priority_tasks)
+
+
+def test_list_task_summaries_and_their_descriptions():
+    """Test listing without descriptions, then fetching them in one call."""
+    long_task = create_task(title="Long notes", description="x" * 5000)
+    short_task = create_task(title="Short notes", description="Call first")
+    bare_task = create_task(title="No notes")
+    ids = [long_task.id, short_task.id, bare_task.id]
+
+    try:
+        summaries = [t for t in list_tasks(fields=TaskFields.SUMMARY) if t.id in ids]
+        assert {t.title for t in summaries} == {"Long notes", "Short notes", "No notes"}
+        assert all(t.description is None for t in summaries)
+
+        assert get_task_descriptions(ids, max_length=20) == {
+            long_task.id: "x" * 20,
+            short_task.id: "Call first",
+        }
+        assert get_task_descriptions([long_task.id]) == {long_task.id: "x" * 5000}
+        assert get_task_descriptions([]) == {}
+    finally:
+        with get_session() as session:
+            for task_id in ids:
+                db_task = session.get(Task, task_id)
+                if db_task:
+                    session.delete(db_task)
+
+
+def test_list_tasks_filter_by_tag(sample_tasks):
+    """Test filtering by tag from the tag IDs kept on each task."""
+    task1, task2, task3 = sample_tasks
+    home = create_tag(name="list-home")
+    work = create_tag(name="list-work")
+    add_tag_to_task(task1.id, home.id)
+    add_tag_to_task(task1.id, work.id)
+    add_tag_to_task(task3.id, work.id)
+
+    try:
+        at_home = list_tasks(tag_id=home.id)
+        at_work = list_tasks(tag_id=work.id, fields=TaskFields.SUMMARY)
+        assert [task.id for task in at_home] == [task1.id]
+        assert at_home[0].tag_ids == sorted([home.id, work.id])
+        assert {task.id for task in at_work} == {task1.id, task3.id}
+        assert list_tasks(tag_id=work.id, priority=Priority.MEDIUM)[0].id == task3.id
+    finally:
+        with get_session() as session:
+            task_ids = [task.id for task in sample_tasks]
+            for model in (TaskTagLink, TaskChange):
+                for row in session.exec(
+                    select(model).where(col(model.task_id).in_(task_ids))
+                ):
+                    session.delete(row)
+            session.flush()
+            for tag in (home, work):
+                session.delete(session.get(Tag, tag.id))
@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from src.db.engine import get_session
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.list_tasks_in_range import (
+    DateField,
+    DateRangePreset,
+    list_tasks_for_preset,
+    list_tasks_in_range,
+    preset_range,
+)
+from src.models import Task
+
+# Far from the present so other tests' tasks don't fall in the ranges
+BASE = datetime(2031, 3, 10)
+
+
+def _cleanup(*tasks: Task) -> None:
+    with get_session() as session:
+        for task in tasks:
+            db_task = session.exec(select(Task).where(Task.id == task.id)).first()
+            if db_task:
+                session.delete(db_task)
+
+
+def test_list_tasks_in_range_is_half_open():
+    """Test that the range includes its start and excludes its end."""
+    at_start = create_task(title="Range Start", due_date=BASE)
+    at_end = create_task(title="Range End", due_date=BASE + timedelta(days=7))
+    inside = create_task(title="Range Inside", due_date=BASE + timedelta(days=3))
+
+    tasks = list_tasks_in_range(BASE, BASE + timedelta(days=7))
+    ids = [task.id for task in tasks]
+
+    assert ids == [at_start.id, inside.id]
+
+    _cleanup(at_start, at_end, inside)
+
+
+def test_list_tasks_in_range_by_start_date_and_completed_at():
+    """Test filtering on start dates and completion times."""
+    starting = create_task(title="Range Starting", start_date=BASE)
+    done = create_task(title="Range Done")
+    edit_task(done.id, completed=True)
+
+    starts = list_tasks_in_range(
+        BASE, BASE + timedelta(days=1), field=DateField.START_DATE
+    )
+    assert [task.id for task in starts] == [starting.id]
+
+    now = datetime.now()
+    completed = list_tasks_in_range(
+        now - timedelta(minutes=5), None, field=DateField.COMPLETED_AT
+    )
+    assert done.id in [task.id for task in completed]
+    assert starting.id not in [task.id for task in completed]
+
+    _cleanup(starting, done)
+
+
+def test_list_tasks_in_range_span_overlap():
+    """Test that span queries match tasks whose interval overlaps the range."""
+    overlapping = create_task(
+        title="Span Overlapping",
+        start_date=BASE - timedelta(days=2),
+        due_date=BASE + timedelta(days=1),
+    )
+    before = create_task(
+        title="Span Before",
+        start_date=BASE - timedelta(days=5),
+        due_date=BASE - timedelta(days=3),
+    )
+    due_only = create_task(title="Span Due Only", due_date=BASE)
+
+    tasks = list_tasks_in_range(BASE, BASE + timedelta(days=1), field=DateField.SPAN)
+    ids = [task.id for task in tasks]
+
+    assert overlapping.id in ids
+    assert before.id not in ids
+    assert due_only.id not in ids
+
+    _cleanup(overlapping, before, due_only)
+
+
+def test_list_tasks_for_preset():
+    """Test the overdue and this-week presets."""
+    now = BASE + timedelta(days=2, hours=15)  # Wednesday afternoon
+    overdue = create_task(title="Preset Overdue", due_date=BASE + timedelta(days=1))
+    today = create_task(title="Preset Today", due_date=BASE + timedelta(days=2))
+    done = create_task(title="Preset Done", due_date=BASE + timedelta(days=3))
+    edit_task(done.id, completed=True)
+
+    overdue_ids = [
+        task.id for task in list_tasks_for_preset(DateRangePreset.OVERDUE, now=now)
+    ]
+    week_ids = [
+        task.id for task in list_tasks_for_preset(DateRangePreset.THIS_WEEK, now=now)
+    ]
+
+    assert overdue.id in overdue_ids
+    assert today.id not in overdue_ids
+    assert week_ids == [overdue.id, today.id]
+    assert preset_range(DateRangePreset.TODAY, now) == (
+        BASE + timedelta(days=2),
+        BASE + timedelta(days=3),
+    )
+
+    _cleanup(overdue, today, done)
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool, QueuePool
+from sqlmodel import select
+
+from src.db import engine as engine_module
+from src.db.engine import _connect_args, get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.find_duplicates import find_duplicates
+from src.db.functions.remove_tag_from_task import remove_tag_from_task
+from src.db.tenancy import owner_scope
+from src.models import Tag, Task, TaskTagLink
+from src.settings import get_settings
+
+OWNER = 8001
+
+
+@pytest.fixture(autouse=True)
+def _owner():
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (TaskTagLink, Task, Tag):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+
+
+@pytest.fixture
+def pgbouncer(monkeypatch):
+    """Use an engine created in PgBouncer mode, with the given pool size."""
+    engines = []
+
+    def use(pool_size=0):
+        monkeypatch.setattr(get_settings(), "database_pgbouncer", True)
+        monkeypatch.setattr(get_settings(), "database_pool_size", pool_size)
+        engine = engine_module._create_engine(get_settings().database_url)
+        monkeypatch.setattr(engine_module, "_engine", engine)
+        engines.append(engine)
+        return engine
+
+    yield use
+    for engine in engines:
+        engine.dispose()
+
+
+def test_no_client_pool_by_default(pgbouncer):
+    """Test that every session opens its own connection, returned on close."""
+    engine = pgbouncer()
+
+    task = create_task(title="Bounced")
+
+    assert isinstance(engine.pool, NullPool)
+    assert task.id is not None
+
+
+def test_small_pool_never_overflows(pgbouncer):
+    """Test that a pool size caps the client connections of the engine."""
+    engine = pgbouncer(pool_size=2)
+
+    assert isinstance(engine.pool, QueuePool)
+    assert engine.pool.size() == 2
+    assert engine.pool.overflow() == -2
+
+
+def test_prepared_statements_are_off(monkeypatch):
+    """Test that psycopg never prepares statements on a PgBouncer connection."""
+    url = "postgresql+psycopg://todo@localhost/tododb"
+    monkeypatch.setattr(get_settings(), "database_prepare_threshold", 0)
+    assert _connect_args(url) == {"prepare_threshold": 0}
+
+    monkeypatch.setattr(get_settings(), "database_pgbouncer", True)
+
+    assert _connect_args(url) == {"prepare_threshold": None}
+
+
+def test_each_function_runs_in_one_transaction(pgbouncer):
+    """Test that writes that used to commit midway now commit once."""
+    engine = pgbouncer()
+    task = create_task(title="Single transaction")
+    assert task.id is not None
+    begins = []
+    event.listen(engine, "begin", lambda connection: begins.append(connection))
+
+    tag = create_tag("bounced")
+    assert tag.id is not None
+    add_tag_to_task(task.id, tag.id)
+    remove_tag_from_task(task.id, tag.id)
+    find_duplicates("Single transaction", budget_ms=1000)
+
+    assert len(begins) == 4
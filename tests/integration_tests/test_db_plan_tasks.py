@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from sqlmodel import select
+
+from src.db.engine import get_session
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.plan_tasks import plan_tasks
+from src.models import Task
+
+
+def test_plan_tasks_schedules_open_tasks():
+    """Test that open tasks are planned and completed ones are skipped."""
+    now = datetime.now()
+    urgent = create_task(
+        title="Plan Urgent", due_date=now - timedelta(days=1), time_estimate_minutes=60
+    )
+    done = create_task(title="Plan Done")
+    edit_task(done.id, completed=True)
+
+    plan = plan_tasks(now=now)
+    planned = {slot.task_id: slot for slot in plan}
+
+    assert urgent.id in planned
+    assert planned[urgent.id].late is True
+    assert done.id not in planned
+
+    # Cleanup
+    with get_session() as session:
+        for task in [urgent, done]:
+            db_task = session.exec(select(Task).where(Task.id == task.id)).first()
+            if db_task:
+                session.delete(db_task)
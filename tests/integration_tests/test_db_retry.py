@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+
+from src.db import retry
+from src.db.engine import get_engine, get_session
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.db.retry import RetryPolicy, retry_stats
+from src.models import Task
+
+
+class FaultInjector:
+    """Make the engine fail the next statements that match a prefix."""
+
+    def __init__(self, engine, prefix, failures, message, invalidated=False):
+        self.engine = engine
+        self.prefix = prefix
+        self.remaining = failures
+        self.message = message
+        self.invalidated = invalidated
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._fail)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, "before_cursor_execute", self._fail)
+
+    def _fail(self, conn, cursor, statement, parameters, context, executemany):
+        if self.remaining and statement.lstrip().upper().startswith(self.prefix):
+            self.remaining -= 1
+            raise OperationalError(
+                statement,
+                parameters,
+                Exception(self.message),
+                connection_invalidated=self.invalidated,
+            )
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(
+        retry,
+        "get_retry_policy",
+        lambda: RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01),
+    )
+    retry_stats.reset()
+
+
+def _cleanup(task_id):
+    with get_session() as session:
+        db_task = session.exec(select(Task).where(Task.id == task_id)).first()
+        if db_task:
+            session.delete(db_task)
+
+
+def test_create_task_survives_lock_conflicts():
+    """Test that create_task retries a transient failure of its INSERT."""
+    with FaultInjector(get_engine(), "INSERT", 2, "database is locked"):
+        task = create_task(title="Retried Task")
+
+    assert task.id is not None
+    assert retry_stats.snapshot()["retries"] == {"create_task": 2}
+
+    with get_session() as session:
+        titles = session.exec(select(Task.title).where(Task.id == task.id)).all()
+    assert titles == ["Retried Task"]
+
+    _cleanup(task.id)
+
+
+def test_edit_task_gives_up_after_max_attempts():
+    """Test that a persistent failure still reaches the caller."""
+    task = create_task(title="Unlucky Task")
+
+    with FaultInjector(get_engine(), "UPDATE", 5, "could not serialize access"):
+        with pytest.raises(OperationalError):
+            edit_task(task.id, completed=True)
+
+    assert retry_stats.snapshot()["give_ups"] == {"edit_task": 1}
+
+    with get_session() as session:
+        db_task = session.exec(select(Task).where(Task.id == task.id)).one()
+        assert db_task.completed is False
+
+    _cleanup(task.id)
+
+
+def test_edit_task_is_not_retried_after_a_dropped_connection():
+    """Test that an edit isn't applied twice if the first try may have committed."""
+    task = create_task(title="Dropped Task")
+
+    with FaultInjector(
+        get_engine(), "UPDATE", 1, "server closed the connection", invalidated=True
+    ):
+        with pytest.raises(OperationalError):
+            edit_task(task.id, completed=True)
+
+    assert retry_stats.snapshot()["retries"] == {}
+
+    _cleanup(task.id)
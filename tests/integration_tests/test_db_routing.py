@@ -0,0 +1,93 @@
+import pytest
+from sqlmodel import Session, SQLModel, create_engine, update
+
+from src.db import engine as engine_module
+from src.db.engine import RoutingState, bind_routing_state, get_session
+from src.db.functions.create_task import create_task
+from src.db.functions.list_tasks import list_tasks
+from src.models import Task
+from src.settings import get_settings
+
+
+@pytest.fixture
+def primary_and_replica(tmp_path, monkeypatch):
+    """Point the db layer at two separate local databases."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        SQLModel.metadata.create_all(engine)
+
+    monkeypatch.setattr(engine_module, "_engine", primary)
+    monkeypatch.setattr(engine_module, "_replica_engine", replica)
+    monkeypatch.setattr(get_settings(), "database_replica_url", "sqlite:///replica.db")
+    monkeypatch.setattr(get_settings(), "replica_stickiness_seconds", 60.0)
+    bind_routing_state(RoutingState())
+
+    yield primary, replica
+
+    bind_routing_state(RoutingState())
+    primary.dispose()
+    replica.dispose()
+
+
+def test_reads_go_to_replica(primary_and_replica):
+    """Test that list functions read from the replica."""
+    _, replica = primary_and_replica
+    with Session(replica) as session:
+        session.add(Task(title="Replicated Task"))
+        session.commit()
+
+    titles = [task.title for task in list_tasks()]
+
+    assert titles == ["Replicated Task"]
+
+
+def test_reads_stick_to_primary_after_write(primary_and_replica):
+    """Test that a user sees their own write before it reaches the replica."""
+    create_task(title="Fresh Task")
+
+    titles = [task.title for task in list_tasks()]
+
+    assert titles == ["Fresh Task"]
+
+
+def test_stickiness_expires(primary_and_replica, monkeypatch):
+    """Test that reads return to the replica once the window has passed."""
+    create_task(title="Fresh Task")
+    monkeypatch.setattr(get_settings(), "replica_stickiness_seconds", 0.0)
+
+    assert list_tasks() == []
+
+
+def test_stickiness_is_per_routing_state(primary_and_replica):
+    """Test that one user's write doesn't pin other users to the primary."""
+    create_task(title="Someone Else's Task")
+    bind_routing_state(RoutingState())
+
+    assert list_tasks() == []
+
+
+def test_reads_stay_on_replica_after_read_only_work(primary_and_replica):
+    """Test that a session which wrote nothing doesn't pin reads to the primary."""
+    primary, _ = primary_and_replica
+    with Session(primary) as session:
+        session.add(Task(title="Primary Task"))
+        session.commit()
+
+    with get_session() as session:
+        session.get(Task, 1)
+
+    assert list_tasks() == []
+
+
+def test_bulk_update_pins_reads_to_primary(primary_and_replica):
+    """Test that a write without a flush still counts as a write."""
+    primary, _ = primary_and_replica
+    with Session(primary) as session:
+        session.add(Task(title="Primary Task"))
+        session.commit()
+
+    with get_session() as session:
+        session.exec(update(Task).values(title="Renamed Task"))
+
+    assert [task.title for task in list_tasks()] == ["Renamed Task"]
@@ -0,0 +1,172 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import col, delete, select
+
+from src.db import engine as engine_module
+from src.db.admin import count_tasks, export_tasks
+from src.db.engine import get_engine, get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.changes_since import changes_since
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.list_tasks import list_tasks
+from src.db.functions.undo_changes import undo_changes
+from src.db.init_db import init_db
+from src.db.rebalance import find_misplaced_owners, move_owner
+from src.db.sharding import HashRing, shard_for_owner, shard_scope
+from src.db.tenancy import all_owners_scope, owner_scope
+from src.models import Task, TaskChange, TaskTagLink
+from src.settings import get_settings
+
+
+@pytest.fixture
+def shards(tmp_path, monkeypatch):
+    """Spread owners over local SQLite shards, two to start with."""
+    urls = [f"sqlite:///{tmp_path / f'shard{i}.db'}" for i in range(3)]
+
+    def use(count):
+        monkeypatch.setattr(get_settings(), "database_shard_urls", urls[:count])
+        init_db()
+
+    monkeypatch.setattr(engine_module, "_shard_engines", {})
+    use(2)
+    yield use
+    for engine in engine_module._shard_engines.values():
+        engine.dispose()
+
+
+def _owner_in_shard(shard, count=2):
+    ring = HashRing(count)
+    return next(owner for owner in range(1, 1000) if ring.shard_for(owner) == shard)
+
+
+def _titles_in_shard(shard):
+    with shard_scope(shard), all_owners_scope(), get_session() as session:
+        return sorted(session.exec(select(Task.title)))
+
+
+def test_owners_live_in_their_shard(shards):
+    """Test that each owner's tasks are written to and read from one shard."""
+    first, second = _owner_in_shard(0), _owner_in_shard(1)
+    with owner_scope(first):
+        create_task(title="First")
+    with owner_scope(second):
+        create_task(title="Second")
+        assert [task.title for task in list_tasks()] == ["Second"]
+
+    assert _titles_in_shard(0) == ["First"]
+    assert _titles_in_shard(1) == ["Second"]
+
+
+def test_all_owner_jobs_must_pick_a_shard(shards):
+    """Test that a job covering every owner can't quietly read one shard."""
+    with all_owners_scope(), pytest.raises(RuntimeError), get_session():
+        pass
+
+
+def test_admin_reads_cover_every_shard(shards):
+    """Test that counts and exports merge the results of all shards."""
+    for owner in (_owner_in_shard(0), _owner_in_shard(1)):
+        with owner_scope(owner):
+            create_task(title=f"Task of {owner}")
+            delete_task(create_task(title="Gone").id)
+
+    counts = count_tasks()
+    exported = export_tasks()
+
+    assert [(c.owners, c.live, c.deleted) for c in counts] == [(1, 1, 1), (1, 1, 1)]
+    assert [task["title"] for task in exported] == sorted(
+        f"Task of {owner}" for owner in (_owner_in_shard(0), _owner_in_shard(1))
+    )
+
+
+def test_rebalance_moves_owners_to_a_new_shard(shards):
+    """Test that owners the third shard takes over keep their data and log."""
+    owner = _owner_in_shard(2, count=3)
+    with owner_scope(owner):
+        tag = create_tag("moving")
+        task = create_task(title="Packed")
+        add_tag_to_task(task.id, tag.id)
+        edit_task(task.id, title="Packed up")
+        delete_task(create_task(title="Unpacked").id)
+    source = shard_for_owner(owner)
+
+    shards(3)
+    moves = find_misplaced_owners()
+    assert [(m.owner_id, m.source, m.target) for m in moves] == [(owner, source, 2)]
+    assert move_owner(moves[0]) == 2
+
+    assert find_misplaced_owners() == []
+    assert _titles_in_shard(source) == []
+    with owner_scope(owner):
+        (moved,) = changes_since().tasks
+        assert moved.title == "Packed up"
+        assert [t.name for t in moved.tags] == ["moving"]
+        (undone,) = undo_changes()
+        assert undone.operation == "delete"
+        assert sorted(t.title for t in list_tasks()) == ["Packed up", "Unpacked"]
+
+
+def test_rebalance_rerun_after_interruption_copies_nothing_twice(shards):
+    """Test that moving an owner again after a failed delete adds no copies."""
+    owner = _owner_in_shard(2, count=3)
+    with owner_scope(owner):
+        tag = create_tag("moving")
+        task = create_task(title="Packed")
+        add_tag_to_task(task.id, tag.id)
+        edit_task(task.id, title="Packed up")
+    source = shard_for_owner(owner)
+
+    shards(3)
+    (move,) = find_misplaced_owners()
+
+    def fail(conn, cursor, statement, *args):
+        if statement.startswith("DELETE FROM task_tag_link"):
+            raise RuntimeError("interrupted")
+
+    with shard_scope(source):
+        source_engine = get_engine()
+    event.listen(source_engine, "before_cursor_execute", fail)
+    try:
+        with pytest.raises(RuntimeError, match="interrupted"):
+            move_owner(move)
+    finally:
+        event.remove(source_engine, "before_cursor_execute", fail)
+    assert _titles_in_shard(source) == ["Packed up"]
+
+    assert move_owner(move) == 1
+
+    assert _titles_in_shard(source) == []
+    assert _titles_in_shard(2) == ["Packed up"]
+    with shard_scope(2), all_owners_scope(), get_session() as session:
+        assert len(session.exec(select(TaskTagLink)).all()) == 1
+        operations = session.exec(select(TaskChange.operation)).all()
+        assert sorted(operations) == ["create", "tag", "update"]
+
+
+def test_rebalance_keeps_undo_entries_of_pruned_changes_undone(shards):
+    """Test that an undo entry whose reverted entry is gone isn't undone."""
+    owner = _owner_in_shard(2, count=3)
+    with owner_scope(owner):
+        task = create_task(title="Before")
+        edit_task(task.id, title="After")
+        undo_changes()
+    source = shard_for_owner(owner)
+    with shard_scope(source), all_owners_scope(), get_session() as session:
+        session.exec(
+            delete(TaskChange).where(
+                col(TaskChange.operation) == "update",
+                col(TaskChange.undo_of).is_(None),
+            )
+        )
+
+    shards(3)
+    (move,) = find_misplaced_owners()
+    move_owner(move)
+
+    with owner_scope(owner):
+        (undone,) = undo_changes()
+        assert undone.operation == "create"
+        assert list_tasks() == []
@@ -0,0 +1,145 @@
+import gzip
+
+import pytest
+from sqlalchemy import inspect
+from sqlmodel import col, select
+
+from src.db import engine as engine_module
+from src.db.engine import get_engine, get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.find_duplicates import find_duplicates
+from src.db.functions.get_task import get_task
+from src.db.init_db import init_db
+from src.db.sharding import shard_scope
+from src.db.snapshot import dump_snapshot, restore_snapshot
+from src.db.tenancy import all_owners_scope, owner_scope
+from src.models import Priority, Tag, Task, TaskTagLink
+from src.settings import get_settings
+
+
+@pytest.fixture
+def databases(tmp_path, monkeypatch):
+    """Two empty SQLite databases, as shards 0 and 1."""
+    urls = [f"sqlite:///{tmp_path / f'db{i}.db'}" for i in range(2)]
+    monkeypatch.setattr(get_settings(), "database_shard_urls", urls)
+    monkeypatch.setattr(engine_module, "_shard_engines", {})
+    init_db()
+    yield
+    for engine in engine_module._shard_engines.values():
+        engine.dispose()
+
+
+def _rows(shard):
+    with shard_scope(shard), all_owners_scope(), get_session() as session:
+        return [
+            [row.model_dump() for row in session.exec(select(model))]
+            for model in (Tag, Task, TaskTagLink)
+        ]
+
+
+def _fill(shard):
+    with shard_scope(shard):
+        for owner in (1, 2):
+            with owner_scope(owner):
+                home = create_tag(name="home")
+                for i in range(3):
+                    task = create_task(
+                        title=f"Water the plants\tin room {i}\n",
+                        priority=Priority.HIGH,
+                        description="\\N is not null",
+                    )
+                    add_tag_to_task(task.id, home.id)
+    return task
+
+
+def test_round_trip(databases, tmp_path):
+    """Test that a restore reproduces every row, in chunks."""
+    last = _fill(0)
+    path = tmp_path / "backup.snapshot.gz"
+    reported = []
+
+    with shard_scope(0):
+        dumped = dump_snapshot(
+            path, chunk_rows=4, progress=lambda *args: reported.append(args)
+        )
+    with shard_scope(1):
+        restored = restore_snapshot(path)
+
+    assert dumped.rows == restored.rows
+    assert dumped.rows == {
+        "tag": 2,
+        "task": 6,
+        "task_tag_link": 6,
+        "task_signature": 60,
+    }
+    assert reported[:2] == [("tag", 2), ("task", 4)]
+    assert _rows(1) == _rows(0)
+
+    with shard_scope(0), owner_scope(2):
+        tag_ids = get_task(last.id).tag_ids
+    with shard_scope(1), owner_scope(2):
+        assert get_task(last.id).tag_ids == tag_ids != []
+        assert find_duplicates("Water the plants in room 2")[0].task_id == last.id
+        assert create_task(title="After the restore").id > last.id
+
+
+def _indexes(shard):
+    with shard_scope(shard):
+        return sorted(
+            index["name"] for index in inspect(get_engine()).get_indexes("task")
+        )
+
+
+def _rewrite(path, edit):
+    with gzip.open(path, "rb") as file:
+        lines = file.readlines()
+    with gzip.open(path, "wb") as file:
+        file.writelines(edit(lines))
+
+
+@pytest.mark.parametrize(
+    ("edit", "error"),
+    [
+        (lambda lines: lines[:-1], "truncated"),
+        (
+            lambda lines: [line.replace(b"room 1", b"room 9") for line in lines],
+            "checksum",
+        ),
+        (lambda lines: lines[1:], "Not a snapshot"),
+    ],
+)
+def test_damaged_snapshot_loads_nothing(databases, tmp_path, edit, error):
+    """Test that a damaged file is rejected and the restore rolled back."""
+    _fill(0)
+    path = tmp_path / "backup.snapshot.gz"
+    with shard_scope(0):
+        dump_snapshot(path)
+    _rewrite(path, edit)
+    indexes = _indexes(1)
+
+    with shard_scope(1), pytest.raises(ValueError, match=error):
+        restore_snapshot(path)
+
+    assert _rows(1) == [[], [], []]
+    assert _indexes(1) == indexes
+
+
+def test_restore_into_existing_data(databases, tmp_path):
+    """Test that existing data is kept unless it is to be replaced."""
+    _fill(0)
+    path = tmp_path / "backup.snapshot.gz"
+    with shard_scope(0):
+        dump_snapshot(path)
+    with shard_scope(1), owner_scope(1):
+        create_task(title="Already here")
+
+    with shard_scope(1), pytest.raises(ValueError, match="isn't empty"):
+        restore_snapshot(path)
+    with shard_scope(1):
+        restore_snapshot(path, replace=True)
+
+    assert _rows(1) == _rows(0)
+    with shard_scope(1), all_owners_scope(), get_session() as session:
+        assert "Already here" not in session.exec(select(col(Task.title))).all()
@@ -0,0 +1,107 @@
+import pytest
+from sqlmodel import select
+
+from src.db.engine import get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.changes_since import changes_since
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.delete_task import delete_task
+from src.db.functions.edit_task import edit_task
+from src.db.tenancy import owner_scope
+from src.models import Tag, Task, TaskChange, TaskSignature, TaskTagLink
+from src.settings import get_settings
+
+OWNER = 5001
+
+
+@pytest.fixture(autouse=True)
+def _owner(monkeypatch):
+    monkeypatch.setattr(get_settings(), "sync_settle_seconds", 0.0)
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (TaskTagLink, TaskSignature, TaskChange, Task, Tag):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+
+
+def test_snapshot_then_only_changes():
+    """Test that a sync starts with every task and then gets only what changed."""
+    kept = create_task(title="Kept")
+    edited = create_task(title="Edited")
+    deleted = create_task(title="Deleted")
+
+    snapshot = changes_since()
+    assert snapshot.snapshot
+    assert {task.title for task in snapshot.tasks} == {"Kept", "Edited", "Deleted"}
+
+    tag = create_tag("sync")
+    edit_task(edited.id, title="Edited again")
+    add_tag_to_task(edited.id, tag.id)
+    delete_task(deleted.id)
+
+    changes = changes_since(snapshot.cursor)
+    assert not changes.snapshot and not changes.has_more
+    assert [(task.id, task.title) for task in changes.tasks] == [
+        (edited.id, "Edited again")
+    ]
+    assert [t.name for t in changes.tasks[0].tags] == ["sync"]
+    assert changes.deleted_task_ids == [deleted.id]
+    assert kept.id not in {task.id for task in changes.tasks}
+
+    assert changes.cursor > snapshot.cursor
+    unchanged = changes_since(changes.cursor)
+    assert unchanged.tasks == [] and unchanged.deleted_task_ids == []
+    assert unchanged.cursor == changes.cursor
+
+
+def test_pages_follow_the_log():
+    """Test that a small limit splits the changes over several calls."""
+    cursor = changes_since().cursor
+    created = [create_task(title=f"Page {i}").id for i in range(3)]
+
+    seen = []
+    changes = changes_since(cursor, limit=2)
+    seen.extend(task.id for task in changes.tasks)
+    assert changes.has_more
+    changes = changes_since(changes.cursor, limit=2)
+    seen.extend(task.id for task in changes.tasks)
+    assert not changes.has_more
+
+    assert seen == created
+
+
+def test_recent_changes_hold_the_cursor_back(monkeypatch):
+    """Test that changes within the settle window are sent again next time."""
+    cursor = changes_since().cursor
+    task = create_task(title="Fresh")
+    monkeypatch.setattr(get_settings(), "sync_settle_seconds", 3600.0)
+
+    changes = changes_since(cursor)
+    assert [t.id for t in changes.tasks] == [task.id]
+    assert changes.cursor == cursor
+    assert [t.id for t in changes_since(changes.cursor).tasks] == [task.id]
+
+
+def test_pruned_cursor_starts_over():
+    """Test that a cursor older than the change log gets a snapshot."""
+    create_task(title="Survivor")
+
+    changes = changes_since(-5)
+
+    assert changes.snapshot
+    assert [task.title for task in changes.tasks] == ["Survivor"]
+
+
+def test_cursor_ahead_of_the_log_starts_over():
+    """Test that a cursor from a log that was since replaced gets a snapshot."""
+    create_task(title="Restored")
+    newest = changes_since().cursor
+
+    changes = changes_since(newest + 1000)
+
+    assert changes.snapshot
+    assert [task.title for task in changes.tasks] == ["Restored"]
+    assert changes.cursor <= newest
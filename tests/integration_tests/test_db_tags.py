@@ -1,11 +1,14 @@
-from sqlmodel import select
+from sqlalchemy import event
+from sqlmodel import col, select
 
-from src.db.engine import get_session
+from src.db.engine import get_engine, get_session
 from src.db.functions.add_tag_to_task import add_tag_to_task
 from src.db.functions.create_tag import create_tag
 from src.db.functions.create_task import create_task
+from src.db.functions.get_or_create_tags import get_or_create_tags
 from src.db.functions.list_tags import list_tags
 from src.db.functions.remove_tag_from_task import remove_tag_from_task
+from src.db.tag_cache import tag_cache
 from src.models import Tag, Task
 
 
@@ -54,6 +57,7 @@ def test_add_tag_to_task():
 
     assert len(updated_task.tags) == 1
     assert updated_task.tags[0].name == "work-tag"
+    assert updated_task.tag_ids == [tag.id]
 
     # Cleanup
     with get_session() as session:
@@ -77,6 +81,7 @@ def test_remove_tag_from_task():
     # Remove tag
     task_without_tag = remove_tag_from_task(task.id, tag.id)
     assert len(task_without_tag.tags) == 0
+    assert task_without_tag.tag_ids == []
 
     # Cleanup
     with get_session() as session:
@@ -86,3 +91,49 @@ def test_remove_tag_from_task():
         db_tag = session.exec(select(Tag).where(Tag.id == tag.id)).first()
         if db_tag:
             session.delete(db_tag)
+
+
+def _delete_tags(names):
+    with get_session() as session:
+        for tag in session.exec(select(Tag).where(col(Tag.name).in_(names))).all():
+            session.delete(tag)
+    tag_cache.clear()
+
+
+def test_get_or_create_tags():
+    """Test resolving existing tags and creating missing ones in bulk."""
+    existing = create_tag(name="bulk-existing", color="#123456")
+    tag_cache.clear()
+
+    ids = get_or_create_tags(
+        ["bulk-existing", "bulk-new", "bulk-new"], colors={"bulk-new": "#00FF00"}
+    )
+
+    assert list(ids) == ["bulk-existing", "bulk-new"]
+    assert ids["bulk-existing"] == existing.id
+    with get_session() as session:
+        new_tag = session.exec(select(Tag).where(Tag.name == "bulk-new")).one()
+        assert ids["bulk-new"] == new_tag.id
+        assert new_tag.color == "#00FF00"
+
+    _delete_tags(["bulk-existing", "bulk-new"])
+
+
+def test_get_or_create_tags_uses_cache():
+    """Test that cached names are resolved without querying the database."""
+    created = create_tag(name="bulk-cached")
+    statements = []
+
+    def count(*args):
+        statements.append(args)
+
+    event.listen(get_engine(), "before_cursor_execute", count)
+    try:
+        ids = get_or_create_tags(["bulk-cached"])
+    finally:
+        event.remove(get_engine(), "before_cursor_execute", count)
+
+    assert ids == {"bulk-cached": created.id}
+    assert statements == []
+
+    _delete_tags(["bulk-cached"])
@@ -0,0 +1,152 @@
+import pytest
+from sqlmodel import col, select
+
+from src.db.engine import get_session
+from src.db.functions.add_tag_to_task import add_tag_to_task
+from src.db.functions.changes_since import changes_since
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.edit_tasks import TaskEdit
+from src.db.functions.get_or_create_tags import get_or_create_tags
+from src.db.functions.get_task import get_task
+from src.db.functions.get_task_at import get_task_at
+from src.db.functions.list_tags import list_tags
+from src.db.functions.list_tasks import list_tasks
+from src.db.tag_cache import tag_cache
+from src.db.tenancy import current_owner_id, owner_scope
+from src.db.write_behind import WriteBehindQueue
+from src.models import Tag, Task, TaskChange, TaskTagLink
+from src.settings import get_settings
+
+OWNER_A = 1001
+OWNER_B = 1002
+
+
+@pytest.fixture(autouse=True)
+def _cleanup():
+    yield
+    with get_session() as session:
+        for model in (TaskChange, TaskTagLink, Task, Tag):
+            rows = session.exec(
+                select(model).where(col(model.owner_id).in_([OWNER_A, OWNER_B]))
+            ).all()
+            for row in rows:
+                session.delete(row)
+            session.flush()
+    tag_cache.clear()
+
+
+def test_current_owner_defaults_to_setting():
+    """Test that unscoped code runs as the default owner."""
+    assert current_owner_id() == get_settings().default_owner_id
+    with owner_scope(OWNER_A):
+        assert current_owner_id() == OWNER_A
+    assert current_owner_id() == get_settings().default_owner_id
+
+
+def test_owners_only_see_their_own_tasks():
+    """Test that listing and reading tasks is scoped to the owner."""
+    with owner_scope(OWNER_A):
+        task_a = create_task(title="Owner A Task")
+    with owner_scope(OWNER_B):
+        task_b = create_task(title="Owner B Task")
+
+    assert task_a.owner_id == OWNER_A
+    assert task_b.owner_id == OWNER_B
+
+    with owner_scope(OWNER_A):
+        ids = {task.id for task in list_tasks(completed=None)}
+        assert task_a.id in ids
+        assert task_b.id not in ids
+        with pytest.raises(ValueError, match="not found"):
+            get_task(task_b.id)
+
+    unscoped_ids = {task.id for task in list_tasks(completed=None)}
+    assert task_a.id not in unscoped_ids
+
+
+def test_owner_cannot_edit_other_owners_task():
+    """Test that editing another owner's task behaves as if it didn't exist."""
+    with owner_scope(OWNER_A):
+        task = create_task(title="Owner A Task")
+
+    with owner_scope(OWNER_B), pytest.raises(ValueError, match="not found"):
+        edit_task(task.id, title="Hijacked")
+
+    with owner_scope(OWNER_A):
+        fetched = get_task(task.id)
+    assert fetched.title == "Owner A Task"
+
+
+def test_tag_names_are_unique_per_owner():
+    """Test that different owners can use the same tag name."""
+    with owner_scope(OWNER_A):
+        tag_a = create_tag(name="tenancy-shared", color="#FF0000")
+    with owner_scope(OWNER_B):
+        tag_b = create_tag(name="tenancy-shared", color="#00FF00")
+        assert [t.id for t in list_tags() if t.name == "tenancy-shared"] == [tag_b.id]
+
+    assert tag_a.id != tag_b.id
+
+
+def test_get_or_create_tags_is_scoped_to_owner():
+    """Test that get_or_create_tags doesn't return other owners' tags."""
+    with owner_scope(OWNER_A):
+        ids_a = get_or_create_tags(["tenancy-a", "tenancy-b"])
+    with owner_scope(OWNER_B):
+        ids_b = get_or_create_tags(["tenancy-a", "tenancy-b"])
+    with owner_scope(OWNER_A):
+        assert get_or_create_tags(["tenancy-a", "tenancy-b"]) == ids_a
+
+    assert set(ids_a.values()).isdisjoint(ids_b.values())
+
+
+def test_cannot_tag_task_with_other_owners_tag():
+    """Test that a task can't be linked to a tag of another owner."""
+    with owner_scope(OWNER_A):
+        tag = create_tag(name="tenancy-private", color="#FF0000")
+    with owner_scope(OWNER_B):
+        task = create_task(title="Owner B Task")
+        with pytest.raises(ValueError, match="not found"):
+            add_tag_to_task(task.id, tag.id)
+
+
+def test_owner_cannot_read_other_owners_change_log(monkeypatch):
+    """Test that the change log of a task is only visible to its owner."""
+    monkeypatch.setattr(get_settings(), "sync_settle_seconds", 0)
+    with owner_scope(OWNER_A):
+        task = create_task(title="Owner A Task")
+        edit_task(task.id, title="Owner A Secret")
+        edited_at = get_task(task.id).updated_at
+
+    with owner_scope(OWNER_B):
+        assert changes_since(cursor=0).tasks == []
+        assert task.id not in {t.id for t in changes_since().tasks}
+        with pytest.raises(ValueError, match="not found"):
+            get_task_at(task.id, edited_at)
+
+
+def test_write_behind_flushes_in_submitters_scope():
+    """Test that queued edits are written as the owner who submitted them."""
+    with owner_scope(OWNER_A):
+        task_a = create_task(title="Owner A Task")
+    with owner_scope(OWNER_B):
+        task_b = create_task(title="Owner B Task")
+
+    queue = WriteBehindQueue(flush_interval=0.5)
+    try:
+        with owner_scope(OWNER_A):
+            write_a = queue.submit(TaskEdit(task_a.id, completed=True))
+        with owner_scope(OWNER_B):
+            write_b = queue.submit(TaskEdit(task_b.id, completed=True))
+            # Another owner's task is missing from B's point of view
+            write_denied = queue.submit(TaskEdit(task_a.id, priority=task_a.priority))
+        assert queue.flush(timeout=5)
+    finally:
+        queue.close()
+
+    write_a.wait(0)
+    write_b.wait(0)
+    with pytest.raises(ValueError, match="not found"):
+        write_denied.wait(0)
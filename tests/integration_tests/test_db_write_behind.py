@@ -0,0 +1,58 @@
+import pytest
+from sqlmodel import select
+
+from src.db.engine import get_session
+from src.db.exceptions import StaleTaskError
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_tasks import TaskEdit
+from src.db.write_behind import WriteBehindQueue, queue_edit
+from src.models import Priority, Task
+from src.settings import get_settings
+
+
+def _read(task_id):
+    with get_session() as session:
+        task = session.exec(select(Task).where(Task.id == task_id)).one()
+        return task.completed, task.priority, task.version
+
+
+def _cleanup(*tasks):
+    with get_session() as session:
+        for task in tasks:
+            db_task = session.exec(select(Task).where(Task.id == task.id)).first()
+            if db_task:
+                session.delete(db_task)
+
+
+def test_queued_edits_are_written_in_one_update():
+    """Test that coalesced edits reach the database as a single edit."""
+    task = create_task(title="Write Behind Task")
+    queue = WriteBehindQueue(flush_interval=0.5)
+    try:
+        queue.submit(TaskEdit(task.id, task.version, completed=True), task)
+        queue.submit(TaskEdit(task.id, task.version, completed=False), task)
+        queue.submit(TaskEdit(task.id, task.version, completed=True), task)
+        queue.submit(TaskEdit(task.id, task.version, priority=Priority.HIGH), task)
+        assert queue.flush(timeout=5)
+    finally:
+        queue.close()
+
+    assert _read(task.id) == (True, Priority.HIGH, task.version + 1)
+    assert queue.stats.flushed == 1
+
+    _cleanup(task)
+
+
+@pytest.mark.parametrize("mode", ["off", "wait"])
+def test_queue_edit_reports_conflicts(mode, monkeypatch):
+    """Test that synchronous modes surface version conflicts to the caller."""
+    monkeypatch.setattr(get_settings(), "write_behind_mode", mode)
+    task = create_task(title=f"Write Behind {mode}")
+
+    queue_edit(TaskEdit(task.id, task.version, completed=True), task)
+    with pytest.raises(StaleTaskError):
+        queue_edit(TaskEdit(task.id, task.version, title="Stale"), task)
+
+    assert _read(task.id)[0] is True
+
+    _cleanup(task)
@@ -0,0 +1,74 @@
+import httpx
+import pytest
+from sqlmodel import select
+
+from src.db.engine import get_session
+from src.db.functions.create_tag import create_tag
+from src.db.functions.create_task import create_task
+from src.db.functions.edit_task import edit_task
+from src.db.functions.get_or_create_tags import get_or_create_tags
+from src.db.tag_cache import lookups
+from src.db.tenancy import owner_scope
+from src.metrics import function_seconds, start_metrics_server, stop_metrics_server
+from src.models import Tag, Task
+
+OWNER = 7001
+
+
+@pytest.fixture(autouse=True)
+def _owner():
+    with owner_scope(OWNER):
+        yield
+    with get_session() as session:
+        for model in (Task, Tag):
+            for row in session.exec(select(model).where(model.owner_id == OWNER)):
+                session.delete(row)
+            session.flush()
+
+
+@pytest.fixture
+def server():
+    server = start_metrics_server(0)
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    stop_metrics_server()
+
+
+def _samples(text):
+    return dict(
+        line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#")
+    )
+
+
+def test_scrape_reports_functions_pool_and_tasks(server):
+    """Test that a scrape covers function calls, the pool and task counts."""
+    task = create_task(title="Measured")
+    edit_task(task.id, completed=True)
+
+    response = httpx.get(f"{server}/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(response.text)
+    assert float(samples['todo_db_function_seconds_count{function="create_task"}']) >= 1
+    assert float(samples['todo_db_function_seconds_count{function="edit_task"}']) >= 1
+    checkouts = [
+        float(value)
+        for name, value in samples.items()
+        if name.startswith("todo_db_pool_checkout_seconds_count")
+    ]
+    assert checkouts and sum(checkouts) > 0
+    assert any(name.startswith("todo_db_pool_connections_in_use") for name in samples)
+    assert float(samples['todo_tasks{state="completed"}']) >= 1
+    assert httpx.get(f"{server}/other").status_code == 404
+
+
+def test_tag_cache_lookups_are_counted():
+    """Test that resolving cached tags counts hits and unknown ones misses."""
+    create_tag("cached")
+    hits, misses = lookups.labels("hit").value, lookups.labels("miss").value
+
+    get_or_create_tags(["cached", "fresh"])
+
+    assert lookups.labels("hit").value == hits + 1
+    assert lookups.labels("miss").value == misses + 1
+    assert sum(function_seconds.labels("get_or_create_tags").counts) >= 1
@@ -0,0 +1,60 @@
+import subprocess
+import sys
+
+# Cumulative import time allowed for the package entry points, in microseconds.
+# Generous on purpose: it catches an eager import of SQLAlchemy or pydantic
+# (hundreds of milliseconds) creeping back in, not small regressions.
+IMPORT_BUDGET_US = 50_000
+
+HEAVY_MODULES = ("sqlalchemy", "sqlmodel", "pydantic", "pydantic_settings")
+
+
+def _import_times(statement: str) -> dict[str, int]:
+    """Run an import in a fresh interpreter and return cumulative times."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_db_packages_import_lazily():
+    """Test that the db packages don't load the ORM until it's used."""
+    times = _import_times("import src.db, src.db.functions")
+
+    assert not [module for module in HEAVY_MODULES if module in times]
+    assert times["src.db"] + times["src.db.functions"] < IMPORT_BUDGET_US
+
+
+def test_settings_are_read_on_first_use():
+    """Test that importing the settings module doesn't read the environment."""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import src.settings as s; print(s.get_settings.cache_info().currsize)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "0"
+
+
+def test_function_modules_stay_modules():
+    """Test that importing a function module binds the module, not the function."""
+    import src.db.functions.create_task as module
+    from src.db.functions.create_task import create_task
+
+    assert module.create_task is create_task
+    assert module.__name__ == "src.db.functions.create_task"
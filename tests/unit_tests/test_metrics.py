@@ -0,0 +1,101 @@
+import timeit
+
+import pytest
+
+from src.metrics import (
+    OVERHEAD_BUDGET_US,
+    Counter,
+    Histogram,
+    Registry,
+    _Metric,
+    function_errors,
+    function_seconds,
+    timed,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Test that buckets count every observation up to their bound."""
+    histogram = Histogram("latency_seconds", "Latency.", ["route"], buckets=[0.1, 1])
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.labels("/tasks").observe(value)
+
+    assert histogram.render().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/tasks",le="0.1"} 2',
+        'latency_seconds_bucket{route="/tasks",le="1"} 3',
+        'latency_seconds_bucket{route="/tasks",le="+Inf"} 4',
+        'latency_seconds_sum{route="/tasks"} 3.65',
+        'latency_seconds_count{route="/tasks"} 4',
+    ]
+
+
+def test_label_values_are_escaped():
+    """Test that quotes, backslashes and newlines can't break the format."""
+    counter = Counter("events_total", "Events.", ["name"])
+    counter.labels('a "b"\\\n').inc(2)
+
+    assert counter.render().splitlines()[-1] == r'events_total{name="a \"b\"\\\n"} 2'
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_metric_kinds_must_implement_their_samples():
+    """Test that a metric class missing an override fails when it's created."""
+
+    class Incomplete(_Metric):
+        kind = "gauge"
+
+        def _new_child(self):
+            return None
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Incomplete.")
+
+
+def test_registry_runs_collectors_and_survives_failures():
+    """Test that collectors refresh gauges and a failing one is skipped."""
+    registry = Registry()
+    counter = Counter("calls_total", "Calls.")
+    registry.register(counter)
+
+    def broken():
+        raise RuntimeError("no database")
+
+    registry.add_collector(broken)
+    registry.add_collector(counter.labels().inc)
+
+    assert "calls_total 1" in registry.render()
+    assert "calls_total 2" in registry.render()
+    with pytest.raises(ValueError):
+        registry.register(Counter("calls_total", "Again."))
+
+
+def test_timed_records_latency_and_errors():
+    """Test that a timed function counts its calls and the ones that raised."""
+
+    @timed
+    def metrics_probe(fail: bool) -> int:
+        if fail:
+            raise KeyError("probe")
+        return 1
+
+    assert metrics_probe(False) == 1
+    with pytest.raises(KeyError):
+        metrics_probe(True)
+
+    assert sum(function_seconds.labels("metrics_probe").counts) == 2
+    assert function_errors.labels("metrics_probe").value == 1
+
+
+def test_timed_overhead_is_within_budget():
+    """Test that timing a call costs less than the overhead budget."""
+
+    def noop() -> None:
+        pass
+
+    def per_call_us(func):
+        return min(timeit.repeat(func, number=50_000, repeat=5)) / 50_000 * 1e6
+
+    assert per_call_us(timed(noop)) - per_call_us(noop) < OVERHEAD_BUDGET_US
@@ -1,5 +1,8 @@
 from datetime import datetime, timedelta
 
+from sqlmodel import SQLModel
+
+from src.db.tenancy import OWNED_TABLES
 from src.models import Priority, RepeatInterval, Tag, Task
 
 
@@ -11,6 +14,8 @@ def test_task_creation():
     assert task.description == "Test Description"
     assert task.completed is False
     assert task.priority == Priority.MEDIUM
+    assert task.version == 1
+    assert task.tag_ids == []
 
 
 def test_task_with_all_fields():
@@ -56,3 +61,10 @@ def test_repeat_interval_enum():
     assert RepeatInterval.DAILY == "daily"
     assert RepeatInterval.WEEKLY == "weekly"
     assert RepeatInterval.MONTHLY == "monthly"
+
+
+def test_owned_tables_cover_every_owner_column():
+    """Test that row-level security covers every table with per-owner rows."""
+    tables = SQLModel.metadata.tables.values()
+    owned = {table.name for table in tables if "owner_id" in table.columns}
+    assert set(OWNED_TABLES) == owned
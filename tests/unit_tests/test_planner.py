@@ -0,0 +1,132 @@
+from datetime import datetime, time
+
+import pytest
+
+from src.models import Priority
+from src.planner import PlanItem, Planner, WorkingHours
+
+# A Monday morning before work starts
+MONDAY = datetime(2025, 11, 17, 8, 0)
+
+
+def test_tasks_fill_working_hours():
+    """Test that tasks are packed back to back and spill into the next day."""
+    planner = Planner(now=MONDAY)
+    items = [
+        PlanItem(id=i, title=f"Task {i}", time_estimate_minutes=180) for i in (1, 2, 3)
+    ]
+
+    schedule = planner.plan(items)
+
+    assert [(slot.start, slot.end) for slot in schedule] == [
+        (datetime(2025, 11, 17, 9, 0), datetime(2025, 11, 17, 12, 0)),
+        (datetime(2025, 11, 17, 12, 0), datetime(2025, 11, 17, 15, 0)),
+        (datetime(2025, 11, 17, 15, 0), datetime(2025, 11, 18, 10, 0)),
+    ]
+
+
+def test_weekends_are_skipped():
+    """Test that work scheduled past Friday continues on Monday."""
+    friday = datetime(2025, 11, 21, 16, 0)
+    planner = Planner(now=friday)
+
+    [slot] = planner.plan([PlanItem(id=1, title="Long", time_estimate_minutes=120)])
+
+    assert slot.start == friday
+    assert slot.end == datetime(2025, 11, 24, 10, 0)
+
+
+def test_earliest_deadline_first():
+    """Test that tasks with earlier due dates are scheduled first."""
+    planner = Planner(now=MONDAY)
+    items = [
+        PlanItem(id=1, title="No deadline", priority=Priority.HIGH),
+        PlanItem(id=2, title="Friday", due_date=datetime(2025, 11, 21)),
+        PlanItem(id=3, title="Tuesday", due_date=datetime(2025, 11, 18)),
+    ]
+
+    schedule = planner.plan(items)
+
+    assert [slot.task_id for slot in schedule] == [3, 2, 1]
+
+
+def test_priority_weights_deadlines():
+    """Test that a high priority task beats a slightly earlier deadline."""
+    planner = Planner(now=MONDAY)
+    items = [
+        PlanItem(
+            id=1, title="Low", priority=Priority.LOW, due_date=datetime(2025, 11, 19)
+        ),
+        PlanItem(
+            id=2, title="High", priority=Priority.HIGH, due_date=datetime(2025, 11, 20)
+        ),
+    ]
+
+    schedule = planner.plan(items)
+
+    assert [slot.task_id for slot in schedule] == [2, 1]
+
+
+def test_start_date_is_respected():
+    """Test that a task is not scheduled before its start date."""
+    planner = Planner(now=MONDAY)
+    items = [
+        PlanItem(id=1, title="Later", start_date=datetime(2025, 11, 18, 13, 0)),
+        PlanItem(id=2, title="Now"),
+    ]
+
+    schedule = planner.plan(items)
+
+    assert [slot.task_id for slot in schedule] == [2, 1]
+    assert schedule[1].start == datetime(2025, 11, 18, 13, 0)
+
+
+def test_infeasible_deadlines_are_flagged():
+    """Test that tasks finishing after their due date are marked late."""
+    planner = Planner(now=MONDAY)
+    items = [
+        PlanItem(
+            id=1,
+            title="Big",
+            due_date=datetime(2025, 11, 17),
+            time_estimate_minutes=420,
+        ),
+        PlanItem(
+            id=2,
+            title="Small",
+            due_date=datetime(2025, 11, 17),
+            time_estimate_minutes=120,
+        ),
+    ]
+
+    schedule = planner.plan(items)
+
+    assert [slot.late for slot in schedule] == [False, True]
+
+
+def test_custom_working_hours():
+    """Test planning into a shorter working day."""
+    hours = WorkingHours(start=time(10), end=time(12), weekdays=(0, 2))
+    planner = Planner(hours=hours, now=MONDAY)
+
+    [slot] = planner.plan([PlanItem(id=1, title="Task", time_estimate_minutes=180)])
+
+    assert slot.start == datetime(2025, 11, 17, 10, 0)
+    assert slot.end == datetime(2025, 11, 19, 11, 0)
+
+
+def test_invalid_working_hours():
+    """Test that an empty working day is rejected."""
+    with pytest.raises(ValueError):
+        Planner(hours=WorkingHours(start=time(17), end=time(9)))
+
+
+def test_negative_estimates_are_rejected():
+    """Test that a negative time estimate can't shift the timeline back."""
+    planner = Planner(now=MONDAY)
+    item = PlanItem(id=1, title="Task", time_estimate_minutes=-30)
+
+    with pytest.raises(ValueError, match="negative"):
+        planner.plan([PlanItem(id=2, title="Task"), item])
+    with pytest.raises(ValueError, match="negative"):
+        Planner(default_estimate_minutes=-1)
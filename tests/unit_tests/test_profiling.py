@@ -0,0 +1,76 @@
+import pstats
+import time
+
+from sqlalchemy import create_engine, text
+
+from src.profiling import profile_section, start_profile, stop_profile
+
+
+def test_sections_are_timed_with_their_queries():
+    """Test that each section records its time and the queries it ran."""
+    engine = create_engine("sqlite://")
+    profile = start_profile()
+    with engine.connect() as connection:
+        with profile_section("fetch"):
+            connection.execute(text("SELECT 1"))
+            connection.execute(text("SELECT 2"))
+        for _ in range(3):
+            with profile_section("render"):
+                time.sleep(0.01)
+        connection.execute(text("SELECT 3"))
+    assert stop_profile() is profile
+
+    breakdown = {timing.name: timing for timing in profile.breakdown()}
+    assert list(breakdown) == ["render", "fetch", "other"]
+    assert breakdown["fetch"].queries == 2
+    assert breakdown["render"].queries == 0
+    assert breakdown["render"].seconds >= 0.03
+    assert breakdown["other"].queries == 1
+    assert profile.queries == 3
+    assert sum(timing.seconds for timing in breakdown.values()) <= profile.seconds
+    engine.dispose()
+
+
+def test_nothing_is_recorded_without_a_profile():
+    """Test that sections and queries outside a profiled run are free."""
+    engine = create_engine("sqlite://")
+    with profile_section("fetch"), engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert stop_profile() is None
+    engine.dispose()
+
+
+def test_interrupted_run_ends_with_its_last_section():
+    """Test that a run cut short by a rerun is timed up to its last section."""
+    profile = start_profile()
+    with profile_section("form"):
+        pass
+    stop_profile()
+    seconds = profile.seconds
+
+    profile.finish(interrupted=True)
+
+    assert profile.seconds == seconds and not profile.interrupted
+
+    cut = start_profile()
+    with profile_section("form"):
+        pass
+    time.sleep(0.02)
+    cut.finish(interrupted=True)
+    stop_profile()
+    assert cut.interrupted
+    assert cut.seconds < 0.02
+
+
+def test_profile_dump(tmp_path):
+    """Test that a dump directory gets the run's cProfile stats."""
+    profile = start_profile(tmp_path / "profiles")
+    with profile_section("work"):
+        sorted(range(1000), key=lambda n: -n)
+    stop_profile()
+
+    assert profile.dump_path is not None
+    assert profile.dump_path.parent == tmp_path / "profiles"
+    stats = pstats.Stats(str(profile.dump_path))
+    assert any("sorted" in function for _, _, function in stats.stats)
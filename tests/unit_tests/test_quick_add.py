@@ -0,0 +1,76 @@
+from datetime import date
+
+import pytest
+
+from src.models import Priority
+from src.quick_add import QuickTask, parse_quick_add
+
+# A Monday
+TODAY = date(2026, 10, 19)
+
+
+def test_tokens_anywhere_in_a_line():
+    """Test that tags, priority and due date are taken out of the title."""
+    tasks = parse_quick_add(
+        "Call the #home plumber !HIGH due:tomorrow\nDraft report #work #q3 #work",
+        TODAY,
+    )
+
+    assert tasks == [
+        QuickTask(
+            title="Call the plumber",
+            priority=Priority.HIGH,
+            due_date=date(2026, 10, 20),
+            tags=["home"],
+        ),
+        QuickTask(title="Draft report", tags=["work", "q3"]),
+    ]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("today", date(2026, 10, 19)),
+        ("mon", date(2026, 10, 19)),
+        ("Fri", date(2026, 10, 23)),
+        ("sunday", date(2026, 10, 25)),
+        ("2026-12-01", date(2026, 12, 1)),
+    ],
+)
+def test_due_dates(value, expected):
+    """Test relative and absolute due dates."""
+    [task] = parse_quick_add(f"Task due:{value}", TODAY)
+
+    assert task.due_date == expected
+
+
+def test_pasted_lists_and_blank_lines():
+    """Test that list markers are dropped and blank lines skipped."""
+    text = "- one\n\n  * two\n[ ] three\n[x] four\n• five\n-not a marker\n   "
+
+    titles = [task.title for task in parse_quick_add(text, TODAY)]
+
+    assert titles == ["one", "two", "three", "four", "five", "-not a marker"]
+
+
+def test_every_invalid_line_is_reported():
+    """Test that nothing is returned while any line is invalid."""
+    text = "fine\nTask !urgent\n#only #tags\nTask due:someday\nWow! !!"
+
+    with pytest.raises(ValueError) as excinfo:
+        parse_quick_add(text, TODAY)
+
+    assert str(excinfo.value) == (
+        "Line 2: Unknown priority '!urgent'; Line 3: No title; "
+        "Line 4: Unknown due date 'someday'"
+    )
+
+
+def test_limits():
+    """Test the length of titles and tags and the number of lines."""
+    with pytest.raises(ValueError, match="Line 1: Title is longer"):
+        parse_quick_add("x" * 201, TODAY)
+    with pytest.raises(ValueError, match="Line 1: Tag"):
+        parse_quick_add("Task #" + "t" * 51, TODAY)
+    with pytest.raises(ValueError, match="At most 500 tasks"):
+        parse_quick_add("task\n" * 501, TODAY)
@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.db import retry
+from src.db.retry import RetryPolicy, is_retryable, retry_stats, retry_transient
+
+
+class FakeDriverError(Exception):
+    """Stand-in for a DBAPI error carrying a SQLSTATE."""
+
+    def __init__(self, message, pgcode=None):
+        super().__init__(message)
+        self.pgcode = pgcode
+
+
+def operational_error(message="boom", pgcode=None, connection_invalidated=False):
+    return OperationalError(
+        "UPDATE task SET ...",
+        {},
+        FakeDriverError(message, pgcode),
+        connection_invalidated=connection_invalidated,
+    )
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(retry.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(retry, "get_retry_policy", lambda: RetryPolicy(max_attempts=3))
+    retry_stats.reset()
+
+
+def test_serialization_failure_is_retryable():
+    """Test that errors after which Postgres rolled back are retryable."""
+    assert is_retryable(operational_error(pgcode="40001"), idempotent=False)
+    assert is_retryable(operational_error(pgcode="40P01"), idempotent=False)
+
+
+def test_permanent_errors_are_not_retryable():
+    """Test that constraint violations and unknown errors are not retried."""
+    error = IntegrityError("INSERT ...", {}, FakeDriverError("dup", "23505"))
+
+    assert not is_retryable(error)
+    assert not is_retryable(operational_error("no such table: task"))
+    assert not is_retryable(ValueError("Task with id 1 not found"))
+
+
+def test_dropped_connection_only_retried_when_idempotent():
+    """Test that a connection lost mid-transaction is only retried if safe."""
+    error = operational_error(
+        "server closed the connection", connection_invalidated=True
+    )
+
+    assert is_retryable(error, idempotent=True)
+    assert not is_retryable(error, idempotent=False)
+
+
+def test_server_shutdown_only_retried_when_idempotent():
+    """Test that a shutdown, possibly during the commit, is only retried if safe."""
+    for pgcode in ("57P01", "57P02"):
+        error = operational_error(pgcode=pgcode)
+
+        assert is_retryable(error, idempotent=True)
+        assert not is_retryable(error, idempotent=False)
+
+
+def test_pool_timeout_is_retryable():
+    """Test that waiting too long for a pooled connection is retryable."""
+    assert is_retryable(PoolTimeoutError("QueuePool limit reached"), idempotent=False)
+
+
+def test_backoff_is_bounded():
+    """Test that the jittered backoff never exceeds the maximum delay."""
+    policy = RetryPolicy(max_attempts=10, base_delay=0.1, max_delay=0.5)
+
+    delays = [policy.backoff(attempt) for attempt in range(1, 10)]
+
+    assert all(0 <= delay <= 0.5 for delay in delays)
+
+
+def test_retry_transient_recovers():
+    """Test that a transient failure is retried until it succeeds."""
+    calls = []
+
+    @retry_transient()
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise operational_error(pgcode="40001")
+        return "ok"
+
+    assert flaky() == "ok"
+    assert len(calls) == 3
+    assert retry_stats.snapshot()["retries"] == {"flaky": 2}
+
+
+def test_retry_transient_gives_up():
+    """Test that retries stop after the maximum number of attempts."""
+    calls = []
+
+    @retry_transient()
+    def always_locked():
+        calls.append(1)
+        raise operational_error("database is locked")
+
+    with pytest.raises(OperationalError):
+        always_locked()
+
+    assert len(calls) == 3
+    assert retry_stats.snapshot()["give_ups"] == {"always_locked": 1}
+
+
+def test_retry_transient_does_not_retry_permanent_errors():
+    """Test that non-transient errors are raised immediately."""
+    calls = []
+
+    @retry_transient(idempotent=False)
+    def create():
+        calls.append(1)
+        raise operational_error("lost", connection_invalidated=True)
+
+    with pytest.raises(OperationalError):
+        create()
+
+    assert len(calls) == 1
+    assert retry_stats.snapshot() == {"retries": {}, "give_ups": {}}
@@ -0,0 +1,34 @@
+from collections import Counter
+
+from src.db.sharding import HashRing
+
+OWNERS = range(1, 10_001)
+
+
+def test_owners_spread_evenly():
+    """Test that each shard gets close to its share of owners."""
+    ring = HashRing(4)
+
+    counts = Counter(ring.shard_for(owner) for owner in OWNERS)
+
+    assert set(counts) == {0, 1, 2, 3}
+    assert all(1_800 < count < 3_200 for count in counts.values())
+
+
+def test_adding_a_shard_moves_few_owners():
+    """Test that a new shard only takes owners, about its share of them."""
+    before, after = HashRing(3), HashRing(4)
+
+    moved = [
+        owner for owner in OWNERS if before.shard_for(owner) != after.shard_for(owner)
+    ]
+
+    assert {after.shard_for(owner) for owner in moved} == {3}
+    assert 1_500 < len(moved) < 3_500
+
+
+def test_shard_is_stable():
+    """Test that an owner's shard doesn't depend on the ring instance."""
+    assert [HashRing(5).shard_for(owner) for owner in range(50)] == [
+        HashRing(5).shard_for(owner) for owner in range(50)
+    ]
@@ -0,0 +1,65 @@
+import random
+import string
+
+from src.similarity import (
+    BANDS,
+    jaccard,
+    normalize_title,
+    shingles,
+    title_buckets,
+    title_hash,
+)
+
+
+def test_normalize_title():
+    """Test that case, punctuation and spacing don't matter."""
+    assert normalize_title("  Buy MILK!!  ") == "buy milk"
+    assert normalize_title("Call mom -- re: trip") == "call mom re trip"
+    assert normalize_title("Ｃａｆé") == normalize_title("café")
+
+
+def test_title_hash_matches_exact_duplicates_only():
+    """Test that only titles equal after normalization share a hash."""
+    assert title_hash("Buy milk") == title_hash("buy milk!")
+    assert title_hash("Buy milk") != title_hash("Buy the milk")
+    assert len(title_hash("Buy milk")) == 16
+
+
+def test_jaccard_of_shingles():
+    """Test trigram similarity of related and unrelated titles."""
+    assert jaccard(shingles("Buy milk"), shingles("buy milk")) == 1.0
+    assert jaccard(shingles("Buy milk"), shingles("Buy the milk")) > 0.5
+    assert jaccard(shingles("Buy milk"), shingles("File taxes")) == 0.0
+
+
+def test_similar_titles_share_buckets():
+    """Test that near duplicates collide in a band and unrelated titles don't."""
+    buckets = title_buckets("Call mom about the trip")
+
+    assert len(buckets) == BANDS
+    assert buckets == title_buckets("call mom about the trip!")
+    similar = title_buckets("Call mom about trip")
+    assert any(a == b for a, b in zip(buckets, similar, strict=True))
+    unrelated = title_buckets("Renew passport")
+    assert not any(a == b for a, b in zip(buckets, unrelated, strict=True))
+
+
+def test_unrelated_titles_rarely_collide():
+    """Test that random titles are rarely candidates of each other."""
+    rng = random.Random(0)
+    titles = [
+        " ".join(
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 8)))
+            for _ in range(3)
+        )
+        for _ in range(200)
+    ]
+    seen: dict[tuple[int, int], int] = {}
+    collisions = 0
+    for index, title in enumerate(titles):
+        for band, bucket in enumerate(title_buckets(title)):
+            if (band, bucket) in seen:
+                collisions += 1
+            seen[band, bucket] = index
+
+    assert collisions < 20
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from src.db.snapshot import _copy_value
+from src.models import Priority
+
+
+def test_copy_text_format():
+    """Test the COPY text encoding of each kind of column value."""
+    row = [
+        7,
+        "tab\there\nback\\slash",
+        None,
+        True,
+        Priority.HIGH,
+        datetime(2026, 3, 10, 9, 30),
+        [3, 12],
+    ]
+
+    assert "\t".join(map(_copy_value, row)) == (
+        "7\ttab\\there\\nback\\\\slash\t\\N\tt\tHIGH\t2026-03-10T09:30:00\t{3,12}"
+    )
@@ -0,0 +1,34 @@
+from src.db.statements import edit_statement, list_tasks_statement, revert_statement
+
+
+def test_statement_variants_are_built_once():
+    """Test that each statement variant is built on first use and reused."""
+    statement = list_tasks_statement(True, False, True, False, False)
+
+    assert statement is list_tasks_statement(True, False, True, False, False)
+    assert statement is not list_tasks_statement(True, False, True, False, True)
+    assert edit_statement(("completed",)) is edit_statement(("completed",))
+    assert revert_statement(("title",)) is revert_statement(("title",))
+
+
+def test_statements_take_values_as_parameters():
+    """Test that values are bound at execution, not baked into the SQL."""
+    compiled = list_tasks_statement(True, True, True, True, False).compile()
+
+    assert set(compiled.params) == {"owner", "completed", "priority", "limit", "offset"}
+    assert set(edit_statement(("title", "title_hash")).compile().params) == {
+        "task_id",
+        "read_version",
+        "new_title",
+        "new_title_hash",
+        "new_updated_at",
+        "new_version",
+    }
+    assert set(revert_statement(("completed", "completed_at")).compile().params) == {
+        "task_id",
+        "owner",
+        "new_completed",
+        "new_completed_at",
+        "now",
+        "version_1",
+    }
@@ -0,0 +1,198 @@
+import threading
+import time
+
+import pytest
+
+from src.db.exceptions import StaleTaskError, WriteBehindFullError
+from src.db.functions.edit_tasks import EditTasksResult, TaskEdit
+from src.db.tenancy import owner_scope
+from src.db.write_behind import WriteBehindQueue
+from src.models import Priority, Task
+
+
+class RecordingFlush:
+    """Flush function that records batches instead of writing them."""
+
+    def __init__(self, conflicts=(), block=None):
+        self.batches = []
+        self.conflicts = set(conflicts)
+        self.block = block
+        self.entered = threading.Event()
+
+    def __call__(self, edits):
+        self.entered.set()
+        if self.block is not None:
+            self.block.wait()
+        self.batches.append(list(edits))
+        result = EditTasksResult()
+        for edit in edits:
+            if edit.task_id in self.conflicts:
+                result.conflicts.append(
+                    StaleTaskError(edit.task_id, edit.expected_version, 99)
+                )
+            else:
+                version = (edit.expected_version or 0) + 1
+                result.updated.append(Task(id=edit.task_id, title="", version=version))
+        return result
+
+
+@pytest.fixture
+def make_queue():
+    queues = []
+
+    def make(flush, **kwargs):
+        kwargs.setdefault("flush_interval", 0.01)
+        queue = WriteBehindQueue(flush=flush, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield make
+
+    for queue in queues:
+        queue.close()
+
+
+def test_edits_are_coalesced_per_task(make_queue):
+    """Test that repeated edits of a task are written as one."""
+    flush = RecordingFlush()
+    queue = make_queue(flush, flush_interval=0.5)
+    original = Task(id=1, title="Task", version=3)
+
+    queue.submit(TaskEdit(1, 3, completed=True), original)
+    queue.submit(TaskEdit(1, 3, priority=Priority.HIGH), original)
+    queue.submit(TaskEdit(2, 1, title="Other"))
+    assert queue.flush(timeout=5)
+
+    assert len(flush.batches) == 1
+    edits = {edit.task_id: edit for edit in flush.batches[0]}
+    assert edits[1].completed is True
+    assert edits[1].priority == Priority.HIGH
+    assert edits[1].expected_version == 3
+    assert queue.stats.coalesced == 1
+
+
+def test_toggle_back_cancels_the_write(make_queue):
+    """Test that toggling done and undone again writes nothing."""
+    flush = RecordingFlush()
+    queue = make_queue(flush, flush_interval=0.5)
+    original = Task(id=1, title="Task", completed=False)
+
+    queue.submit(TaskEdit(1, 1, completed=True), original)
+    write = queue.submit(TaskEdit(1, 1, completed=False), original)
+    assert queue.flush(timeout=5)
+
+    assert write.done
+    assert flush.batches == []
+    assert queue.stats.cancelled == 1
+
+
+def test_overlay_shows_queued_changes(make_queue):
+    """Test that unwritten edits are applied on top of tasks read from the db."""
+    block = threading.Event()
+    queue = make_queue(RecordingFlush(block=block))
+    task = Task(id=1, title="Task", completed=False)
+
+    queue.submit(TaskEdit(1, 1, completed=True))
+    [overlaid] = queue.overlay([task])
+
+    assert overlaid.completed is True
+    assert task.completed is False
+
+    block.set()
+    assert queue.flush(timeout=5)
+    assert queue.overlay([task])[0].completed is False
+
+
+def test_conflicts_are_reported(make_queue):
+    """Test that version conflicts reach waiters and take_conflicts."""
+    queue = make_queue(RecordingFlush(conflicts={1}))
+
+    write = queue.submit(TaskEdit(1, 1, completed=True))
+
+    with pytest.raises(StaleTaskError):
+        write.wait(timeout=5)
+    assert [error.task_id for error in queue.take_conflicts()] == [1]
+    assert queue.take_conflicts() == []
+
+
+def test_conflicts_are_taken_by_their_owner(make_queue):
+    """Test that an owner only takes the conflicts of their own edits."""
+    queue = make_queue(RecordingFlush(conflicts={1, 2}))
+
+    with owner_scope(1):
+        write_a = queue.submit(TaskEdit(1, 1, completed=True))
+    with owner_scope(2):
+        write_b = queue.submit(TaskEdit(2, 1, completed=True))
+    assert queue.flush(timeout=5)
+    for write in (write_a, write_b):
+        with pytest.raises(StaleTaskError):
+            write.wait(0)
+
+    with owner_scope(2):
+        assert [error.task_id for error in queue.take_conflicts()] == [2]
+        assert queue.take_conflicts() == []
+    with owner_scope(1):
+        assert [error.task_id for error in queue.take_conflicts()] == [1]
+
+
+def test_full_queue_applies_backpressure(make_queue):
+    """Test that submitters give up when the queue stays full."""
+    block = threading.Event()
+    flush = RecordingFlush(block=block)
+    queue = make_queue(flush, max_pending=1, put_timeout=0.1)
+
+    queue.submit(TaskEdit(1, 1, completed=True))
+    assert flush.entered.wait(timeout=5)  # Task 1 is stuck in a blocked write
+    queue.submit(TaskEdit(2, 1, completed=True))
+    # Edits of an already queued task are merged and never block
+    queue.submit(TaskEdit(2, 1, title="Merged"))
+
+    with pytest.raises(WriteBehindFullError):
+        queue.submit(TaskEdit(3, 1, completed=True))
+
+    block.set()
+    assert queue.flush(timeout=5)
+
+
+def test_blocked_edits_of_one_task_are_both_written(make_queue):
+    """Test that two submitters waiting for room with one task don't drop an edit."""
+    block = threading.Event()
+    flush = RecordingFlush(block=block)
+    queue = make_queue(flush, max_pending=2, batch_size=1, put_timeout=5)
+
+    queue.submit(TaskEdit(1, 1, completed=True))
+    assert flush.entered.wait(timeout=5)
+    queue.submit(TaskEdit(2, 1, completed=True))
+    queue.submit(TaskEdit(4, 1, completed=True))
+
+    writes = []
+    threads = [
+        threading.Thread(
+            target=lambda edit=edit: writes.append(queue.submit(edit)),
+        )
+        for edit in (TaskEdit(3, 1, completed=True), TaskEdit(3, 1, title="Both"))
+    ]
+    for thread in threads:
+        thread.start()
+    while queue.stats.submitted < 5:
+        time.sleep(0.001)
+    block.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    for write in writes:
+        write.wait(timeout=5)
+    edits = [edit for batch in flush.batches for edit in batch if edit.task_id == 3]
+    assert any(edit.completed for edit in edits)
+    assert any(edit.title == "Both" for edit in edits)
+
+
+def test_close_flushes_queued_edits(make_queue):
+    """Test that closing the queue writes what is still queued."""
+    flush = RecordingFlush()
+    queue = make_queue(flush, flush_interval=10)
+
+    queue.submit(TaskEdit(1, 1, completed=True))
+    queue.close()
+
+    assert [edit.task_id for batch in flush.batches for edit in batch] == [1]